@@ -0,0 +1,60 @@
+# Benchmark for the startup cost of `import flexoki`
+# Each run is done in a fresh interpreter, and measures both the bare import and the first access of the Flexoki object
+# The script exits with a non-zero status if the median time exceeds the budget (in milliseconds),
+# or if matplotlib is imported as a side effect, so that it can be used as a guard in CI
+## Usage: python benchmarks/bench_import.py [--runs 20] [--budget 100]
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# The code run in each fresh interpreter; prints the timings (in seconds) as JSON
+_SNIPPET = """
+import json, sys, time
+t0 = time.perf_counter()
+import flexoki
+t1 = time.perf_counter()
+flexoki.Flexoki
+t2 = time.perf_counter()
+print(json.dumps({"import": t1-t0, "schema": t2-t1, "matplotlib": "matplotlib" in sys.modules}))
+"""
+
+def run(runs: int=20):
+    # Making sure the package in this repository is the one being imported
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    results = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _SNIPPET], capture_output=True, text=True, check=True, env=env)
+        results.append(json.loads(out.stdout))
+    return {
+        "runs": runs,
+        "import_ms": statistics.median(r["import"] for r in results) * 1000,
+        "first_access_ms": statistics.median(r["schema"] for r in results) * 1000,
+        "total_ms": statistics.median(r["import"] + r["schema"] for r in results) * 1000,
+        "imports_matplotlib": any(r["matplotlib"] for r in results),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the startup cost of `import flexoki`.")
+    parser.add_argument("--runs", type=int, default=20, help="number of fresh interpreters to time")
+    parser.add_argument("--budget", type=float, default=100.0, help="maximum median time (ms) for import + first access of Flexoki")
+    args = parser.parse_args(argv)
+
+    result = run(args.runs)
+    result["budget_ms"] = args.budget
+    print(json.dumps(result, indent=2))
+
+    if result["imports_matplotlib"]:
+        print("FAIL: `import flexoki` imported matplotlib", file=sys.stderr)
+        return 1
+    if result["total_ms"] > args.budget:
+        print(f"FAIL: startup took {result['total_ms']:.1f}ms, over the budget of {args.budget:.1f}ms", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,347 @@
+# Benchmark suite for the hot paths of flexoki
+# Every benchmark is timed with timeit (taking the best of several repeats), and the results are written as JSON,
+# so that they can be stored and compared between releases; nothing here needs network access
+## Usage:
+## python benchmarks/run.py                                  (print the results)
+## python benchmarks/run.py --output results.json            (also save them)
+## python benchmarks/run.py --compare results.json           (compare against saved results; exits non-zero on a regression)
+## python benchmarks/run.py --filter colormap                (only run the benchmarks whose name contains "colormap")
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+
+# Making sure the package in this repository is the one being benchmarked
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import flexoki
+from flexoki import core
+import bench_import
+
+### Benchmarks ###
+# Each benchmark is a function taking the schema, and returning the callable to time (any set-up happens before the return)
+BENCHMARKS = {}
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+@benchmark("schema.construct")
+def _(F):
+    return lambda: flexoki.FlexokiSchema()
+
+# As in a new interpreter, where the index of colors has to be loaded (from the cache directory) before the schema is built
+@benchmark("schema.construct.cold")
+def _(F):
+    def run():
+        core._index = None
+        flexoki.FlexokiSchema()
+    return run
+
+# And where the index also has to be built from scratch (i.e. the first run, or when the cache can't be written)
+@benchmark("schema.index.build")
+def _(F):
+    return lambda: core._hydrate_index(core._build_index(core.color_table, core.h_codes, core.l_values))
+
+# Building a schema from another table of colors (the Flexoki table with an extra hue); "cold" checks and indexes the table every call,
+# "warm" finds it already indexed
+def _extended_table():
+    table = dict(core.color_table)
+    table.update({f"teal-{l}":{"h":"t", "l":l, "hex":"#1A7F7A"} for l in core.l_values[1:-1]})
+    return table, {**core.h_codes, "teal":"t"}, core.l_values
+
+@benchmark("schema.table.cold")
+def _(F):
+    args = _extended_table()
+    def run():
+        core._table_indexes.clear()
+        flexoki.FlexokiSchema(*args)
+    return run
+
+@benchmark("schema.table.warm")
+def _(F):
+    args = _extended_table()
+    return lambda: flexoki.FlexokiSchema(*args)
+
+# Filtering, across the different shapes of arguments accepted
+@benchmark("filter.h_str")
+def _(F):
+    return lambda: F.filter("red")
+
+@benchmark("filter.h_codes_l_int")
+def _(F):
+    return lambda: F.filter("roygcbpmk", 600)
+
+@benchmark("filter.h_list_l_list")
+def _(F):
+    return lambda: F.filter(["red","blue","green"], [100,300,500])
+
+@benchmark("filter.h_list_l_slice")
+def _(F):
+    return lambda: F.filter(["red","blue"], slice(150,700))
+
+@benchmark("filter.l_range_order_l_h")
+def _(F):
+    return lambda: F.filter(None, range(0,1000), order="l_h")
+
+@benchmark("filter.returns_hexes")
+def _(F):
+    return lambda: F.filter("b", None, returns="hexes")
+
+# Retrieving individual colors
+@benchmark("getitem.name")
+def _(F):
+    return lambda: F.colors["red-500"]
+
+@benchmark("getitem.spaced_upper")
+def _(F):
+    return lambda: F["Blue 600"]
+
+@benchmark("getitem.default")
+def _(F):
+    return lambda: F["red"]
+
+@benchmark("lookup.batch")
+def _(F):
+    names = ["red-500", "grey", "Blue 600", "pink_300", "paper"] * 20
+    return lambda: F.lookup(names, returns="hexes")
+
+# Colormaps; "cold" clears the colormap cache before every call, "warm" does not
+@benchmark("colormap.discrete.cold")
+def _(F):
+    palette = F.palettes.l600
+    def run():
+        core._colormap_cache.clear()
+        palette.to_colormap(kind="discrete")
+    return run
+
+@benchmark("colormap.smooth.cold")
+def _(F):
+    palette = F.palettes.reds
+    def run():
+        core._colormap_cache.clear()
+        palette.to_colormap(kind="smooth")
+    return run
+
+@benchmark("colormap.discrete.warm")
+def _(F):
+    palette = F.palettes.l600
+    return lambda: palette.to_colormap(kind="discrete")
+
+@benchmark("colormap.smooth.warm")
+def _(F):
+    palette = F.palettes.reds
+    return lambda: palette.to_colormap(kind="smooth")
+
+# Mapping a million values to colors directly, compared with going through the (cached) matplotlib colormap
+@benchmark("map_values.smooth")
+def _(F):
+    import numpy as np
+    values = np.random.default_rng(0).random(1_000_000)
+    out = np.empty(values.shape + (4,), dtype=np.uint8)
+    palette = F.palettes.reds
+    return lambda: palette.map_values(values, 0, 1, out=out)
+
+@benchmark("map_values.colormap")
+def _(F):
+    import numpy as np
+    values = np.random.default_rng(0).random(1_000_000)
+    cmap = F.palettes.reds.to_colormap(kind="smooth")
+    return lambda: cmap(values, bytes=True)
+
+# Deriving palettes; "cold" clears the cache of derived palettes before every call, "warm" does not
+@benchmark("algebra.diverging.cold")
+def _(F):
+    def run():
+        core._derived_cache.clear()
+        F.diverging("red", "blue", n=11)
+    return run
+
+@benchmark("algebra.diverging.warm")
+def _(F):
+    return lambda: F.diverging("red", "blue", n=11)
+
+@benchmark("algebra.resample.warm")
+def _(F):
+    palette = F.palettes.reds
+    return lambda: palette.resample(64)
+
+# Checking palettes with color vision deficiencies; "cold" clears the cached scores/orders before every call, "warm" does not
+@benchmark("cvd.check_all.cold")
+def _(F):
+    from flexoki import cvd
+    def run():
+        cvd._score_cache.clear()
+        F.check_cvd()
+    return run
+
+@benchmark("cvd.check_all.warm")
+def _(F):
+    return lambda: F.check_cvd()
+
+@benchmark("cvd.distinguishable.cold")
+def _(F):
+    from flexoki import cvd
+    def run():
+        cvd._order.cache_clear()
+        F.distinguishable(6)
+    return run
+
+@benchmark("cvd.distinguishable.warm")
+def _(F):
+    return lambda: F.distinguishable(6)
+
+# Registering with matplotlib; the first call does the work, and repeated calls should be close to free
+@benchmark("register_matplotlib.repeat")
+def _(F):
+    F.register_matplotlib()
+    return lambda: F.register_matplotlib()
+
+@benchmark("register_matplotlib.theme_switch")
+def _(F):
+    themes = itertools.cycle(["dark", "light"])
+    def run():
+        F.theme = next(themes)
+        F.register_matplotlib()
+    return run
+
+# Applying (and restoring) the matplotlib settings for a theme, as done once per figure
+@benchmark("style.enter_exit")
+def _(F):
+    def run():
+        with F.style(theme="dark"):
+            pass
+    return run
+
+@benchmark("style.enter_exit.fast")
+def _(F):
+    def run():
+        with F.style(theme="dark", fast=True):
+            pass
+    return run
+
+# Switching the theme/lightness of the schema, and the immutable alternative
+@benchmark("theme.switch")
+def _(F):
+    themes = itertools.cycle(["dark", "light"])
+    def run():
+        F.theme = next(themes)
+    return run
+
+@benchmark("theme.snapshot")
+def _(F):
+    return lambda: F.at(theme="dark").red
+
+# Neighbors and roles, as used when picking hover/text colors for a UI; both should be a lookup once built
+@benchmark("color.lighter_darker")
+def _(F):
+    c = F.colors.red
+    return lambda: c.lighter().darker(2)
+
+@benchmark("color.best_text")
+def _(F):
+    c = F.colors.red
+    c.best_text()
+    return lambda: c.best_text()
+
+@benchmark("theme.roles")
+def _(F):
+    return lambda: F.at(theme="dark").roles["error-hover"]
+
+### Running ###
+# Function for timing a single benchmark; returns the best and median time per call, in microseconds
+def time_benchmark(func, repeat: int=5, min_time: float=0.05):
+    timer = timeit.Timer(func)
+    # Picking the number of calls per repeat so that each repeat takes at least min_time seconds
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    times = sorted(t / number * 1e6 for t in timer.repeat(repeat=repeat, number=number))
+    return {"best_us": times[0], "median_us": times[len(times) // 2], "calls": number * repeat}
+
+def run(names=None, repeat: int=5, import_runs: int=10):
+    F = flexoki.FlexokiSchema()
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if names is not None and not any(n in name for n in names):
+            continue
+        results[name] = time_benchmark(setup(F), repeat=repeat)
+        # Resetting anything the benchmark may have changed
+        F.theme = "light"
+    if names is None or any(n in "import" for n in names):
+        imp = bench_import.run(import_runs)
+        results["import"] = {"best_us": imp["import_ms"] * 1000, "median_us": imp["import_ms"] * 1000, "calls": import_runs}
+        results["import.first_access"] = {"best_us": imp["total_ms"] * 1000, "median_us": imp["total_ms"] * 1000, "calls": import_runs}
+    return results
+
+def metadata():
+    try:
+        import matplotlib
+        mpl = matplotlib.__version__
+    except ImportError:
+        mpl = None
+    try:
+        from importlib.metadata import version
+        fx = version("flexoki")
+    except Exception:
+        fx = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "flexoki": fx,
+        "matplotlib": mpl,
+    }
+
+# Function for comparing results against a baseline; returns the names of the benchmarks that got slower than the threshold
+def compare(results, baseline, threshold: float):
+    regressions = []
+    for name, r in results.items():
+        if name not in baseline:
+            continue
+        ratio = r["best_us"] / baseline[name]["best_us"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{name:40s} {baseline[name]['best_us']:12.2f}us -> {r['best_us']:12.2f}us  ({ratio:5.2f}x){flag}", file=sys.stderr)
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the flexoki benchmark suite.")
+    parser.add_argument("--output", help="file to write the results to, as JSON")
+    parser.add_argument("--compare", help="JSON file of previous results to compare against")
+    parser.add_argument("--threshold", type=float, default=2.0, help="slowdown ratio (vs --compare) counted as a regression")
+    parser.add_argument("--filter", action="append", help="only run benchmarks whose name contains this (can be repeated)")
+    parser.add_argument("--repeat", type=int, default=5, help="number of repeats per benchmark")
+    parser.add_argument("--import-runs", type=int, default=10, help="number of fresh interpreters used to time the import")
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join(list(BENCHMARKS.keys()) + ["import", "import.first_access"]))
+        return 0
+
+    output = {"metadata": metadata(), "results": run(args.filter, args.repeat, args.import_runs)}
+    print(json.dumps(output, indent=2))
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        if len(compare(output["results"], baseline, args.threshold)) > 0:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
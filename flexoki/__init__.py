@@ -1,4 +1,23 @@
+from threading import Lock
 from .core import FlexokiSchema
 
 # An initialized object of the FlexokiSchema class
-Flexoki = FlexokiSchema()
\ No newline at end of file
+# This is only created the first time it is accessed (i.e. `from flexoki import Flexoki`), so that `import flexoki` stays light
+_lock = Lock()
+
+def __getattr__(name):
+    if name == "Flexoki":
+        global Flexoki
+        with _lock:
+            if "Flexoki" not in globals():
+                Flexoki = FlexokiSchema()
+        return Flexoki
+    # The async renderer is also only imported when it is used, as it imports asyncio
+    elif name == "render_many" or name == "Renderer":
+        from . import render
+        return getattr(render, name)
+    # As is the instrumentation (see flexoki.instrument)
+    elif name == "stats" or name == "measure":
+        from . import instrument
+        return getattr(instrument, name)
+    raise AttributeError(f"module 'flexoki' has no attribute '{name}'")
@@ -0,0 +1,308 @@
+from itertools import islice
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from flexoki.core import FlexokiSchema
+
+# The `flexoki` command, for using the colors from the shell (i.e. in scripts and pipelines)
+## Ex. `flexoki filter -H red`, `echo "#FF0000" | flexoki nearest -L 600`, `flexoki recolor *.png -o out/ --jobs 4`
+# Only the core module is imported up front (which does not import numpy or matplotlib), so that commands like filter and lookup
+# start quickly; numpy and matplotlib are only imported by the commands that need them
+# Inputs are read line by line (or in chunks of lines), so any amount of input can be piped through with bounded memory use
+# Commands over several files can run them on a pool of processes with --jobs
+
+# The number of lines of input processed at once by nearest
+CHUNK_LINES = 65536
+# The number of rows of an image processed at once by recolor (for .npy files, which are memory-mapped)
+CHUNK_ROWS = 1024
+
+# The schema used by the commands, created the first time it is needed (once per process)
+_schemas = {}
+
+def _schema():
+    schema = _schemas.get("schema")
+    if schema is None:
+        schema = _schemas["schema"] = FlexokiSchema()
+    return schema
+
+### Parsing ###
+# Function to parse --hue, which is either a string of codes/a hue name (i.e. "rb", "red"), or a comma-separated list (i.e. "red,blue")
+def _parse_h(h):
+    if h is None:
+        return None
+    return [c.strip() for c in h.split(",")] if "," in h else h
+
+# Function to parse --lightness, which is a value (i.e. "600"), a comma-separated list (i.e. "400,600"), or a range (i.e. "100-500")
+def _parse_l(l):
+    if l is None:
+        return None
+    try:
+        if "," in l:
+            return [int(v) for v in l.split(",")]
+        elif "-" in l.strip("-"):
+            start, stop = l.split("-", 1)
+            return slice(int(start), int(stop))
+        return int(l)
+    except ValueError:
+        raise Exception(f"Invalid input for lightness: {l}; only a value (i.e. 600), a list (i.e. 400,600) or a range (i.e. 100-500) is accepted.")
+
+# Function to parse a variant for export, which is a theme (i.e. "light") or a lightness value (i.e. "600")
+def _parse_variant(v):
+    return int(v) if v.isdigit() else v
+
+# Function to parse a color written as a hex code (i.e. "#FF0000" or "ff0000") or as rgb values (i.e. "255,0,0" or "255 0 0")
+def _parse_rgb(line):
+    s = line.strip()
+    if s.startswith("#") or (len(s) == 6 and not any(c in s for c in ", ")):
+        s = s.lstrip("#")
+        if len(s) == 6:
+            try:
+                return (int(s[0:2], 16), int(s[2:4], 16), int(s[4:6], 16))
+            except ValueError:
+                pass
+    else:
+        values = s.replace(",", " ").split()
+        if len(values) == 3 and all(v.isdigit() and int(v) <= 255 for v in values):
+            return tuple(int(v) for v in values)
+    raise Exception(f"Invalid color: {line.strip()!r}; only hex codes (i.e. #FF0000) or rgb values (i.e. 255,0,0) are accepted.")
+
+### Output ###
+# Function to write a color out in the chosen --format
+def _format(c, format):
+    if format == "hex":
+        return c.hex
+    elif format == "name":
+        return c.name
+    elif format == "rgb":
+        return "{},{},{}".format(*c.rgb)
+    return "{}\t{}\t{},{},{}".format(c.name, c.hex, *c.rgb)
+
+### Inputs ###
+# Generator for the (stripped, non-empty) lines of the given paths in order, where "-" (or no paths) is stdin
+def _lines(paths):
+    for path in paths or ["-"]:
+        if path == "-":
+            f = sys.stdin
+        else:
+            f = open(path)
+        try:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+# Generator for the chunks of an iterable, as lists of up to size items
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+# Function to run func over items, yielding the results in order
+# If jobs is more than 1 (and there is more than one item), the items are run on a pool of that many processes
+def _map(func, items, jobs):
+    if jobs < 1:
+        raise Exception(f"Invalid input for jobs: {jobs}; only positive integers are accepted.")
+    if jobs == 1 or len(items) < 2:
+        for i in items:
+            yield func(*i)
+    else:
+        # Imported here, as importing it (and multiprocessing) would more than double how long it takes to start
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(jobs, len(items))) as pool:
+            yield from pool.map(func, *zip(*items))
+
+# Function for the path of an output file, with the same name as the input file, within directory
+def _output_path(directory, path):
+    return os.path.join(directory, os.path.basename(path))
+
+### Commands ###
+# filter: prints the colors matching --hue and --lightness, one per line
+def _filter(args):
+    colors = _schema().filter(_parse_h(args.hue), _parse_l(args.lightness), args.order, returns="colors")
+    sys.stdout.writelines(_format(c, args.format) + "\n" for c in colors)
+    return 0
+
+# lookup: prints the color for each name (i.e. red-600, or red for the default red of --theme), from the arguments or line by line from stdin
+def _lookup(args):
+    schema = _schema()
+    snapshot = schema.at(theme=args.theme) if args.theme is not None else schema.at(lightness=args.lightness)
+    status = 0
+    for name in (args.names if args.names else _lines(["-"])):
+        try:
+            sys.stdout.write(_format(snapshot[name], args.format) + "\n")
+        except Exception as e:
+            # Unknown names are reported (and skipped) without stopping, so the rest of the input is still looked up
+            print(f"flexoki: {e}", file=sys.stderr)
+            status = 1
+    return status
+
+# Function to map lines of colors onto the nearest colors of palette (a chunk of lines at a time), writing one result per line
+def _nearest_lines(lines, palette, format, chunk_lines, write):
+    colors = palette.colors
+    formatted = [_format(c, format) + "\n" for c in colors]
+    for chunk in _chunks(lines, chunk_lines):
+        indices = palette.quantize([_parse_rgb(line) for line in chunk])
+        write("".join([formatted[i] for i in indices.tolist()]))
+
+# Function to run nearest over a single file, writing the results to the file out (and returning its path)
+def _nearest_file(path, out, h, l, format, chunk_lines):
+    palette = _schema().filter(h, l, returns="palette")
+    with open(out, "w") as f:
+        _nearest_lines(_lines([path]), palette, format, chunk_lines, f.write)
+    return out
+
+# nearest: maps colors (hex codes or rgb values, one per line) onto the nearest Flexoki colors matching --hue and --lightness
+# Without --output, the results are printed (in the order of the files); with it, one file of results is written per input file
+def _nearest(args):
+    h, l = _parse_h(args.hue), _parse_l(args.lightness)
+    files = args.files or ["-"]
+    # With a single input (i.e. stdin) printed straight out, each chunk is written as soon as it is ready
+    if args.output is None and (len(files) == 1 or args.jobs == 1):
+        palette = _schema().filter(h, l, returns="palette")
+        for path in files:
+            _nearest_lines(_lines([path]), palette, args.format, args.chunk_lines, sys.stdout.write)
+        return 0
+    if "-" in files:
+        raise Exception("Invalid input for files: stdin (-) cannot be used with --output, or with --jobs over several files.")
+    if args.output is not None:
+        os.makedirs(args.output, exist_ok=True)
+        outs = [_output_path(args.output, f) for f in files]
+        for out in _map(_nearest_file, [(f, out, h, l, args.format, args.chunk_lines) for f, out in zip(files, outs)], args.jobs):
+            print(out)
+        return 0
+    # Without --output, each process writes its results to a temporary file (rather than holding them in memory),
+    # and each file is copied out to stdout (and deleted) in the order of the files, as soon as it is ready
+    with tempfile.TemporaryDirectory(prefix="flexoki-") as directory:
+        outs = [os.path.join(directory, f"{i}.txt") for i in range(len(files))]
+        for out in _map(_nearest_file, [(f, out, h, l, args.format, args.chunk_lines) for f, out in zip(files, outs)], args.jobs):
+            with open(out) as f:
+                shutil.copyfileobj(f, sys.stdout)
+            os.remove(out)
+    return 0
+
+# Function to recolor a single image file onto the colors matching h and l, writing it to a file in output and returning its path
+## .npy files are memory-mapped, and recolored (and written) in bands of chunk_rows rows, unless using floyd-steinberg dithering
+## other files are read and written with matplotlib (so any format it supports, i.e. png), keeping any alpha channel as it is
+def _recolor_file(path, h, l, dither, chunk_rows, output):
+    import numpy as np
+    from flexoki.recolor import recolor_array
+    palette_rgb = _schema().filter(h, l, returns="palette").rgb(array=True)
+    out = _output_path(output, path)
+    if path.endswith(".npy"):
+        pixels = np.load(path, mmap_mode="r")
+        if pixels.ndim != 3 or dither == "floyd-steinberg":
+            np.save(out, recolor_array(pixels, palette_rgb, dither=dither))
+            return out
+        result = np.lib.format.open_memmap(out, mode="w+", dtype=pixels.dtype, shape=pixels.shape)
+        for start in range(0, pixels.shape[0], chunk_rows):
+            rows = slice(start, start + chunk_rows)
+            result[rows] = recolor_array(pixels[rows], palette_rgb, dither=dither, offset=(start, 0))
+        result.flush()
+        return out
+
+    import matplotlib.image
+    image = matplotlib.image.imread(path)
+    if image.ndim != 3 or image.shape[-1] not in [3, 4]:
+        raise Exception(f"Invalid image: {path}; only RGB or RGBA images are accepted.")
+    recolored = recolor_array(np.ascontiguousarray(image[..., :3]), palette_rgb, dither=dither)
+    if image.shape[-1] == 4:
+        recolored = np.concatenate([recolored, image[..., 3:]], axis=-1)
+    matplotlib.image.imsave(out, recolored)
+    return out
+
+# recolor: recolors image files (or .npy arrays of shape (H,W,3)) onto the Flexoki colors matching --hue and --lightness
+# The files are written to --output with the same names, and the path of each is printed once it is written
+def _recolor(args):
+    h, l = _parse_h(args.hue), _parse_l(args.lightness)
+    os.makedirs(args.output, exist_ok=True)
+    for out in _map(_recolor_file, [(f, h, l, args.dither, args.chunk_rows, args.output) for f in args.files], args.jobs):
+        print(out)
+    return 0
+
+# export: writes themes for other tools (see FlexokiSchema.export), printing the path of each file and whether it was written
+# With a directory of "-", a single format and variant is printed instead
+def _export(args):
+    schema = _schema()
+    variants = [_parse_variant(v) for v in args.variant] if args.variant else ["light", "dark"]
+    if args.directory == "-":
+        from flexoki.export import render
+        if args.format is None or len(args.format) != 1 or len(variants) != 1:
+            raise Exception("Invalid input: exactly one --format and one --variant are needed to print a theme (with a directory of -).")
+        sys.stdout.write(render(schema, args.format[0], variants[0], prefix=args.prefix))
+        return 0
+    results = schema.export(args.directory, formats=args.format, variants=variants, prefix=args.prefix, max_workers=args.jobs, force=args.force)
+    for path, written in results.items():
+        print(f"{'written' if written else 'unchanged'}\t{path}")
+    return 0
+
+### Entry point ###
+def _parser():
+    parser = argparse.ArgumentParser(prog="flexoki", description="Work with the Flexoki colors from the command line.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    # Options shared by the commands that select colors, and those that print them
+    select = argparse.ArgumentParser(add_help=False)
+    select.add_argument("-H", "--hue", help="hues to use, as codes (i.e. rb), a name (i.e. red), or a comma-separated list (i.e. red,blue); defaults to all")
+    select.add_argument("-L", "--lightness", help="lightness values to use, as a value (i.e. 600), a list (i.e. 400,600) or a range (i.e. 100-500); defaults to all")
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--format", choices=["hex", "name", "rgb", "all"], default="hex", help="how to print each color (all is name, hex and rgb, tab-separated)")
+    jobs = argparse.ArgumentParser(add_help=False)
+    jobs.add_argument("-j", "--jobs", type=int, default=1, help="number of files to process at once (on separate processes)")
+
+    p = commands.add_parser("filter", parents=[select, output], help="print the colors matching a hue and/or lightness")
+    p.add_argument("--order", choices=["h_l", "l_h"], help="order by hue then lightness (h_l, the default), or lightness then hue (l_h)")
+    p.set_defaults(func=_filter)
+
+    p = commands.add_parser("lookup", parents=[output], help="print the colors for names (i.e. red-600), from the arguments or stdin")
+    p.add_argument("names", nargs="*", help="color names; if none are given, one name per line is read from stdin")
+    theme = p.add_mutually_exclusive_group()
+    theme.add_argument("--theme", choices=["light", "dark"], help="theme used for the default colors (i.e. red)")
+    theme.add_argument("--lightness", type=int, default=600, help="lightness used for the default colors (i.e. red); defaults to 600")
+    p.set_defaults(func=_lookup)
+
+    p = commands.add_parser("nearest", parents=[select, output, jobs], help="map colors (hex or rgb, one per line) onto the nearest Flexoki colors")
+    p.add_argument("files", nargs="*", help="files of colors, one per line; if none are given (or -), stdin is read")
+    p.add_argument("-o", "--output", help="directory to write one file of results per input file to, instead of printing them")
+    p.add_argument("--chunk-lines", type=int, default=CHUNK_LINES, help=f"number of lines processed at once (default {CHUNK_LINES})")
+    p.set_defaults(func=_nearest)
+
+    p = commands.add_parser("recolor", parents=[select, jobs], help="recolor images (or .npy arrays) onto the Flexoki colors")
+    p.add_argument("files", nargs="+", help="image files (any format matplotlib can read, i.e. png) or .npy arrays of shape (H,W,3)")
+    p.add_argument("-o", "--output", required=True, help="directory to write the recolored files to (with the same names)")
+    p.add_argument("--dither", choices=["ordered", "floyd-steinberg"], help="dithering to use; defaults to none")
+    p.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help=f"number of rows of .npy arrays processed at once (default {CHUNK_ROWS})")
+    p.set_defaults(func=_recolor)
+
+    p = commands.add_parser("export", help="write themes for other tools (css, json, mplstyle, pygments, ansi)")
+    p.add_argument("directory", help="directory to write the files to; with -, a single theme is printed instead")
+    p.add_argument("-f", "--format", action="append", help="format to write (can be repeated); defaults to all")
+    p.add_argument("-v", "--variant", action="append", help="theme (light or dark) or lightness value (i.e. 300) to write (can be repeated); defaults to light and dark")
+    p.add_argument("--prefix", default="flexoki", help="prefix for the file and color names (default flexoki)")
+    p.add_argument("--force", action="store_true", help="rewrite files even if they would not change")
+    p.add_argument("-j", "--jobs", type=int, default=None, help="number of threads to write files on")
+    p.set_defaults(func=_export)
+    return parser
+
+def main(argv=None):
+    args = _parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        # The reader went away (i.e. piped into head), so nothing else can be written; stdout is pointed at devnull so that
+        # flushing it on exit does not raise again
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except Exception as e:
+        print(f"flexoki: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,46 @@
 from typing import List, Optional, Tuple, Literal, Iterable
+from contextlib import contextmanager
 from dataclasses import dataclass
-import matplotlib
-import matplotlib.colors
-import matplotlib.cm
-from flexoki.utils import h_codes, l_values
+from types import MappingProxyType
+from collections import OrderedDict
+from threading import Lock
+from weakref import WeakSet, WeakValueDictionary
+import marshal
+import os
+import sys
+from flexoki.utils import h_codes, l_values, color_table, cache_dir
+
+# Maximum number of results memoized by each schema's filter() function
+_FILTER_CACHE_SIZE = 512
+
+# Set by flexoki.instrument while instrumentation is on, and called (with the name of the function) whenever a cache is missed
+# This is only checked on the slow paths, so costs nothing otherwise
+_on_miss = None
+# Every schema created, so that instrumentation can be added to (and removed from) their colors classes
+_schemas = WeakSet()
 
 ### Color ###
 # Class for each individual color in the palette
-@dataclass
+# Colors are immutable (frozen) and use __slots__, so they are small, hashable, and can be safely shared between palettes/schemas
+# __weakref__ allows the colors of every schema's table to be interned (see _intern() below)
+@dataclass(frozen=True)
 class Color:
+    __slots__ = ("name", "h", "l", "hex", "rgb", "__weakref__")
     name: str
     h: str
     l: int
     hex: str
     rgb: Tuple[int, int, int]
 
+    def __post_init__(self):
+        # Making sure rgb is always stored as a tuple (so that it is hashable)
+        if not isinstance(self.rgb, tuple):
+            object.__setattr__(self, "rgb", tuple(self.rgb))
+
+    # Needed for pickling (i.e. sending colors to other processes), as frozen classes with __slots__ cannot be unpickled by default
+    def __reduce__(self):
+        return (Color, (self.name, self.h, self.l, self.hex, self.rgb))
+
     def __str__(self):
         return f"{self.name} ({self.hex})"
     
@@ -55,239 +81,877 @@ class Color:
     def blue(self):
         return self.rgb[2]
 
+    # The color in the OKLab (L, a, b) and OKLCH (L, C, h) colorspaces
+    ## numpy is only imported once these are needed, to keep `import flexoki` light
+    @property
+    def oklab(self):
+        from flexoki.oklab import _oklab
+        return _oklab(tuple(self.rgb))
+    
+    @property
+    def oklch(self):
+        from flexoki.oklab import _oklch
+        return _oklch(tuple(self.rgb))
+
+    # Functions for the neighbors of the color in its hue, i.e. red-600.lighter() is red-500, and red-600.darker(2) is red-800
+    # n is the number of steps (through the lightness values that the hue has), stopping at the lightest/darkest color of the hue
+    # schema is the FlexokiSchema whose table the color comes from; if None, the Flexoki 2.0 table is used
+    # These are looked up from a table built once per table of colors (see _build_graph() below), so cost a single dictionary lookup
+    def lighter(self, n: int=1, schema=None):
+        return _step(self, -n, schema)
+
+    def darker(self, n: int=1, schema=None):
+        return _step(self, n, schema)
+
+    # Function for the color to use for text on top of this color: the lightest or darkest base color (i.e. paper or black),
+    # whichever has the higher (WCAG 2) contrast with it; schema is the same as for lighter()/darker()
+    def best_text(self, schema=None):
+        graph = _graph(schema)
+        text = graph["text"].get(self)
+        if text is None:
+            text = _best_text(self, graph["ends"])
+        return text
+
 ### Palette ###
 # Class for a list/collection of colors, with several helpers for modifying/extending the palette
 class Palette:
-    def __init__(self, colors=List[Color]):
-        # All the colors that make up the palette will be stored in a list
+    # Each palette stores its colors and hex codes as tuples, along with an (N,3) uint8 array of the rgb values
+    # The array is only built the first time it is needed (so that numpy is not imported until then), and then reused
+    __slots__ = ("_colors", "_hexes", "_hash", "_rgb", "_rgba")
+
+    def __init__(self, colors: List[Color]):
+        # All the colors that make up the palette will be stored in a tuple (which is also what Palette.colors returns)
         self.colors = colors
+
+    # The colors of the palette, as a tuple of Color objects
+    # This is the tuple stored by the palette, so it cannot be changed in place (i.e. palette.colors.append(c) raises an error);
+    # to change the colors, assign a new list to palette.colors instead
+    @property
+    def colors(self):
+        return self._colors
+
+    # Setting the colors resets everything derived from them
+    @colors.setter
+    def colors(self, colors):
+        self._colors = tuple(colors)
+        self._hexes = tuple(c.hex for c in self._colors)
+        self._hash = None
+        self._rgb = None
+        self._rgba = None
     
     def __getitem__(self, val):
-        return self.colors[val]
+        if isinstance(val, slice):
+            return list(self._colors[val])
+        return self._colors[val]
+
+    def __len__(self):
+        return len(self._colors)
+
+    def __iter__(self):
+        return iter(self._colors)
     
     def __str__(self):
         return self.colors
+
+    # Palettes are hashed by their hex codes (calculated once), and are equal if they contain the same colors
+    # This allows them to be used as cache keys; note that reversing a palette in place (reverse(copy=False)) changes its hash
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(self._hexes)
+        return self._hash
+
+    def __eq__(self, other):
+        if not isinstance(other, Palette):
+            return NotImplemented
+        return self is other or (self._hexes == other._hexes and self._colors == other._colors)
     
     # Function for returning the name
     def names(self):
-        return [c.name for c in self.colors]
+        return [c.name for c in self._colors]
     
     # Function for accessing the hex and rgb(a) values
     # If names=True is passed to the function, will return a dict with names as key and hex/rgb(a) as values
+    # If array=True is passed to rgb/rgba, will instead return a read-only numpy array of uint8 values, of shape (N,3) or (N,4)
+    ## this is the array stored by the palette (not a copy), so it is cheap to call repeatedly; for rgba, the alpha values are 255
     def hex(self, names: bool=False):
         if names == True:
-            return {c.name:c.hex for c in self.colors}
+            return {c.name:c.hex for c in self._colors}
         else:
-            return [c.hex for c in self.colors]
+            return list(self._hexes)
     
-    def rgb(self, names: bool=False):
-        if names == True:
-            return {c.name:c.rgb for c in self.colors}
+    def rgb(self, names: bool=False, array: bool=False):
+        if names == True and array == True:
+            raise Exception(f"Invalid input: names and array cannot both be True, see documentation for details.")
+        elif array == True:
+            if self._rgb is None:
+                import numpy as np
+                rgb = np.array([c.rgb for c in self._colors], dtype=np.uint8).reshape(-1, 3)
+                rgb.flags.writeable = False
+                self._rgb = rgb
+            return self._rgb
+        elif names == True:
+            return {c.name:c.rgb for c in self._colors}
         else:
-            return [c.rgb for c in self.colors]
+            return [c.rgb for c in self._colors]
 
-    def rgba(self, names: bool=False):
-        if names == True:
-            return {c.name:c.rgba for c in self.colors}
+    def rgba(self, names: bool=False, array: bool=False):
+        if names == True and array == True:
+            raise Exception(f"Invalid input: names and array cannot both be True, see documentation for details.")
+        elif array == True:
+            if self._rgba is None:
+                import numpy as np
+                rgba = np.full((len(self._colors), 4), 255, dtype=np.uint8)
+                rgba[:, :3] = self.rgb(array=True)
+                rgba.flags.writeable = False
+                self._rgba = rgba
+            return self._rgba
+        elif names == True:
+            return {c.name:c.rgba for c in self._colors}
         else:
-            return [c.rgba for c in self.colors]
+            return [c.rgba for c in self._colors]
     
+    # Functions for accessing the colors in the OKLab and OKLCH colorspaces, as an (N,3) array
+    def oklab(self):
+        from flexoki.oklab import srgb_to_oklab
+        return srgb_to_oklab(self.rgb(array=True))
+
+    def oklch(self):
+        from flexoki.oklab import srgb_to_oklch
+        return srgb_to_oklch(self.rgb(array=True))
+
+    # Functions for comparing every pair of colors at once, returned as an (N,N) array (or (N,M), if another palette is passed)
+    # contrast is the WCAG 2 contrast ratio (between 1 and 21), and delta_e is the perceptual distance between colors in OKLab
+    # The results are cached (and read-only), so asking again for the same palettes is cheap
+    def contrast(self, other=None):
+        from flexoki.metrics import cached_matrix
+        return cached_matrix("contrast", self.rgb(array=True), None if other is None else other.rgb(array=True))
+
+    def delta_e(self, other=None):
+        from flexoki.metrics import cached_matrix
+        return cached_matrix("delta_e", self.rgb(array=True), None if other is None else other.rgb(array=True))
+
+    # Functions for checking how the palette looks with a color vision deficiency (CVD), see flexoki.cvd for details
+    # simulate returns the palette as it appears with the deficiency, where kind is "protan", "deutan" or "tritan"
+    ## severity is between 0 (normal vision) and 1 (the full deficiency); the simulated colors are named i.e. red-600-deutan
+    def simulate(self, kind: Literal["protan","deutan","tritan"]="deutan", severity: float=1.0):
+        from flexoki.cvd import simulate
+        if not isinstance(severity, (int, float)) or not 0 <= severity <= 1:
+            raise Exception(f"Invalid input for severity: {severity}; only numbers between 0 and 1 are accepted.")
+        def build():
+            import numpy as np
+            rgb = np.rint(simulate(self.rgb(array=True), kind, severity)).astype(np.uint8).tolist()
+            return [Color(f"{c.name}-{kind}", c.h, c.l, "#{:02X}{:02X}{:02X}".format(*v), tuple(v)) for c,v in zip(self._colors, rgb)]
+        return _derived(("simulate", self._colors, kind, float(severity)), build)
+
+    # check_cvd returns the smallest distance (deltaE) between any two colors of the palette, for normal vision and with each deficiency
+    ## i.e. {"normal": 0.08, "protan": 0.03, "deutan": 0.02, "tritan": 0.05}; kinds can limit the deficiencies checked (if None, all of them)
+    # The results are cached, so checking the same palette again is cheap
+    def check_cvd(self, kinds: List[str]=None, severity: float=1.0):
+        from flexoki.cvd import check, parse_kinds
+        return check([self.rgb(array=True)], parse_kinds(kinds), severity)[0]
+
     # Function for reversing the order of colors if needed
     def reverse(self, copy=True):
         if copy == True:
-            return Palette(self.colors[::-1])
+            return Palette(self._colors[::-1])
         else:
-            self.colors = self.colors[::-1]
+            self.colors = self._colors[::-1]
             return self
 
+    # Functions for deriving new palettes, by interpolating between colors in OKLab (see "Palette algebra" below for how new colors are named)
+    # The results are cached by the colors of the palette(s), the operation and its parameters, so asking again returns immediately
+    # resample returns n colors, evenly spaced along the palette (i.e. the first and last colors are kept, and the rest interpolated)
+    def resample(self, n: int):
+        if not isinstance(n, int) or n < 1:
+            raise Exception(f"Invalid input for n: {n}; only positive integers are accepted.")
+        elif len(self._colors) == 0:
+            raise Exception("Invalid palette: at least one color is needed to resample.")
+        return _derived(("resample", self._colors, n), lambda: _sample(self._colors, _linspace(0, 1, n)))
+
+    # interpolate returns the palette t of the way between this palette and other (which must have the same number of colors)
+    ## i.e. t=0 gives this palette, t=1 gives other, and t=0.5 is halfway between each pair of colors
+    def interpolate(self, other, t: float):
+        if not isinstance(other, Palette) or len(other) != len(self):
+            raise Exception(f"Invalid input for other: only Palettes with the same number of colors ({len(self)}) can be interpolated between.")
+        elif not isinstance(t, (int, float)) or not 0 <= t <= 1:
+            raise Exception(f"Invalid input for t: {t}; only numbers between 0 and 1 are accepted.")
+        return _derived(("interpolate", self._colors, other._colors, float(t)),
+                        lambda: _blend(self._colors, other._colors, [float(t)] * len(self)))
+
+    # mix returns the palette with each color mixed with another color (i.e. paper, to lighten it, or black, to darken it)
+    ## ratio is how much of color is mixed in (0 leaves the palette as it is, 1 replaces every color), either for all colors or as a list (one per color)
+    def mix(self, color: Color, ratio: float | List[float]):
+        if not isinstance(color, Color):
+            raise Exception(f"Invalid input for color: {color}; only Color objects are accepted (i.e. Flexoki.colors.paper).")
+        ratios = [ratio] * len(self) if isinstance(ratio, (int, float)) else list(ratio)
+        if len(ratios) != len(self) or not all(isinstance(r, (int, float)) and 0 <= r <= 1 for r in ratios):
+            raise Exception(f"Invalid input for ratio: {ratio}; only a number between 0 and 1, or a list of these (one per color), is accepted.")
+        ratios = tuple(float(r) for r in ratios)
+        return _derived(("mix", self._colors, color, ratios), lambda: _blend(self._colors, [color] * len(self), ratios))
+
+    # Function to map an array of RGB values onto the nearest colors of the palette
+    # pixels must be an array with a final dimension of 3, i.e. (N,3) or (H,W,3)
+    ## integer arrays are treated as 0-255 values, while float arrays are treated as 0-1 values (as in matplotlib)
+    # returns can be either "indices" (the index of the nearest palette color for each pixel) or "pixels" (the remapped array)
+    # chunk_size is the number of pixels processed at once, which bounds the memory used for large inputs
+    # lut is the number of bits per channel of a precomputed lookup table to use instead (i.e. 5 for 32x32x32, or 6 for 64x64x64)
+    ## this is much faster, but approximate (each pixel gets the nearest color to the center of its bin); if None, the exact search is used
+    def quantize(self, pixels, returns: Literal["indices","pixels"]="indices", chunk_size: int=None, lut: int=None):
+        # numpy is only imported once it is needed, to keep `import flexoki` light
+        if lut is None:
+            from flexoki.quantize import quantize
+            return quantize(pixels, self.rgb(array=True), returns=returns, chunk_size=chunk_size)
+        
+        from flexoki.lut import apply_lut
+        if returns not in ["indices", "pixels"]:
+            raise Exception(f"Invalid input for returns: {returns}; only 'indices' and 'pixels' are acceptable values, see documentation for details.")
+        indices = apply_lut(pixels, self.lut(lut))
+        if returns == "indices":
+            return indices
+        elif getattr(pixels, "dtype", None) is not None and pixels.dtype.kind == "f":
+            return (self.rgb(array=True) / 255.0).astype(pixels.dtype)[indices]
+        else:
+            return self.rgb(array=True)[indices]
+
+    # Function to get the precomputed lookup table (a uint8 array of shape (2^bits, 2^bits, 2^bits)) mapping RGB values to the palette
+    # Tables are built once, cached on disk under a hash of the palette, and memory-mapped when loaded (see flexoki.lut)
+    def lut(self, bits: int=6, cache: bool=True):
+        from flexoki.lut import load_lut
+        return load_lut(self.rgb(array=True), bits=bits, cache=cache)
+
+    # Function to map an array of scalar values to colors, without needing matplotlib (but with the same results as to_colormap())
+    # values can be any array-like of numbers, with vmin/vmax giving the range mapped onto the palette (if None, the min/max of values)
+    ## values outside of the range get the first/last color, and NaN values are transparent (0,0,0,0)
+    # kind can be "discrete" (one color per bin) or "smooth" (interpolated between the colors)
+    # bins is the number of bins (for "discrete", defaulting to one per color) or the size of the table (for "smooth", defaulting to 256)
+    # out is an optional uint8 array of shape values.shape + (4,) (or + (3,), for RGB) to write into, instead of allocating a new one
+    # Returns a uint8 RGBA (or RGB) array; the table of colors is built once per palette, kind and bins, and then cached
+    def map_values(self, values, vmin: float=None, vmax: float=None, kind: Literal["discrete","smooth"]="smooth", bins: int=None, out=None):
+        from flexoki.mapping import table, map_values
+        if not isinstance(kind, str) or kind.lower() not in ["discrete", "smooth"]:
+            raise Exception(f"Invalid input for kind: {kind}; the only accepted values are 'discrete' or 'smooth'.")
+        return map_values(values, table(self.rgb(array=True), kind=kind.lower(), size=bins), vmin=vmin, vmax=vmax, out=out)
+
+    # Function to color a categorical column (a pandas/Polars Series, or an Arrow array), with one color of the palette per category
+    # Returns a dictionary-encoded column of hex codes (or an array of rgb(a) values), see flexoki.frames.color_column for details
+    ## mapping is an optional dict of {category: Color or hex code}, for categories that need a particular color
+    def color_column(self, column, mapping: dict=None, returns: Literal["hex","rgb","rgba"]="hex"):
+        from flexoki.frames import color_column
+        return color_column(column, self, mapping=mapping, returns=returns)
+
+    # Generator to recolor a stream of images/frames (or paths to .npy files) onto the palette, yielding each one as it is ready
+    # Optionally with dithering, and on a process pool; see flexoki.recolor.recolor for details on the arguments
+    def recolor(self, frames: Iterable, dither: Literal["ordered","floyd-steinberg"]=None, returns: Literal["pixels","indices"]="pixels",
+                strength: float=None, processes: int=None, prefetch: int=None):
+        from flexoki.recolor import recolor
+        return recolor(frames, self, dither=dither, returns=returns, strength=strength, processes=processes, prefetch=prefetch)
+
     # Function to create a matplotlib colormap from the selected palette
     # If kind is set to 'discrete', will create a Listed Colormap
     # If kind is set to 'smooth', will create a LinearSegmentedColormap
+    # N is the number of colors in the colormap; if None, defaults to the number of colors in the palette (discrete) or 256 (smooth)
     # If register is a string, that will be used to register it with matplotlib's colormaps list
-    def to_colormap(self, kind: Literal["discrete", "smooth"]="discrete", register=None):
+    ## Registering is optional, and only done once for each name: asking again for the same colormap and name does nothing
+    # Colormaps are cached (see _colormap_cache below), so asking twice for the same palette, kind and N returns the same object
+    def to_colormap(self, kind: Literal["discrete", "smooth"]="discrete", register: str=None, N: int=None):
         if not isinstance(kind, str):
             raise Exception(f"Invalid input for kind: {kind}; the only accepted values are 'discrete' (for ListedColormaps) or 'smooth' (for LinearSegmentedColormaps).")
         elif kind.lower() not in ["discrete", "smooth"]:
             raise Exception(f"Invalid input for kind: {kind}; the only accepted values are 'discrete' (for ListedColormaps) or 'smooth' (for LinearSegmentedColormaps).")
-        else:
+        elif register is not None and not isinstance(register, str):
+            raise Exception(f"Invalid input for register: {register}; only strings are accepted.")
+        elif N is not None and (not isinstance(N, int) or N < 1):
+            raise Exception(f"Invalid input for N: {N}; only positive integers are accepted.")
+        
+        kind = kind.lower()
+        key = (tuple(self.hex()), kind, N)
+        # Checking the cache first
+        with _colormap_lock:
+            cmap = _colormap_cache.get(key)
+            if cmap is not None:
+                _colormap_cache.move_to_end(key)
+        
+        if cmap is None:
+            if _on_miss is not None:
+                _on_miss("Palette.to_colormap")
+            # matplotlib is only imported once it is needed, to keep `import flexoki` light
+            import matplotlib.colors
             if kind == "discrete":
-                cmap = matplotlib.colors.ListedColormap(self.hex())
-                matplotlib.colormaps.unregister("from_list") # unregistering this specific colormap
+                cmap = matplotlib.colors.ListedColormap(self.hex(), name="from_list")
+                if N is not None and N != len(self._colors):
+                    cmap = cmap.resampled(N)
             else:
-                cmap = matplotlib.colors.LinearSegmentedColormap.from_list("mycmap", self.hex())
-                matplotlib.colormaps.unregister("mycmap") # unregistering this specific colormap
+                cmap = matplotlib.colors.LinearSegmentedColormap.from_list("mycmap", self.hex(), N=256 if N is None else N)
+            # Storing it, and evicting the least recently used colormaps once the cache is full
+            # (if another thread built the same colormap in the meantime, theirs is kept so that only one object is ever returned)
+            with _colormap_lock:
+                cmap = _colormap_cache.setdefault(key, cmap)
+                _colormap_cache.move_to_end(key)
+                while len(_colormap_cache) > _COLORMAP_CACHE_SIZE:
+                    _colormap_cache.popitem(last=False)
 
-            if register is not None and not isinstance(register, str):
-                raise Exception(f"Invalid input for register: {register}; only strings are accepted.")
-            else:
-                matplotlib.colormaps.register(cmap, name=register)
-            
-            return cmap
+        if register is not None:
+            import matplotlib
+            with _colormap_lock:
+                # Only touching matplotlib's (global) registry if this name is not already registered to this colormap
+                if _colormap_registered.get(register) is not cmap or register not in matplotlib.colormaps:
+                    matplotlib.colormaps.register(cmap, name=register, force=register in _colormap_registered)
+                    _colormap_registered[register] = cmap
         
+        return cmap
+
+# Cache of the colormaps created by Palette.to_colormap(), keyed by (hex codes, kind, N), with least-recently-used eviction
+_COLORMAP_CACHE_SIZE = 128
+_colormap_cache = OrderedDict()
+# The colormaps registered with matplotlib by Palette.to_colormap(), keyed by the name they were registered under
+_colormap_registered = {}
+_colormap_lock = Lock()
+
+### Palette algebra ###
+# New colors are named by hue and their (rounded, interpolated) lightness where both colors share a hue (i.e. red-88, as in ramp()),
+# and by their hex code otherwise; colors that land exactly on an existing color are that Color, rather than a copy
+## where that name is already taken by a Flexoki color with a different hex code (i.e. halfway between red-400 and red-600 is close to,
+## but not exactly, red-500), "-mix" is added to the name (i.e. red-500-mix), so that it cannot be mistaken for (or registered over) it
+# The hue names used are the first name for each hue code (i.e. base, red, purple)
+_hue_names = {}
+for _n,_c in h_codes.items():
+    _hue_names.setdefault(_c, _n)
+
+# Cache of the derived colors, keyed by (operation, colors, parameters), with least-recently-used eviction
+# Only the (immutable) colors are stored, and a new Palette is returned each time, as Palettes can be changed in place
+_DERIVED_CACHE_SIZE = 256
+_derived_cache = OrderedDict()
+_derived_lock = Lock()
+
+def _derived(key, build):
+    with _derived_lock:
+        colors = _derived_cache.get(key)
+        if colors is not None:
+            _derived_cache.move_to_end(key)
+    if colors is None:
+        colors = tuple(build())
+        with _derived_lock:
+            _derived_cache[key] = colors
+            while len(_derived_cache) > _DERIVED_CACHE_SIZE:
+                _derived_cache.popitem(last=False)
+    return Palette(colors)
+
+def _linspace(start, stop, n):
+    return [start] if n == 1 else [start + (stop - start) * i / (n - 1) for i in range(n)]
+
+# Function to blend two lists of colors (pairwise) in OKLab, where t is how far along each pair to go (0 for a, 1 for b)
+# All the pairs are converted and interpolated in a single pass
+def _blend(a, b, t):
+    import numpy as np
+    from flexoki.oklab import srgb_to_oklab, oklab_to_srgb
+    t = np.asarray(t, dtype=np.float64)[:, None]
+    lab = srgb_to_oklab([c.rgb for c in a]) * (1 - t) + srgb_to_oklab([c.rgb for c in b]) * t
+    rgb = np.rint(oklab_to_srgb(lab)).astype(np.uint8).tolist()
+    colors = []
+    for ca, cb, tt, values in zip(a, b, t[:, 0].tolist(), rgb):
+        if tt == 0 or ca.hex == cb.hex:
+            colors.append(ca)
+        elif tt == 1:
+            colors.append(cb)
+        else:
+            hex = "#{:02X}{:02X}{:02X}".format(*values)
+            light = round(ca.l + (cb.l - ca.l) * tt)
+            hue = ca.h if tt < 0.5 else cb.h
+            if ca.h != cb.h:
+                colors.append(Color(hex, hue, light, hex, tuple(values)))
+                continue
+            existing = _load_index()["by_hl"].get((hue, light))
+            if existing is not None and existing.hex == hex:
+                colors.append(existing)
+            else:
+                name = f"{_hue_names.get(hue, hue)}-{light}" + ("-mix" if existing is not None else "")
+                colors.append(Color(name, hue, light, hex, tuple(values)))
+    return colors
+
+# Function to sample a list of colors at positions between 0 (the first color) and 1 (the last), with the colors evenly spaced
+def _sample(colors, positions):
+    k = len(colors)
+    if k == 1:
+        return [colors[0]] * len(positions)
+    a, b, t = [], [], []
+    for x in positions:
+        i = min(int(x * (k - 1)), k - 2)
+        a.append(colors[i])
+        b.append(colors[i + 1])
+        t.append(x * (k - 1) - i)
+    return _blend(a, b, t)
+
+### Neighbors ###
+# Function for the neighbor graph of a table of colors, built once per table (when its index is hydrated)
+# rows is one color per lightness value of each hue, from lightest to darkest (see _hydrate_index()), so each step is to the next lightness
+# value that the hue has, whatever order the table lists its colors in
+## "steps" maps each color to the row of its hue and its position in it
+### colors that are not in a row (base-0/base-1000, or others with the same hue and lightness as a color in the row) take the position
+### of the color in the row (i.e. paper/black), so they have the same neighbors
+## "ends" is the lightest and darkest base colors (i.e. paper and black), which are the candidates for best_text()
+## "text" maps each color to its best_text(), filled in the first time it is needed (as it is calculated for every color at once)
+def _build_graph(colors, rows, by_hl):
+    steps = {}
+    for row in rows.values():
+        for i,c in enumerate(row):
+            steps[c] = (row, i)
+    for c in colors:
+        if c not in steps and (c.h,c.l) in by_hl:
+            steps[c] = steps[by_hl[(c.h,c.l)]]
+    base = rows.get("k", ())
+    return {"steps":MappingProxyType(steps), "ends":(base[0], base[-1]) if len(base) > 0 else (), "text":{}}
+
+_graph_lock = Lock()
+
+# Function for the graph of a schema (or of the Flexoki 2.0 table, if schema is None)
+def _graph(schema):
+    graph = _load_index()["graph"] if schema is None else schema.colors._graph
+    if len(graph["text"]) == 0 and len(graph["ends"]) > 0:
+        with _graph_lock:
+            if len(graph["text"]) == 0:
+                graph["text"].update({c:_best_text(c, graph["ends"]) for c in graph["steps"]})
+    return graph
+
+def _step(color, n, schema):
+    if not isinstance(n, int):
+        raise Exception(f"Invalid input for n: {n}; only integers are accepted.")
+    graph = _load_index()["graph"] if schema is None else schema.colors._graph
+    step = graph["steps"].get(color)
+    if step is None:
+        raise Exception(f"Invalid color: {color.name}; only colors from the table of the schema (if passed, otherwise Flexoki 2.0) have neighbors.")
+    row, i = step
+    return row[min(max(i + n, 0), len(row) - 1)]
+
+# Function for the WCAG 2 relative luminance of a color (as in flexoki.metrics, but for a single color, without numpy)
+def _luminance(rgb):
+    lin = [v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4 for v in (x / 255 for x in rgb)]
+    return 0.2126 * lin[0] + 0.7152 * lin[1] + 0.0722 * lin[2]
+
+def _best_text(color, ends):
+    if len(ends) == 0:
+        raise Exception("Invalid table: there are no base colors to use for text.")
+    l = _luminance(color.rgb) + 0.05
+    ratios = [max(l, _luminance(e.rgb) + 0.05) / min(l, _luminance(e.rgb) + 0.05) for e in ends]
+    return ends[0] if ratios[0] >= ratios[1] else ends[1]
+
+### Roles ###
+# The UI colors for the light and dark themes, as defined by Flexoki, given by the lightness value of the base color used for each
+# (i.e. paper is 0, base-50 is 50, and black is 1000); also used by flexoki.export
+_UI = {
+    "light": {"bg":0, "bg-2":50, "ui":100, "ui-2":150, "ui-3":200, "tx-3":300, "tx-2":600, "tx":1000},
+    "dark": {"bg":1000, "bg-2":950, "ui":900, "ui-2":850, "ui-3":800, "tx-3":700, "tx-2":500, "tx":200},
+}
+# The semantic roles, and the default color (hue) used for each
+_ROLES = {"error":"red", "warning":"orange", "success":"green", "info":"blue", "accent":"cyan"}
+
+# Function for the color of a hue closest to a lightness value (the lighter one, if two are as close), for tables that do not have
+# every lightness value Flexoki has (i.e. a custom table with only a few base colors)
+def _nearest_lightness(colors, h, l):
+    return min(colors._rows[h], key=lambda c: (abs(c.l - l), c.l))
+
+# Function for the UI colors of a snapshot, as a dict of {token: Color}
+# Snapshots without a theme use the light UI colors if their lightness is 500 or more (i.e. darker accents), and the dark ones otherwise
+def _ui_colors(snapshot):
+    theme = snapshot.theme if snapshot.theme is not None else "light" if snapshot.lightness >= 500 else "dark"
+    return {t:_nearest_lightness(snapshot._colors, "k", l) for t,l in _UI[theme].items()}
+
+### Snapshot ###
+# Class for an immutable view of the default colors of a FlexokiSchema at a single lightness value (i.e. for one theme)
+# These are built once per lightness value by FlexokiSchema.at(), and can be shared between threads without any locking,
+# as (unlike FlexokiSchema.lightness/theme) nothing about them can be changed after they are created
+class Snapshot:
+    __slots__ = ("lightness", "theme",
+                 "red", "orange", "yellow", "green", "cyan", "blue", "purple", "magenta", "base",
+                 "_colors", "_defaults", "_defaults_named", "_roles")
+    
+    # The names of the default colors, in the order they are stored
+    _names = ("red", "orange", "yellow", "green", "cyan", "blue", "purple", "magenta", "base")
+
+    def __init__(self, colors, lightness: int):
+        # Attributes can only be set here, using object.__setattr__ (see __setattr__ below)
+        _set = object.__setattr__
+        _set(self, "lightness", lightness)
+        _set(self, "theme", "light" if lightness == 600 else "dark" if lightness == 400 else None)
+        _set(self, "_colors", colors)
+        defaults = tuple(colors.filter("roygcbpmk", lightness, "h_l", "colors"))
+        for n,c in zip(self._names, defaults):
+            _set(self, n, c)
+        _set(self, "_defaults", defaults)
+        # The versions of the defaults with short names (i.e. red, green), matching colors.get_defaults(override_names=True)
+        names = list(self._names[:-1]) + ["paper" if lightness == 0 else "black" if lightness == 1000 else "base"]
+        _set(self, "_defaults_named", tuple(Color(n, c.h, c.l, c.hex, c.rgb) for n,c in zip(names, defaults)))
+        _set(self, "_roles", None)
+
+    def __setattr__(self, name, value):
+        raise Exception(f"Snapshots cannot be modified; use FlexokiSchema.at() to get the snapshot for another lightness value.")
+
+    def __delattr__(self, name):
+        raise Exception(f"Snapshots cannot be modified; use FlexokiSchema.at() to get the snapshot for another lightness value.")
+
+    def __repr__(self):
+        return f"Snapshot(lightness={self.lightness}, theme={self.theme})"
+
+    # Allowing colors to be retrieved as with FlexokiSchema["color-name"]
+    # The hue names (i.e. red, grey, pink) return the default colors for this snapshot; anything else is passed along to FlexokiSchema.colors
+    def __getitem__(self, val):
+        if isinstance(val, str):
+            attr = self._colors._default_aliases.get(val)
+            if attr is None:
+                attr = self._colors._default_aliases.get(val.lower().strip().replace("-","_").replace(" ","_"))
+            if attr is not None:
+                return getattr(self, attr)
+        return self._colors[val]
+
+    # The default colors, as a Palette (equivalent to FlexokiSchema.palettes.defaults)
+    @property
+    def defaults(self):
+        return Palette(self._defaults)
+
+    # The default colors, as a list (equivalent to FlexokiSchema.colors.get_defaults())
+    def get_defaults(self, override_names: bool=False):
+        if override_names == False:
+            return list(self._defaults)
+        elif override_names == True:
+            return list(self._defaults_named)
+        else:
+            raise Exception(f"Invalid input for override_names: {override_names}; only True or False are accepted, see documentation for details.")
+
+    # Filtering does not depend on the lightness/theme, so this is the same as FlexokiSchema.filter()
+    def filter(self, h: List[str] | str=None, l: List[int] | int | slice=None, order:Literal["h_l","l_h"]=None, returns:Literal["palette","colors","colours","hexes","rgb","rgba"]=None):
+        return self._colors.filter(h, l, order, returns)
+
+    # The colors for each role of a UI in this theme, as a read-only dict of {role: Color}, built the first time it is accessed
+    ## the UI colors defined by Flexoki: "bg", "bg-2" (backgrounds), "ui", "ui-2", "ui-3" (borders, hovered/active elements), and "tx", "tx-2", "tx-3"
+    ### (text, muted text, and faint text); snapshots without a theme use the light colors for lightness values of 500 or more, and the dark ones otherwise
+    ### for tables without the base colors Flexoki uses for these (i.e. base-50), the base color closest in lightness is used instead
+    ## "error" (red), "warning" (orange), "success" (green), "info" (blue) and "accent" (cyan), as the default colors for this lightness
+    ### each with "{role}-hover" (one step darker in light themes, and lighter in dark ones) and "on-{role}" (its best_text())
+    @property
+    def roles(self):
+        roles = self._roles
+        if roles is None:
+            theme = self.theme if self.theme is not None else "light" if self.lightness >= 500 else "dark"
+            graph = self._colors._graph
+            roles = _ui_colors(self)
+            for role, hue in _ROLES.items():
+                c = getattr(self, hue)
+                row, i = graph["steps"][c]
+                roles[role] = c
+                roles[f"{role}-hover"] = row[min(max(i + (1 if theme == "light" else -1), 0), len(row) - 1)]
+                roles[f"on-{role}"] = _best_text(c, graph["ends"])
+            # If two threads build this at once, both results are the same
+            roles = MappingProxyType(roles)
+            object.__setattr__(self, "_roles", roles)
+        return roles
+
+### Index ###
+# Everything derived from the table of colors (the Color objects, the indexes used by filter(), and the table of accepted spellings
+# of each color name) is built once per process and shared by every FlexokiSchema, as none of it can be changed; each schema only
+# copies the few parts that it does change (see FlexokiSchema.colors.__init__), so creating one costs microseconds
+# The index is also saved to cache_dir() as a flat file of plain values (indices into the table, rather than Color objects), so that
+# new interpreters can load it instead of building it; marshal is used for this (rather than pickle) as it is built into the interpreter,
+# whereas importing pickle alone takes longer than building the index
+
+# Bumped whenever the contents of the index change, so that old cached files are not used
+_INDEX_VERSION = 2
+_index = None
+_index_lock = Lock()
+
+# Function for the spellings of a color name that are stored in the table of aliases
+# Each name is stored in lowercase with dashes, underscores and spaces (i.e. red-500, red_500, red 500)
+def _spellings(name):
+    name = name.lower()
+    return dict.fromkeys([name, name.replace("-","_"), name.replace("-"," ")]).keys()
+
+# The attributes holding the default color for each hue code (see colors._update_defaults())
+_default_attrs = {"r":"red", "o":"orange", "y":"yellow", "g":"green", "c":"cyan", "b":"blue", "p":"purple", "m":"magenta", "k":"base"}
+
+# Names that stand for a single color of the table, rather than the default color of their hue (i.e. white is paper, as black is black)
+_color_aliases = {"white":"paper"}
+
+# Function to build the index as plain values, which can be written with marshal
+# Colors are referred to by their position in the table
+def _build_index(table, h_codes, l_values):
+    names = list(table.keys())
+    positions = {n:i for i,n in enumerate(names)}
+    # For base, paper/black are used in place of base-0/base-1000 (where the table has them), mirroring the special cases in filter()
+    # The colors of each hue are sorted by lightness, as tables read from files can list them in any order (colors with the same lightness keep their order)
+    by_h = {h:sorted([i for i,n in enumerate(names) if table[n]["h"]==h and not (n=="base-0" or n=="base-1000")], key=lambda i: table[names[i]]["l"])
+            for h in dict.fromkeys(h_codes.values())}
+    by_l = {l:([positions["paper"]] if l==0 and "paper" in positions else [positions["black"]] if l==1000 and "black" in positions
+               else [i for i,n in enumerate(names) if table[n]["l"]==l])
+            for l in l_values}
+    by_hl = {(table[names[i]]["h"],table[names[i]]["l"]):i for ids in by_h.values() for i in ids}
+
+    aliases = {}
+    # Hue names (including aliases like grey or pink) followed by a lightness value, i.e. grey-500 is base-500
+    for hname,code in h_codes.items():
+        for l in l_values:
+            if (code,l) in by_hl:
+                aliases.update(dict.fromkeys(_spellings(f"{hname}-{l}"), by_hl[(code,l)]))
+    # The names of every color in the table, which take precedence over the above (i.e. base-0 is base-0, rather than paper)
+    for i,n in enumerate(names):
+        aliases.update(dict.fromkeys(_spellings(n), i))
+    # Names for other colors of the table (where the table has that color, and not one of the same name)
+    color_aliases = {a:n for a,n in _color_aliases.items() if n in positions and a not in positions}
+    for a,n in color_aliases.items():
+        aliases.update(dict.fromkeys(_spellings(a), positions[n]))
+    # Hue names on their own (i.e. red, grey, pink) return the default colors, so are filled in by colors._update_defaults()
+    # This maps each of their spellings to the attribute holding the default color for that hue
+    default_aliases = {sp:_default_attrs[code] for hname,code in h_codes.items()
+                       if hname not in table and hname not in color_aliases and code in _default_attrs for sp in _spellings(hname)}
+
+    return {"version":_INDEX_VERSION, "table":table, "h_codes":h_codes, "l_values":l_values,
+            "by_h":by_h, "by_l":by_l, "aliases":aliases, "default_aliases":default_aliases}
+
+# Every Color in any schema's table, keyed by its values, so that tables with colors in common (i.e. extensions of the Flexoki table)
+# share the same Color objects; colors are dropped from here once no table uses them
+_interned = WeakValueDictionary()
+_interned_lock = Lock()
+
+def _intern(name, c):
+    key = (name, c["h"], c["l"], c["hex"], tuple(c["rgb"]))
+    with _interned_lock:
+        color = _interned.get(key)
+        if color is None:
+            color = _interned[key] = Color(*key)
+    return color
+
+# Function for the pre-generated palettes of a table, as {name: (h, l)} (the arguments passed to filter() to build each one)
+def _palette_filters(h_codes, l_values, by_h, by_l):
+    # Monochromatic palettes - single color, every lightness value
+    filters = {"grays":("k", None), "greys":("k", None), "blacks":("k", None), "whites":("k", None), "base":("k", None),
+               "reds":("r", None), "oranges":("o", None), "yellows":("y", None), "greens":("g", None),
+               "cyans":("c", None), "blues":("b", None), "purples":("p", None), "magentas":("m", None)}
+    # Along with any other hues in the table, named after each of their names (i.e. teals)
+    for hname,code in h_codes.items():
+        if code not in _default_attrs and len(by_h.get(code, ())) > 0:
+            filters.setdefault(f"{hname}s", (code, None))
+    # Monolightness palettes - single lightness value, every color
+    filters.update({f"l{l}":(None, l) for l in l_values if l != 0 and l != 1000 and len(by_l.get(l, ())) > 0})
+    return filters
+
+# Function to turn the plain index into the one used by FlexokiSchema, with Color objects in place of positions
+def _hydrate_index(flat):
+    table = flat["table"]
+    colors = tuple(_intern(n, c) for n,c in table.items())
+    by_h = MappingProxyType({h:tuple(colors[i] for i in ids) for h,ids in flat["by_h"].items()})
+    by_hl = MappingProxyType({(c.h,c.l):c for cs in by_h.values() for c in cs})
+    # One color per lightness value of each hue, from lightest to darkest (where a table has several colors with the same hue and lightness,
+    # the one that colors["hue-lightness"] returns), used by ramp() and the neighbor graph
+    rows = MappingProxyType({h:tuple(by_hl[(h,l)] for l in dict.fromkeys(c.l for c in cs)) for h,cs in by_h.items()})
+    # The default colors (one per hue, in the same order as colors._update_defaults()) for each lightness value that has all of them
+    defaults = {l:tuple(by_hl[(h,l)] for h in "roygcbpmk") for l in flat["l_values"] if all((h,l) in by_hl for h in "roygcbpmk")}
+    hue_names = {}
+    for n,c in flat["h_codes"].items():
+        hue_names.setdefault(c, n)
+    return {
+        # The neighbors of each color, used by Color.lighter()/darker()/best_text() (see _build_graph())
+        "graph": _build_graph(colors, rows, by_hl),
+        "h_codes": MappingProxyType(flat["h_codes"]),
+        "l_values": tuple(flat["l_values"]),
+        # The first name for each hue code (i.e. base, red, purple), used to name generated colors
+        "hue_names": MappingProxyType(hue_names),
+        # The lightness values the defaults can be set to (i.e. 50-950 for Flexoki, as there are no reds at 0 or 1000)
+        "lightness": tuple(l for l in defaults if l != 0 and l != 1000),
+        "filters": MappingProxyType(_palette_filters(flat["h_codes"], flat["l_values"], flat["by_h"], flat["by_l"])),
+        "table": table,
+        # Each color is accessible as an attribute, with dashes replaced by underscores (i.e. colors.red_500)
+        "attrs": MappingProxyType({c.name.lower().replace("-","_"):c for c in colors}),
+        "all": colors,
+        "by_h": by_h,
+        "by_l": MappingProxyType({l:tuple(colors[i] for i in ids) for l,ids in flat["by_l"].items()}),
+        "by_hl": by_hl,
+        "rows": rows,
+        "positions": MappingProxyType({c.name:i for i,c in enumerate(colors)}),
+        "palette": Palette(colors),
+        "aliases": MappingProxyType({sp:colors[i] for sp,i in flat["aliases"].items()}),
+        "default_aliases": MappingProxyType(flat["default_aliases"]),
+        "defaults": MappingProxyType(defaults),
+    }
+
+# Function to get the (shared) index, loading it from cache_dir() if possible, and otherwise building it (and saving it there)
+def _load_index():
+    global _index
+    if _index is not None:
+        return _index
+    with _index_lock:
+        if _index is not None:
+            return _index
+        if _on_miss is not None:
+            _on_miss("FlexokiSchema.__init__")
+        # marshal's format can change between Python versions, so each version has its own file
+        path = os.path.join(cache_dir(), f"schema-{_INDEX_VERSION}-py{sys.version_info[0]}{sys.version_info[1]}.marshal")
+        flat = None
+        try:
+            with open(path, "rb") as f:
+                flat = marshal.loads(f.read())
+            # Only using the file if it was built from the same table (i.e. not by an older release)
+            if not (isinstance(flat, dict) and flat.get("version") == _INDEX_VERSION and flat.get("table") == color_table
+                    and flat.get("h_codes") == h_codes and flat.get("l_values") == l_values):
+                flat = None
+        except (OSError, ValueError, EOFError, TypeError):
+            flat = None
+
+        if flat is None:
+            flat = _build_index(color_table, h_codes, l_values)
+            # Writing to a temporary file first, so that other processes never see a partially-written file
+            tmp = f"{path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(tmp, "wb") as f:
+                    f.write(marshal.dumps(flat))
+                os.replace(tmp, path)
+            # If the cache can't be written to, the index is simply built again next time
+            except OSError:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+        _index = _hydrate_index(flat)
+    return _index
+
+# The indexes of other tables (see FlexokiSchema(table=...)), keyed by the table they were built from, with least-recently-used eviction
+# Every schema built from the same table shares one index, and the table is only checked (see flexoki.table.validate) when it is first seen
+_TABLE_CACHE_SIZE = 64
+_table_indexes = OrderedDict()
+_table_lock = Lock()
+
+def _table_index(table, h_codes, l_values):
+    # Tables are keyed by their marshalled contents, which also covers unhashable values (i.e. lists from JSON)
+    try:
+        key = marshal.dumps((table, h_codes, l_values))
+    except ValueError:
+        key = None
+    with _table_lock:
+        index = _table_indexes.get(key)
+        if index is not None:
+            _table_indexes.move_to_end(key)
+            return index
+    if _on_miss is not None:
+        _on_miss("FlexokiSchema.__init__")
+    from flexoki.table import validate
+    index = _hydrate_index(_build_index(*validate(table, h_codes, l_values)))
+    if key is not None:
+        with _table_lock:
+            index = _table_indexes.setdefault(key, index)
+            while len(_table_indexes) > _TABLE_CACHE_SIZE:
+                _table_indexes.popitem(last=False)
+    return index
+
 ### FlexokiSchema ###
 # Class to store all the colors and allow for easy selection
+# By default, the colors are those of Flexoki 2.0; other tables of colors can be passed instead (or loaded with FlexokiSchema.from_file())
+## table is a dict of {name: {"h": hue code, "l": lightness value, "hex": hex code}}, h_codes a dict of {hue name: hue code},
+## and l_values a list of every lightness value (see flexoki.table for details)
+## if not passed, h_codes defaults to the Flexoki 2.0 hue names, and l_values to the lightness values of the colors in table
+## tables are checked the first time they are used, and every schema built from the same table shares the same index and Color objects
 class FlexokiSchema:
-    def __init__(self):
+    def __init__(self, table: dict=None, h_codes: dict=None, l_values: List[int]=None):
+        # The index of the colors is shared between every schema with the same table (see _load_index() and _table_index() above)
+        if table is None:
+            if h_codes is not None or l_values is not None:
+                raise Exception("Invalid input: h_codes and l_values can only be passed along with a table of colors.")
+            index = _load_index()
+        else:
+            index = _table_index(table, h_codes, l_values)
 
         # Setting up default properties
-        self._theme = "light"
-        self._lightness = 600
+        # Tables without any colors at a lightness of 600 start at the middle of the lightness values they do have
+        lightness = 600 if 600 in index["lightness"] else index["lightness"][len(index["lightness"]) // 2]
+        self._theme = "light" if lightness == 600 else None
+        self._lightness = lightness
+        # The immutable Snapshots for each lightness value, built as they are requested by at()
+        self._snapshots = {}
+        # The names/values registered by register_matplotlib(), keyed by (prefix, lightness)
+        self._registered_colors = {}
+        # The (validated) matplotlib rcParams applied by style(), keyed by lightness
+        self._styles = {}
 
         # This class will handle all the individual colors
         class colors:
             # Loading all colors on initialization
             def __init__(self):
                 # Each color will be accessible from within this dictionary (FlexokiSchema.colors.dict)
-                self.dict = {
-                    # Base (and paper/black)
-                    "paper"    :{"h":"k", "l":0,    "hex":"#FFFCF0", "rgb":(255, 252, 240)},
-                    "base-0"   :{"h":"k", "l":0,    "hex":"#FFFCF0", "rgb":(255, 252, 240)}, # equivalent to paper
-                    "base-50"  :{"h":"k", "l":50,   "hex":"#F2F0E5", "rgb":(242, 240, 229)},
-                    "base-100" :{"h":"k", "l":100,  "hex":"#E6E4D9", "rgb":(230, 228, 217)},
-                    "base-150" :{"h":"k", "l":150,  "hex":"#DAD8CE", "rgb":(218, 216, 206)},
-                    "base-200" :{"h":"k", "l":200,  "hex":"#CECDC3", "rgb":(206, 205, 195)},
-                    "base-300" :{"h":"k", "l":300,  "hex":"#B7B5AC", "rgb":(183, 181, 172)},
-                    "base-400" :{"h":"k", "l":400,  "hex":"#9F9D96", "rgb":(159, 157, 150)},
-                    "base-500" :{"h":"k", "l":500,  "hex":"#878580", "rgb":(135, 133, 128)},
-                    "base-600" :{"h":"k", "l":600,  "hex":"#6F6E69", "rgb":(111, 110, 105)},
-                    "base-700" :{"h":"k", "l":700,  "hex":"#575653", "rgb":( 87,  86,  83)},
-                    "base-800" :{"h":"k", "l":800,  "hex":"#403E3C", "rgb":( 64,  62,  60)},
-                    "base-850" :{"h":"k", "l":850,  "hex":"#343331", "rgb":( 52,  51,  49)},
-                    "base-900" :{"h":"k", "l":900,  "hex":"#282726", "rgb":( 40,  39,  38)},
-                    "base-950" :{"h":"k", "l":950,  "hex":"#1C1B1A", "rgb":( 28,  27,  26)},
-                    "base-1000":{"h":"k", "l":1000, "hex":"#100F0F", "rgb":( 16,  15,  15)}, # equivalent to black
-                    "black"    :{"h":"k", "l":1000, "hex":"#100F0F", "rgb":( 16,  15,  15)},
-                    # Red
-                    "red-50" :{"h":"r", "l":50,  "hex":"#FFE1D5", "rgb": (255, 225, 213)},
-                    "red-100":{"h":"r", "l":100, "hex":"#FFCABB", "rgb": (255, 202, 187)},
-                    "red-150":{"h":"r", "l":150, "hex":"#FDB2A2", "rgb": (253, 178, 162)},
-                    "red-200":{"h":"r", "l":200, "hex":"#F89A8A", "rgb": (248, 154, 138)},
-                    "red-300":{"h":"r", "l":300, "hex":"#E8705F", "rgb": (232, 112, 95)},
-                    "red-400":{"h":"r", "l":400, "hex":"#D14D41", "rgb": (209, 77, 65)},
-                    "red-500":{"h":"r", "l":500, "hex":"#C03E35", "rgb": (192, 62, 53)},
-                    "red-600":{"h":"r", "l":600, "hex":"#AF3029", "rgb": (175, 48, 41)},
-                    "red-700":{"h":"r", "l":700, "hex":"#942822", "rgb": (148, 40, 34)},
-                    "red-800":{"h":"r", "l":800, "hex":"#6C201C", "rgb": (108, 32, 28)},
-                    "red-850":{"h":"r", "l":850, "hex":"#551B18", "rgb": (85, 27, 24)},
-                    "red-900":{"h":"r", "l":900, "hex":"#3E1715", "rgb": (62, 23, 21)},
-                    "red-950":{"h":"r", "l":950, "hex":"#261312", "rgb": (38, 19, 18)},
-                    # Orange
-                    "orange-50": {"h":"o", "l":50,  "hex":"#FFE7CE", "rgb":(255, 231, 206)},
-                    "orange-100":{"h":"o", "l":100, "hex":"#FED3AF", "rgb":(254, 211, 175)},
-                    "orange-150":{"h":"o", "l":150, "hex":"#FCC192", "rgb":(252, 193, 146)},
-                    "orange-200":{"h":"o", "l":200, "hex":"#F9AE77", "rgb":(249, 174, 119)},
-                    "orange-300":{"h":"o", "l":300, "hex":"#EC8B49", "rgb":(236, 139, 73)},
-                    "orange-400":{"h":"o", "l":400, "hex":"#DA702C", "rgb":(218, 112, 44)},
-                    "orange-500":{"h":"o", "l":500, "hex":"#CB6120", "rgb":(203, 97, 32)},
-                    "orange-600":{"h":"o", "l":600, "hex":"#BC5215", "rgb":(188, 82, 21)},
-                    "orange-700":{"h":"o", "l":700, "hex":"#9D4310", "rgb":(157, 67, 16)},
-                    "orange-800":{"h":"o", "l":800, "hex":"#71320D", "rgb":(113, 50, 13)},
-                    "orange-850":{"h":"o", "l":850, "hex":"#59290D", "rgb":(89, 41, 13)},
-                    "orange-900":{"h":"o", "l":900, "hex":"#40200D", "rgb":(64, 32, 13)},
-                    "orange-950":{"h":"o", "l":950, "hex":"#27180E", "rgb":(39, 24, 14)},
-                    # Yellow
-                    "yellow-50": {"h":"y", "l":50,  "hex":"#FAEEC6", "rgb":(250, 238, 198)},
-                    "yellow-100":{"h":"y", "l":100, "hex":"#F6E2A0", "rgb":(246, 226, 160)},
-                    "yellow-150":{"h":"y", "l":150, "hex":"#F1D67E", "rgb":(241, 214, 126)},
-                    "yellow-200":{"h":"y", "l":200, "hex":"#ECCB60", "rgb":(236, 203, 96)},
-                    "yellow-300":{"h":"y", "l":300, "hex":"#DFB431", "rgb":(223, 180, 49)},
-                    "yellow-400":{"h":"y", "l":400, "hex":"#D0A215", "rgb":(208, 162, 21)},
-                    "yellow-500":{"h":"y", "l":500, "hex":"#BE9207", "rgb":(190, 146, 7)},
-                    "yellow-600":{"h":"y", "l":600, "hex":"#AD8301", "rgb":(173, 131, 1)},
-                    "yellow-700":{"h":"y", "l":700, "hex":"#8E6B01", "rgb":(142, 107, 1)},
-                    "yellow-800":{"h":"y", "l":800, "hex":"#664D01", "rgb":(102, 77, 1)},
-                    "yellow-850":{"h":"y", "l":850, "hex":"#503D02", "rgb":(80, 61, 2)},
-                    "yellow-900":{"h":"y", "l":900, "hex":"#3A2D04", "rgb":(58, 45, 4)},
-                    "yellow-950":{"h":"y", "l":950, "hex":"#241E08", "rgb":(36, 30, 8)},
-                    # Green
-                    "green-50": {"h":"g", "l":50,  "hex":"#EDEECF", "rgb":(237, 238, 207)},
-                    "green-100":{"h":"g", "l":100, "hex":"#DDE2B2", "rgb":(221, 226, 178)},
-                    "green-150":{"h":"g", "l":150, "hex":"#CDD597", "rgb":(205, 213, 151)},
-                    "green-200":{"h":"g", "l":200, "hex":"#BEC97E", "rgb":(190, 201, 126)},
-                    "green-300":{"h":"g", "l":300, "hex":"#A0AF54", "rgb":(160, 175, 84)},
-                    "green-400":{"h":"g", "l":400, "hex":"#879A39", "rgb":(135, 154, 57)},
-                    "green-500":{"h":"g", "l":500, "hex":"#768D21", "rgb":(118, 141, 33)},
-                    "green-600":{"h":"g", "l":600, "hex":"#66800B", "rgb":(102, 128, 11)},
-                    "green-700":{"h":"g", "l":700, "hex":"#536907", "rgb":(83, 105, 7)},
-                    "green-800":{"h":"g", "l":800, "hex":"#3D4C07", "rgb":(61, 76, 7)},
-                    "green-850":{"h":"g", "l":850, "hex":"#313D07", "rgb":(49, 61, 7)},
-                    "green-900":{"h":"g", "l":900, "hex":"#252D09", "rgb":(37, 45, 9)},
-                    "green-950":{"h":"g", "l":950, "hex":"#1A1E0C", "rgb":(26, 30, 12)},
-                    # Cyan
-                    "cyan-50": {"h":"c", "l":50,  "hex":"#DDF1E4", "rgb":(221, 241, 228)},
-                    "cyan-100":{"h":"c", "l":100, "hex":"#BFE8D9", "rgb":(191, 232, 217)},
-                    "cyan-150":{"h":"c", "l":150, "hex":"#A2DECE", "rgb":(162, 222, 206)},
-                    "cyan-200":{"h":"c", "l":200, "hex":"#87D3C3", "rgb":(135, 211, 195)},
-                    "cyan-300":{"h":"c", "l":300, "hex":"#5ABDAC", "rgb":(90, 189, 172)},
-                    "cyan-400":{"h":"c", "l":400, "hex":"#3AA99F", "rgb":(58, 169, 159)},
-                    "cyan-500":{"h":"c", "l":500, "hex":"#2F968D", "rgb":(47, 150, 141)},
-                    "cyan-600":{"h":"c", "l":600, "hex":"#24837B", "rgb":(36, 131, 123)},
-                    "cyan-700":{"h":"c", "l":700, "hex":"#1C6C66", "rgb":(28, 108, 102)},
-                    "cyan-800":{"h":"c", "l":800, "hex":"#164F4A", "rgb":(22, 79, 74)},
-                    "cyan-850":{"h":"c", "l":850, "hex":"#143F3C", "rgb":(20, 63, 60)},
-                    "cyan-900":{"h":"c", "l":900, "hex":"#122F2C", "rgb":(18, 47, 44)},
-                    "cyan-950":{"h":"c", "l":950, "hex":"#101F1D", "rgb":(16, 31, 29)},
-                    # Blue
-                    "blue-50": {"h":"b", "l":50,  "hex":"#E1ECEB", "rgb":(225, 236, 235)},
-                    "blue-100":{"h":"b", "l":100, "hex":"#C6DDE8", "rgb":(198, 221, 232)},
-                    "blue-150":{"h":"b", "l":150, "hex":"#ABCFE2", "rgb":(171, 207, 226)},
-                    "blue-200":{"h":"b", "l":200, "hex":"#92BFDB", "rgb":(146, 191, 219)},
-                    "blue-300":{"h":"b", "l":300, "hex":"#66A0C8", "rgb":(102, 160, 200)},
-                    "blue-400":{"h":"b", "l":400, "hex":"#4385BE", "rgb":(67, 133, 190)},
-                    "blue-500":{"h":"b", "l":500, "hex":"#3171B2", "rgb":(49, 113, 178)},
-                    "blue-600":{"h":"b", "l":600, "hex":"#205EA6", "rgb":(32, 94, 166)},
-                    "blue-700":{"h":"b", "l":700, "hex":"#1A4F8C", "rgb":(26, 79, 140)},
-                    "blue-800":{"h":"b", "l":800, "hex":"#163B66", "rgb":(22, 59, 102)},
-                    "blue-850":{"h":"b", "l":850, "hex":"#133051", "rgb":(19, 48, 81)},
-                    "blue-900":{"h":"b", "l":900, "hex":"#12253B", "rgb":(18, 37, 59)},
-                    "blue-950":{"h":"b", "l":950, "hex":"#101A24", "rgb":(16, 26, 36)},
-                    # Purple
-                    "purple-50": {"h":"p", "l":50,  "hex":"#F0EAEC", "rgb":(240, 234, 236)},
-                    "purple-100":{"h":"p", "l":100, "hex":"#E2D9E9", "rgb":(226, 217, 233)},
-                    "purple-150":{"h":"p", "l":150, "hex":"#D3CAE6", "rgb":(211, 202, 230)},
-                    "purple-200":{"h":"p", "l":200, "hex":"#C4B9E0", "rgb":(196, 185, 224)},
-                    "purple-300":{"h":"p", "l":300, "hex":"#A699D0", "rgb":(166, 153, 208)},
-                    "purple-400":{"h":"p", "l":400, "hex":"#8B7EC8", "rgb":(139, 126, 200)},
-                    "purple-500":{"h":"p", "l":500, "hex":"#735EB5", "rgb":(115, 94, 181)},
-                    "purple-600":{"h":"p", "l":600, "hex":"#5E409D", "rgb":(94, 64, 157)},
-                    "purple-700":{"h":"p", "l":700, "hex":"#4F3685", "rgb":(79, 54, 133)},
-                    "purple-800":{"h":"p", "l":800, "hex":"#3C2A62", "rgb":(60, 42, 98)},
-                    "purple-850":{"h":"p", "l":850, "hex":"#31234E", "rgb":(49, 35, 78)},
-                    "purple-900":{"h":"p", "l":900, "hex":"#261C39", "rgb":(38, 28, 57)},
-                    "purple-950":{"h":"p", "l":950, "hex":"#1A1623", "rgb":(26, 22, 35)},
-                    # Magenta
-                    "magenta-50": {"h":"m", "l":50,  "hex":"#FEE4E5", "rgb":(254, 228, 229)},
-                    "magenta-100":{"h":"m", "l":100, "hex":"#FCCFDA", "rgb":(252, 207, 218)},
-                    "magenta-150":{"h":"m", "l":150, "hex":"#F9B9CF", "rgb":(249, 185, 207)},
-                    "magenta-200":{"h":"m", "l":200, "hex":"#F4A4C2", "rgb":(244, 164, 194)},
-                    "magenta-300":{"h":"m", "l":300, "hex":"#E47DA8", "rgb":(228, 125, 168)},
-                    "magenta-400":{"h":"m", "l":400, "hex":"#CE5D97", "rgb":(206, 93, 151)},
-                    "magenta-500":{"h":"m", "l":500, "hex":"#B74583", "rgb":(183, 69, 131)},
-                    "magenta-600":{"h":"m", "l":600, "hex":"#A02F6F", "rgb":(160, 47, 111)},
-                    "magenta-700":{"h":"m", "l":700, "hex":"#87285E", "rgb":(135, 40, 94)},
-                    "magenta-800":{"h":"m", "l":800, "hex":"#641F46", "rgb":(100, 31, 70)},
-                    "magenta-850":{"h":"m", "l":850, "hex":"#4F1B39", "rgb":(79, 27, 57)},
-                    "magenta-900":{"h":"m", "l":900, "hex":"#39172B", "rgb":(57, 23, 43)},
-                    "magenta-950":{"h":"m", "l":950, "hex":"#24131D", "rgb":(36, 19, 29)},
-                }
-            
+                self.dict = dict(index["table"])
                 # Each color will also be accessible as an attribute of the Colors class
                 # Note here, dashes are replaced with underscores; e.g. colors.dict["red-500"] becomes colors.red_500
-                for n,c in self.dict.items():
-                    cname = n.lower().replace("-","_")
-                    setattr(self, cname, Color(n, **c))
+                self.__dict__.update(index["attrs"])
+
+                # _all holds every Color (in the same order as self.dict), _by_h is keyed by hue code, and _by_l by lightness value
+                # These are read-only, and used by filter() to select colors without rebuilding any of them
+                self._all = index["all"]
+                self._by_h = index["by_h"]
+                self._by_l = index["by_l"]
+                self._by_hl = index["by_hl"]
+                self._rows = index["rows"]
+                # The position of each color in _all (and so in to_list()), and all the colors as a Palette
+                self._positions = index["positions"]
+                self._palette = index["palette"]
+                # The results of filter() are memoized here, keyed on the arguments passed to it (see _filter_key())
+                # Adding to (and evicting from) the cache is done under a lock, as filter() can be called from many threads at once
+                self._filter_cache = OrderedDict()
+                self._filter_lock = Lock()
+
+                # A table of every accepted spelling of every color name, so that colors["color-name"] is a single lookup
+                # This is copied, as the hue names on their own (i.e. red, grey) are updated to the default colors by _update_defaults()
+                self._aliases = dict(index["aliases"])
+                self._default_aliases = index["default_aliases"]
+                self._defaults_by_l = index["defaults"]
+                # The hue names/codes and lightness values of the table, used to parse the inputs to filter()
+                self._h_codes = index["h_codes"]
+                self._l_values = index["l_values"]
+                self._hue_names = index["hue_names"]
+                # The lightness values the defaults can be set to
+                self._lightness_values = index["lightness"]
+                # The neighbors of each color (see Color.lighter()/darker()/best_text())
+                self._graph = index["graph"]
                 
-                self._update_defaults(600)
+                self._update_defaults(lightness)
 
             # Overriding how get retrieval works (so that you can do colors["color-name"])
             def __getitem__(self, val):
-                # Ensuring it is properly formatted
-                val_clean = val.lower().replace("-","_").replace(" ","_")
-                # Returning the corresponding color entry
+                if isinstance(val, str):
+                    # Most names will be found directly in the table of aliases
+                    c = self._aliases.get(val)
+                    if c is not None:
+                        return c
+                    # Otherwise ensuring it is properly formatted, and trying again
+                    if _on_miss is not None:
+                        _on_miss("colors.__getitem__")
+                    val_clean = val.lower().strip().replace("-","_").replace(" ","_")
+                    c = self._aliases.get(val_clean)
+                    if c is not None:
+                        return c
+                    # Colors that were added as attributes (i.e. colors.my_color = Color(...)) can also be retrieved
+                    c = getattr(self, val_clean, None)
+                    if isinstance(c, Color):
+                        return c
+                raise Exception(f"Invalid color name input: {val}; see documentation for details on color naming schema.")
+
+            # Function to retrieve many colors by name at once (using the same names as colors["color-name"])
+            # returns is for choosing what is returned by the function
+            ## can be either a list of Color objects, a Palette object, a list of hex codes, a list of rgb values, or an (N,3) array of rgb values
+            def lookup(self, names: List[str], returns:Literal["colors","colours","palette","hexes","rgb","array"]="colors"):
+                if isinstance(names, str):
+                    names = [names]
+                # Trying the table of aliases directly first, and only falling back to colors["color-name"] if needed
                 try:
-                    return getattr(self, val_clean)
-                except:
-                    raise Exception(f"Invalid color name input: {val}; see documentation for details on color naming schema.")
+                    colors = [self._aliases[n] for n in names]
+                except (KeyError, TypeError):
+                    colors = [self[n] for n in names]
+                
+                if returns == "colors" or returns == "colours":
+                    return colors
+                elif returns == "palette":
+                    return Palette(colors)
+                elif returns == "hexes":
+                    return [c.hex for c in colors]
+                elif returns == "rgb":
+                    return [c.rgb for c in colors]
+                elif returns == "array":
+                    import numpy as np
+                    return np.array([c.rgb for c in colors], dtype=np.uint8).reshape(-1, 3)
+                else:
+                    raise Exception(f"Invalid input for returns: {returns}; only 'colors', 'colours', 'palette', 'hexes', 'rgb', or 'array' are acceptable values, see documentation for details.")
 
             # Convenience function for generating a list of all the Color objects
             def to_list(self):
@@ -295,9 +959,16 @@ class FlexokiSchema:
             
             # Function to bulk-set the default values (i.e. red, blue, green, etc.)
             def _update_defaults(self, l):
+                # The defaults for each lightness value are looked up from the index, rather than filtered for each time
+                defaults = self._defaults_by_l.get(l)
+                if defaults is None:
+                    defaults = self.filter("roygcbpmk", l, "h_l", "colors")
                 (self.red, self.orange, self.yellow,
                  self.green, self.cyan, self.blue, 
-                 self.purple, self.magenta, self.base) = self.filter("roygcbpmk", l, "h_l", "colors")
+                 self.purple, self.magenta, self.base) = defaults
+                # Updating the hue names in the table of aliases to match
+                for sp,attr in self._default_aliases.items():
+                    self._aliases[sp] = getattr(self, attr)
             
             # Function to return the default values as a list of Color objects
             # If override_names is set to False, these objects will preserve their names (i.e. red-400, green-600, etc.)
@@ -335,131 +1006,24 @@ class FlexokiSchema:
             # returns is for choosing what is returned by the filter function
             ## can be either a Palette object, a list of Color objects, a list of hex codes, a list of rgb values, or a list of rgba values
             ## if None, will default to a Palette or Colors object (depending on if multiple colors are returned, or just one)
+            # The selected colors are memoized, so repeating a filter only costs a dictionary lookup
             def filter(self, h: List[str] | str=None, l: List[int] | int | slice | range=None, order:Literal["h_l","l_h"]=None, returns:Literal["palette","colors","colours","hexes","rgb","rgba"]=None):
-                # Backend function to filter by hue
-                def _filter_h(self, h, clist):
-                    cfilt = []
-                    # Checking if a hue was passed
-                    if h is not None:
-                        # If h is a single string
-                        if isinstance(h, str):
-                            h = h.lower()
-                            # If h is a single color from the list of color codes, keep it as is
-                            if h in h_codes.values():
-                                _h = [h]
-                            # If h is a single color from the list of color names, convert to its single-letter key
-                            elif h in h_codes.keys():
-                                _h = [h_codes[h]]
-                            # Otherwise try and parse it as an hstring of single color characters
-                            else:
-                                _h = []
-                                for c in h:
-                                    if c not in h_codes.values():
-                                        raise Exception(f"Invalid input for h: {c}; only valid colors and shortcodes are accepted, see documentation for details.")    
-                                    else:
-                                        _h.append(c)
-
-                        # If h is a list of some sort
-                        elif isinstance(h, (tuple, list, Iterable)):
-                            h = [c.lower() for c in h]
-                            _h = []
-                            for c in h:
-                                # Making sure it is a valid string
-                                # if not isinstance(c, str) or not c.lower() in h_codes.values() or not c.lower() in h_codes.keys():
-                                if not isinstance(c, str) or (not c.lower() in h_codes.values() and not c.lower() in h_codes.keys()):
-                                    raise Exception(f"Invalid input for h: {c}; only valid colors are shortcodes are accepted, see documentation for details.")
-                                # Converting the string based on what type of code it is, and appending to our eventual list
-                                c = c.lower()
-                                # If it is a single-letter code
-                                if c in h_codes.values():
-                                    _h.append(c)
-                                # If it is a full color name
-                                elif c in h_codes.keys():
-                                    _h.append(h_codes[c])
-                                # If it is neither of these things, raise an error
-                                else:
-                                    raise Exception(f"Invalid input for h: {c}; only valid colors and shortcodes are accepted, see documentation for details.")
-                                
-                        # If none of these things, raise an exception
-                        else:
-                            raise Exception(f"Invalid input for h: {h}; only valid colors and shortcodes are accepted, see documentation for details.")
-                        
-                        # Once all the above are finished processing, should have a list of color codes that we can then use to filter the main color list like so:
-                        for hue in _h:
-                            # Custom filter for when base is selected; don't want to return base-0/base-1000, instead return paper/black
-                            if hue == "k":
-                                cfilt += [c for c in clist if c.h==hue and not (c.name=="base-0" or c.name=="base-1000")]
-                            # Otherwise, appending colors that match the hue to our list
-                            else:
-                                cfilt += [c for c in clist if c.h==hue]
-                    # Alternatively, if None is passed, then no filtering is needed
-                    else:
-                        cfilt = clist
-                    # Returning the filtered list
-                    return cfilt
-                
-                # Backend function to filter by lightness
-                def _filter_l(self, l, clist):
-                    cfilt = []
-                    # Getting all the lightness values
-                    l_all = [l for l in l_values]
-                    # Checking if a lightness is passed
-                    if l is not None:
-                        # If l is a single integer
-                        if isinstance(l, int):
-                            # Convert into a list
-                            _l = [l]
-
-                        # If l is a list of some sort
-                        elif isinstance(l, (tuple, list)):
-                            _l = []
-                            for k in l:
-                                # Making sure it is a valid integer
-                                if not isinstance(k, int) or not k in l_values:
-                                    raise Exception(f"Invalid input for l: {k}; only valid lightness values are accepted, see documentation for details.")
-                                else:
-                                    _l.append(k)
-                        # If l is a slice instead
-                        elif isinstance(l, (slice, range)):
-                            # Extracting the values
-                            l_min, l_max = sorted([l.start, l.stop])
-                            # Reversing the order if need be
-                            if l.start > l.stop:
-                                l_all.reverse()
-                            # Keeping just the lightness values that fall within the range
-                            _l = [k for k in l_all if k>=l_min and k<=l_max]
-                        # If none of these things, raise an exception
-                        else:
-                            raise Exception(f"Invalid input for l: {l}; only valid lightness values are accepted, see documentation for details.")
-                        
-                        # Once all the above are finished processing, should have a list of color codes that we can then use to filter the main color list like so:
-                        for light in _l:
-                            # Custom filter for when paper/base-0 is selected; need to only return one of them
-                            if light == 0:
-                                cfilt += [self.paper]
-                            # Similar filter for when black/base-1000 is selected
-                            elif light == 1000:
-                                cfilt += [self.black]
-                            # Otherwise, appending colors that match the lightness to our list
-                            else:
-                                cfilt += [c for c in clist if c.l==light]
-                    # Alternatively, if None is passed, then no filtering is needed
-                    else:
-                        cfilt = clist
-                    # Returning the filtered list
-                    return cfilt
-
-                # The list that will ultimately be filtered
-                colors_all = self.to_list()
-                # Running the filters, based on order
-                if order is None or order == "h_l":
-                    colors_filtered = _filter_h(self, h, _filter_l(self, l, colors_all))
-                elif order == "l_h":
-                    colors_filtered = _filter_l(self, l, _filter_h(self, h, colors_all))
-                else:
-                    raise Exception(f"Invalid input for order: {order}; only 'h_l' and 'l_h' are acceptable values, see documentation for details.")
+                # Checking the cache first
+                key = self._filter_key(h, l, order)
+                colors_filtered = self._filter_cache.get(key) if key is not None else None
+                if colors_filtered is None:
+                    if _on_miss is not None:
+                        _on_miss("colors.filter")
+                    colors_filtered = self._filter_select(h, l, order)
+                    # Only caching hashable inputs, and evicting the oldest entry once the cache is full
+                    if key is not None and len(colors_filtered) > 0:
+                        with self._filter_lock:
+                            self._filter_cache[key] = colors_filtered
+                            while len(self._filter_cache) > _FILTER_CACHE_SIZE:
+                                self._filter_cache.popitem(last=False)
                 
                 # Deciding what to return
+                # Note that new lists/Palettes are always returned, so modifying them will not affect the cache
                 if len(colors_filtered) == 0:
                     raise Exception(f"No colors returned for selected filters (h={h}, l={l}).")
                 elif returns is None:
@@ -470,7 +1034,7 @@ class FlexokiSchema:
                 elif returns == "palette":
                     return Palette(colors_filtered)
                 elif returns == "colors" or returns == "colours":
-                    return colors_filtered
+                    return list(colors_filtered)
                 elif returns == "hexes":
                     return [c.hex for c in colors_filtered]
                 elif returns == "rgb":
@@ -479,6 +1043,153 @@ class FlexokiSchema:
                     return [c.rgba for c in colors_filtered]
                 else:
                     raise Exception(f"Invalid input for returns: {returns}; only 'palette', 'colors', 'colours, 'hexes', 'rgb', or 'rgba' are acceptable values, see documentation for details.")
+
+            # Backend function to build the cache key for filter()
+            # Lists are converted to tuples and slices/ranges to their start/stop/step, so that the common inputs are hashable
+            # Anything else (or anything that could be confused with a valid input, like floats) returns None and is not cached
+            @staticmethod
+            def _filter_key(h, l, order):
+                if h is not None and type(h) is not str:
+                    if isinstance(h, (tuple, list)) and all(type(c) is str for c in h):
+                        h = tuple(h)
+                    else:
+                        return None
+                if l is not None and type(l) is not int:
+                    if isinstance(l, (tuple, list)) and all(type(k) is int for k in l):
+                        l = tuple(l)
+                    elif isinstance(l, (slice, range)):
+                        l = (type(l), l.start, l.stop, l.step)
+                    else:
+                        return None
+                if order is not None and type(order) is not str:
+                    return None
+                return (h, l, order)
+
+            # Backend function to parse h into a list of hue codes (or None, if all hues should be returned)
+            def _filter_parse_h(self, h):
+                h_codes = self._h_codes
+                # Checking if a hue was passed
+                if h is None:
+                    return None
+                # If h is a single string
+                elif isinstance(h, str):
+                    h = h.lower()
+                    # If h is a single color from the list of color codes, keep it as is
+                    if h in h_codes.values():
+                        _h = [h]
+                    # If h is a single color from the list of color names, convert to its single-letter key
+                    elif h in h_codes.keys():
+                        _h = [h_codes[h]]
+                    # Otherwise try and parse it as an hstring of single color characters
+                    else:
+                        _h = []
+                        for c in h:
+                            if c not in h_codes.values():
+                                raise Exception(f"Invalid input for h: {c}; only valid colors and shortcodes are accepted, see documentation for details.")    
+                            else:
+                                _h.append(c)
+
+                # If h is a list of some sort
+                elif isinstance(h, (tuple, list, Iterable)):
+                    h = [c.lower() for c in h]
+                    _h = []
+                    for c in h:
+                        # Making sure it is a valid string
+                        if not isinstance(c, str) or (not c.lower() in h_codes.values() and not c.lower() in h_codes.keys()):
+                            raise Exception(f"Invalid input for h: {c}; only valid colors are shortcodes are accepted, see documentation for details.")
+                        # Converting the string based on what type of code it is, and appending to our eventual list
+                        c = c.lower()
+                        # If it is a single-letter code
+                        if c in h_codes.values():
+                            _h.append(c)
+                        # If it is a full color name
+                        elif c in h_codes.keys():
+                            _h.append(h_codes[c])
+                        # If it is neither of these things, raise an error
+                        else:
+                            raise Exception(f"Invalid input for h: {c}; only valid colors and shortcodes are accepted, see documentation for details.")
+                        
+                # If none of these things, raise an exception
+                else:
+                    raise Exception(f"Invalid input for h: {h}; only valid colors and shortcodes are accepted, see documentation for details.")
+                return _h
+
+            # Backend function to parse l into a list of lightness values (or None, if all lightness values should be returned)
+            def _filter_parse_l(self, l):
+                # Getting all the lightness values
+                l_values = self._l_values
+                l_all = list(l_values)
+                # Checking if a lightness is passed
+                if l is None:
+                    return None
+                # If l is a single integer
+                elif isinstance(l, int):
+                    # Convert into a list
+                    _l = [l]
+
+                # If l is a list of some sort
+                elif isinstance(l, (tuple, list)):
+                    _l = []
+                    for k in l:
+                        # Making sure it is a valid integer
+                        if not isinstance(k, int) or not k in l_values:
+                            raise Exception(f"Invalid input for l: {k}; only valid lightness values are accepted, see documentation for details.")
+                        else:
+                            _l.append(k)
+                # If l is a slice instead
+                elif isinstance(l, (slice, range)):
+                    # Extracting the values
+                    l_min, l_max = sorted([l.start, l.stop])
+                    # Reversing the order if need be
+                    if l.start > l.stop:
+                        l_all.reverse()
+                    # Keeping just the lightness values that fall within the range
+                    _l = [k for k in l_all if k>=l_min and k<=l_max]
+                # If none of these things, raise an exception
+                else:
+                    raise Exception(f"Invalid input for l: {l}; only valid lightness values are accepted, see documentation for details.")
+                return _l
+
+            # Backend function to select the colors matching the filter from the index, as a tuple
+            def _filter_select(self, h, l, order):
+                cfilt = []
+                # Ordering by hue, then lightness
+                if order is None or order == "h_l":
+                    _l = self._filter_parse_l(l)
+                    _h = self._filter_parse_h(h)
+                    if _h is None and _l is None:
+                        return self._all
+                    elif _h is None:
+                        for light in _l:
+                            cfilt += self._by_l.get(light, ())
+                    elif _l is None:
+                        for hue in _h:
+                            cfilt += self._by_h[hue]
+                    else:
+                        for hue in _h:
+                            cfilt += [self._by_hl[(hue,light)] for light in _l if (hue,light) in self._by_hl]
+                # Ordering by lightness, then hue
+                elif order == "l_h":
+                    _h = self._filter_parse_h(h)
+                    _l = self._filter_parse_l(l)
+                    if _h is None and _l is None:
+                        return self._all
+                    elif _h is None:
+                        for light in _l:
+                            cfilt += self._by_l.get(light, ())
+                    elif _l is None:
+                        for hue in _h:
+                            cfilt += self._by_h[hue]
+                    else:
+                        for light in _l:
+                            # Paper/black are returned for lightness values of 0/1000, whichever hues were selected
+                            if light == 0 or light == 1000:
+                                cfilt += self._by_l[light]
+                            else:
+                                cfilt += [self._by_hl[(hue,light)] for hue in _h if (hue,light) in self._by_hl]
+                else:
+                    raise Exception(f"Invalid input for order: {order}; only 'h_l' and 'l_h' are acceptable values, see documentation for details.")
+                return tuple(cfilt)
         
         self.colors = colors()
 
@@ -486,36 +1197,10 @@ class FlexokiSchema:
         class palettes:
             # The colors class needs to be passed here, as the filter function is necessary during the set-up
             def __init__(self, colors, l):
-                # Initializing all the monochromatic palettes - single color, every lightness value
-                self.grays = colors.filter("k", None)
-                self.greys = colors.filter("k", None)
-                self.blacks = colors.filter("k", None)
-                self.whites = colors.filter("k", None)
-                self.base = colors.filter("k", None)
-
-                self.reds = colors.filter("r", None)
-                self.oranges = colors.filter("o", None)
-                self.yellows = colors.filter("y", None)
-                self.greens = colors.filter("g", None)
-                self.cyans = colors.filter("c", None)
-                self.blues = colors.filter("b", None)
-                self.purples = colors.filter("p", None)
-                self.magentas = colors.filter("m", None)
-
-                # Initializing all the monolightness palettes - single lightness value, every color
-                self.l50  = colors.filter(None, 50)
-                self.l100 = colors.filter(None, 100)
-                self.l150 = colors.filter(None, 150)
-                self.l200 = colors.filter(None, 200)
-                self.l300 = colors.filter(None, 300)
-                self.l400 = colors.filter(None, 400)
-                self.l500 = colors.filter(None, 500)
-                self.l600 = colors.filter(None, 600)
-                self.l700 = colors.filter(None, 700)
-                self.l800 = colors.filter(None, 800)
-                self.l850 = colors.filter(None, 850)
-                self.l900 = colors.filter(None, 900)
-                self.l950 = colors.filter(None, 950)
+                self._colors = colors
+                # The filters used to build each of the pre-generated palettes (see _palette_filters() above)
+                # These are only run the first time a palette is accessed (see __getattr__ below), and then stored as an attribute
+                self._filters = index["filters"]
 
                 # Finally, initializing a special palette called "defaults"
                 # which will contain the monolightness palette for the current theme/lightness color chosen
@@ -533,7 +1218,26 @@ class FlexokiSchema:
                 else:
                     self._defaults = p
 
+            # Building the pre-generated palettes the first time they are accessed
+            def __getattr__(self, name):
+                if name.startswith("_") or name not in self._filters:
+                    raise AttributeError(f"'palettes' object has no attribute '{name}'")
+                p = self._colors.filter(*self._filters[name])
+                setattr(self, name, p)
+                return p
+
+            def __dir__(self):
+                return list(super().__dir__()) + [n for n in self._filters.keys() if n not in self.__dict__]
+
         self.palettes = palettes(self.colors, self._lightness)
+        _schemas.add(self)
+
+    # Function to build a schema from a JSON or TOML file of colors (i.e. brand colors, added to the Flexoki ones with "extends")
+    # See flexoki.table.parse for the contents of the file
+    @classmethod
+    def from_file(cls, path):
+        from flexoki.table import read
+        return cls(**read(path))
 
     # Overriding how get retrieval works (so that FlexokiSchema["color-name"] works the same as FlexokiSchema.colors["color-name"]
     def __getitem__(self, val):
@@ -547,8 +1251,8 @@ class FlexokiSchema:
     @lightness.setter
     def lightness(self, l):
         if l is None:
-            raise Exception(f"Invalid input for lightness: {l}; the only accepted values are {l_values[1:-1]}.")
-        elif l in l_values[1:-1]:
+            raise Exception(f"Invalid input for lightness: {l}; the only accepted values are {list(self.colors._lightness_values)}.")
+        elif l in self.colors._lightness_values:
             self._lightness = l
             # Setting the appropriate theme too, if needed
             if l == 600:
@@ -561,7 +1265,7 @@ class FlexokiSchema:
             self.colors._update_defaults(l)
             self.palettes.defaults = Palette(self.colors.get_defaults(override_names=False))
         else:
-            raise Exception(f"Invalid input for lightness: {l}; the only accepted values are {l_values[1:-1]}.")
+            raise Exception(f"Invalid input for lightness: {l}; the only accepted values are {list(self.colors._lightness_values)}.")
     
     # Creating the properties for theme, and how they will update the other colors
     @property
@@ -585,10 +1289,222 @@ class FlexokiSchema:
             raise Exception(f"Invalid input for theme: {t}; only 'light' and 'dark' are accepted values.")
 
 
+    # Creating a more convenient way to access the lookup function: so you can use Flexoki.lookup() instead of Flexoki.colors.lookup()
+    def lookup(self, names: List[str], returns:Literal["colors","colours","palette","hexes","rgb","array"]="colors"):
+        return self.colors.lookup(names, returns)
+
+    # Functions for comparing every pair of colors at once, returned as an (N,N) array in the same order as colors.to_list()
+    # contrast_matrix is the WCAG 2 contrast ratio (between 1 and 21), and delta_e_matrix is the perceptual distance in OKLab
+    # Both are only calculated once, and then cached (and read-only)
+    def contrast_matrix(self):
+        return self.colors._palette.contrast()
+
+    def delta_e_matrix(self):
+        return self.colors._palette.delta_e()
+
+    # Function to find all the colors that have at least min_ratio contrast (by WCAG 2) with a background color
+    # background can be a color name, a Color, or a list of these; for a list, the colors returned must meet min_ratio against every one
+    # min_ratio defaults to 4.5 (the WCAG AA level for normal text); 3 is AA for large text, and 7 is AAA
+    # returns is the same as for filter(), and base-0/base-1000 are left out in favor of paper/black
+    # This is answered from the cached contrast_matrix(), so is cheap to call repeatedly
+    def accessible(self, background: str | Color | List[str | Color]="paper", min_ratio: float=4.5, returns:Literal["palette","colors","colours","hexes","rgb","rgba"]=None):
+        import numpy as np
+        from flexoki.metrics import contrast_matrix
+        if isinstance(background, (str, Color)):
+            background = [background]
+        matrix = self.contrast_matrix()
+        columns = []
+        for b in background:
+            c = b if isinstance(b, Color) else self.colors[b]
+            i = self.colors._positions.get(c.name)
+            # Colors from this schema use the cached matrix; anything else is compared directly
+            if i is not None and self.colors._all[i].hex == c.hex:
+                columns.append(matrix[:, i])
+            else:
+                columns.append(contrast_matrix(self.colors._palette.rgb(array=True), [c.rgb])[:, 0])
+        ratios = np.min(columns, axis=0) if len(columns) > 0 else np.full(len(matrix), np.inf)
+        colors = [c for c,r in zip(self.colors._all, ratios) if r >= min_ratio and c.name not in ("base-0", "base-1000")]
+        
+        if len(colors) == 0:
+            raise Exception(f"No colors have a contrast of at least {min_ratio} with {background}.")
+        elif returns is None or returns == "palette":
+            return Palette(colors)
+        elif returns == "colors" or returns == "colours":
+            return colors
+        elif returns == "hexes":
+            return [c.hex for c in colors]
+        elif returns == "rgb":
+            return [c.rgb for c in colors]
+        elif returns == "rgba":
+            return [c.rgba for c in colors]
+        else:
+            raise Exception(f"Invalid input for returns: {returns}; only 'palette', 'colors', 'colours, 'hexes', 'rgb', or 'rgba' are acceptable values, see documentation for details.")
+
+    # Function to check how distinguishable the colors of many palettes are with color vision deficiencies, all in one pass
+    # palettes can be a list of names (of the palettes under FlexokiSchema.palettes), or a dict of {name: Palette} (i.e. for derived palettes)
+    ## if None, every pre-generated palette is checked, along with the defaults
+    # kinds and severity are the same as for Palette.check_cvd(); palettes that have been checked before are answered from the cache
+    # Returns a dict of {name: {"normal": deltaE, kind: deltaE, ...}}, where each deltaE is the smallest distance between any two colors of the palette
+    def check_cvd(self, palettes: List[str] | dict=None, kinds: List[str]=None, severity: float=1.0):
+        from flexoki.cvd import check, parse_kinds
+        if palettes is None:
+            palettes = list(self.palettes._filters.keys()) + ["defaults"]
+        if not isinstance(palettes, dict):
+            palettes = {name:getattr(self.palettes, name) for name in palettes}
+        for name, p in palettes.items():
+            if not isinstance(p, Palette):
+                raise Exception(f"Invalid input for palettes: {name}; only palette names, or a dict of Palettes, are accepted.")
+        scores = check([p.rgb(array=True) for p in palettes.values()], parse_kinds(kinds), severity)
+        return dict(zip(palettes.keys(), scores))
+
+    # Function to pick the k colors that are the easiest to tell apart (i.e. for the series of a plot), including with color vision deficiencies
+    # The colors are picked from those matching h and l (the same as for filter()), defaulting to the accent colors (not base) from 300 to 700
+    # Colors are picked one at a time, each as far as possible from those already picked (by the smallest of their distances for normal vision
+    # and each of kinds, which defaults to all of them); see flexoki.cvd.order
+    ## this order is only worked out once for each set of colors, so asking for any k afterwards is cheap, and the first k colors never change with k
+    # returns is the same as for filter()
+    def distinguishable(self, k: int, h: List[str] | str=None, l: List[int] | int | slice=None, kinds: List[str]=None, severity: float=1.0,
+                        returns:Literal["palette","colors","colours","hexes","rgb","rgba"]=None):
+        from flexoki.cvd import order, parse_kinds
+        candidates = self.colors.filter("roygcbpm" if h is None else h, slice(300, 700) if l is None else l, returns="colors")
+        if not isinstance(k, int) or not 1 <= k <= len(candidates):
+            raise Exception(f"Invalid input for k: {k}; only integers between 1 and {len(candidates)} (the number of colors to pick from) are accepted.")
+        picked = order([c.rgb for c in candidates], parse_kinds(kinds), severity)[0][:k]
+        colors = [candidates[i] for i in picked]
+
+        if returns is None or returns == "palette":
+            return Palette(colors)
+        elif returns == "colors" or returns == "colours":
+            return colors
+        elif returns == "hexes":
+            return [c.hex for c in colors]
+        elif returns == "rgb":
+            return [c.rgb for c in colors]
+        elif returns == "rgba":
+            return [c.rgba for c in colors]
+        else:
+            raise Exception(f"Invalid input for returns: {returns}; only 'palette', 'colors', 'colours, 'hexes', 'rgb', or 'rgba' are acceptable values, see documentation for details.")
+
+    # Function to color a categorical column (a pandas/Polars Series, or an Arrow array), with one color per category
+    # palette is the colors to use, in order; if None, the default colors (at the current lightness) other than base are used
+    # mapping is an optional dict of {category: color}, for categories that need a particular color, where each color is a name, a Color, or a hex code
+    # returns is the same as for Palette.color_column(); the colors are assigned once per category, and the rows are mapped in a single vectorized step
+    def color_column(self, column, palette: Palette=None, mapping: dict=None, returns: Literal["hex","rgb","rgba"]="hex"):
+        if palette is None:
+            palette = Palette(self.colors.get_defaults()[:-1])
+        elif not isinstance(palette, Palette):
+            raise Exception(f"Invalid input for palette: {palette}; only Palette objects are accepted.")
+        if mapping is not None:
+            mapping = {k:(v if isinstance(v, Color) or (isinstance(v, str) and v.startswith("#")) else self.colors[v]) for k,v in mapping.items()}
+        return palette.color_column(column, mapping=mapping, returns=returns)
+
+    # Function to get an immutable Snapshot of the default colors at a given lightness value or theme
+    # Unlike setting lightness/theme, this does not change anything about the schema, so different threads/tasks can use different themes at once
+    # Snapshots are built the first time each lightness value is requested, and the same object is returned afterwards
+    def at(self, lightness: int=None, theme: Literal["light","dark"]=None):
+        if theme is not None:
+            if lightness is not None:
+                raise Exception(f"Invalid input: only one of lightness or theme should be passed.")
+            elif not isinstance(theme, str) or theme.lower() not in ["light", "dark"]:
+                raise Exception(f"Invalid input for theme: {theme}; only 'light' and 'dark' are accepted values.")
+            lightness = 600 if theme.lower() == "light" else 400
+        elif lightness is None:
+            lightness = self._lightness
+        
+        snapshot = self._snapshots.get(lightness)
+        if snapshot is None:
+            if lightness not in self.colors._lightness_values:
+                raise Exception(f"Invalid input for lightness: {lightness}; the only accepted values are {list(self.colors._lightness_values)}.")
+            # If two threads race to build the same snapshot, both end up using whichever was stored first
+            snapshot = self._snapshots.setdefault(lightness, Snapshot(self.colors, lightness))
+        return snapshot
+
+    # Shortcuts to the snapshots for the light and dark themes
+    @property
+    def light(self):
+        return self.at(600)
+
+    @property
+    def dark(self):
+        return self.at(400)
+
+    # The colors for each role of a UI (i.e. "error", "error-hover", "on-error", "bg", "tx") at the current lightness/theme; see Snapshot.roles
+    @property
+    def roles(self):
+        return self.at().roles
+
     # Creating a more convenient way to access the filter function: so you can use Flexoki.filter() instead of Flexoki.colors.filter()
     def filter(self, h: List[str] | str=None, l: List[int] | int | slice=None, order:Literal["h_l","l_h"]=None, returns:Literal["palette","colors","colours","hexes","rgb","rgba"]=None):
         return self.colors.filter(h, l, order, returns)
 
+    # Function to map an array of RGB values onto the nearest Flexoki colors
+    # h and l can be used to limit the colors that are mapped to, and accept the same values as filter()
+    ## if both are None, all colors are used, and the indices returned correspond to the order of colors.to_list()
+    # pixels, returns, chunk_size and lut are the same as for Palette.quantize()
+    def nearest(self, pixels, h: List[str] | str=None, l: List[int] | int | slice=None, returns: Literal["indices","pixels"]="indices", chunk_size: int=None, lut: int=None):
+        return self.colors.filter(h, l, returns="palette").quantize(pixels, returns=returns, chunk_size=chunk_size, lut=lut)
+
+    # Function to generate a Palette of new colors, by interpolating between the existing lightness values of a hue in OKLab
+    # h is for selecting the hue(s), and accepts the same values as filter() (if None, all hues are used)
+    ## if multiple hues are passed, the colors are returned ordered by hue and then lightness
+    # steps is the number of colors to generate for each hue, evenly spaced in lightness
+    # l is an optional slice or range, setting the lightness values the ramp starts and stops at (inclusive)
+    ## if None, each ramp covers all the lightness values available for that hue; if start > stop, the ramp is reversed
+    # The generated colors are named by hue and their (rounded) lightness, i.e. red-88
+    def ramp(self, h: List[str] | str=None, steps: int=25, l: slice | range=None):
+        import numpy as np
+        from flexoki.oklab import ramp
+        # Checking the inputs
+        if not isinstance(steps, int) or steps < 2:
+            raise Exception(f"Invalid input for steps: {steps}; only integers of 2 or more are accepted.")
+        if l is not None and not isinstance(l, (slice, range)):
+            raise Exception(f"Invalid input for l: {l}; only slices or ranges of lightness values are accepted, see documentation for details.")
+        _h = self.colors._filter_parse_h(h)
+        if _h is None:
+            _h = list(self.colors._by_h.keys())
+
+        # Grouping the hues by the lightness values that are available for them (base has paper/black, the others do not)
+        # so that every hue in a group can be interpolated in a single pass
+        groups = {}
+        for hue in dict.fromkeys(_h):
+            groups.setdefault(tuple(c.l for c in self.colors._rows[hue]), []).append(hue)
+        ramps = {}
+        for positions, hues in groups.items():
+            if l is not None and not (positions[0] <= min(l.start, l.stop) and max(l.start, l.stop) <= positions[-1]):
+                raise Exception(f"Invalid input for l: {l}; only lightness values between {positions[0]} and {positions[-1]} are available for {hues}.")
+            targets = np.linspace(positions[0] if l is None else l.start, positions[-1] if l is None else l.stop, steps)
+            rgb = ramp([[c.rgb for c in self.colors._rows[hue]] for hue in hues], positions, targets)
+            for hue, values in zip(hues, rgb):
+                ramps[hue] = (targets.round().astype(int).tolist(), values.tolist())
+
+        # Building the new Color objects, using the first name for each hue code (i.e. base, red, purple)
+        colors = []
+        for hue in _h:
+            for light, rgb in zip(*ramps[hue]):
+                colors.append(Color(f"{self.colors._hue_names[hue]}-{light}", hue, light, "#{:02X}{:02X}{:02X}".format(*rgb), tuple(rgb)))
+        return Palette(colors)
+
+    # Function to build a diverging palette, i.e. from red, through paper, to blue
+    # low and high are the colors at either end, and mid the color in the middle; each can be a color name or a Color
+    ## low and high can also be lists (or Palettes) of colors, for more than one stop on each side, ordered from the end inwards
+    # n is the number of colors; if it is odd, the middle color is exactly mid (and the two sides are always symmetrical)
+    # The colors are interpolated in OKLab, and cached as with Palette.resample()
+    def diverging(self, low: str | Color | List[str | Color]="red", high: str | Color | List[str | Color]="blue", mid: str | Color="paper", n: int=11):
+        if not isinstance(n, int) or n < 2:
+            raise Exception(f"Invalid input for n: {n}; only integers of 2 or more are accepted.")
+        def stops(colors):
+            colors = [colors] if isinstance(colors, (str, Color)) else list(colors)
+            return [c if isinstance(c, Color) else self.colors[c] for c in colors]
+        low, high, mid = stops(low), stops(high), stops(mid)[0]
+        # Each side is sampled from its end (at 0) to the middle (at 1), so the positions on the high side count down
+        positions = _linspace(0, 1, n)
+        left = [2 * x for x in positions if x < 0.5]
+        right = [2 * (1 - x) for x in positions if x > 0.5]
+        def build():
+            middle = [mid] if n % 2 == 1 else []
+            return _sample(low + [mid], left) + middle + _sample(high + [mid], right)
+        return _derived(("diverging", tuple(low), tuple(high), mid, n), build)
+
     # Creating methods for changing the lightness values of the default colors
     def set_lightness(self, lightness: int):
         self.lightness = lightness
@@ -609,17 +1525,25 @@ class FlexokiSchema:
     # defaults is a boolean variable telling the function whether to register the default/theme colors as well
     ## Note that this is ONLY used if no color list is passed! (colors = None)
     ## Otherwise it is silently ignored
+    ## Only the names that are missing from matplotlib (or have a different value) are written, so calling this repeatedly is cheap
     def register_matplotlib(self, colors:List[dict | Color | list | tuple]=None, prefix:str="flexoki", defaults:bool=True):
-        # First, if colors is None, getting the full list of colors we have
-        if colors is None:
-            colors = self.colors.to_list()
-            if defaults == True:
-                colors += self.colors.get_defaults(override_names=True)
-        # Then making sure a prefix was passed
+        # Making sure a prefix was passed
         if prefix is None or not isinstance(prefix, str):
             raise Exception(f"Invalid input for prefix - must be a valid string; see documentation for details.")
-        # Then, checking that a list of colors was passed
-        if not isinstance(colors, (list, tuple)):
+        # If colors is None, all the colors we have are registered
+        ## the names/values for this are only built once per prefix (and lightness, if defaults are included), and reused afterwards
+        if colors is None:
+            key = (prefix, self._lightness if defaults == True else None)
+            added_colors = self._registered_colors.get(key)
+            if added_colors is None:
+                if _on_miss is not None:
+                    _on_miss("FlexokiSchema.register_matplotlib")
+                colors = list(self.colors._all)
+                if defaults == True:
+                    colors += self.at(self._lightness).get_defaults(override_names=True)
+                added_colors = self._registered_colors.setdefault(key, {f"{prefix}:{c.name}":c.hex for c in colors})
+        # Otherwise, checking that a list of colors was passed
+        elif not isinstance(colors, (list, tuple)):
             raise Exception(f"Invalid input for colors - must be a list of dicts, Colors, or lists or tuples (of length 2); see documentation for details.")
         else:
             # Storing the eventual list of colors we need to update
@@ -633,7 +1557,7 @@ class FlexokiSchema:
                 elif isinstance(c, dict):
                     # Checking for keys
                     if "name" in c.keys() and "color" in c.keys():
-                        added_colors[f"{prefix}:{c["name"]}"] = c["color"]
+                        added_colors[f"{prefix}:{c['name']}"] = c["color"]
                     else:
                         raise Exception(f"Invalid input for colors: {c}; dictionaries must have two keys in them, 'name' and 'color'; see documentation for details.")
                 # Lists/Tuples
@@ -642,6 +1566,83 @@ class FlexokiSchema:
                         added_colors[f"{prefix}:{c[0]}"] = c[1]
                     else:
                         raise Exception(f"Invalid input for colors: {c}; lists and tuples must be of length 2, where 'name' corresponds to the first entry and 'color to the second; see documentation for details.")
-            # Once complete, register the colors
-            # from https://stackoverflow.com/questions/76886019/create-new-named-color-in-matplotlib
-            matplotlib.colors.get_named_colors_mapping().update(added_colors)
\ No newline at end of file
+        
+        # Once complete, register the colors
+        # from https://stackoverflow.com/questions/76886019/create-new-named-color-in-matplotlib
+        import matplotlib.colors
+        mapping = matplotlib.colors.get_named_colors_mapping()
+        # Only writing the colors that are not already registered with the same value
+        changed = {n:c for n,c in added_colors.items() if n not in mapping or mapping[n] != c}
+        if len(changed) > 0:
+            mapping.update(changed)
+            # update() skips matplotlib's own cache invalidation, so clearing the cache of converted colors once here
+            # (otherwise names that were re-registered with new values could still resolve to the old color)
+            if hasattr(mapping, "cache"):
+                mapping.cache.clear()
+
+    # Context manager (and decorator) for applying Flexoki to matplotlib figures
+    # Sets the color cycle (the default colors), and the background/text/axis/grid colors (the Flexoki UI colors) of the theme,
+    # and restores the previous settings on exit (including any changed inside the block, as with matplotlib.rc_context)
+    # theme and lightness are the same as for at(); if neither is passed, the current lightness is used
+    # The snapshot for the lightness is returned, so `with Flexoki.style("dark") as s:` gives access to its colors (i.e. s.red)
+    ## Ex. as a decorator: @Flexoki.style(theme="dark") above a function that draws a figure
+    # The rcParams (including the cycler) for each lightness are only built and validated once, and reused afterwards
+    # fast is for skipping matplotlib's checks when saving and restoring rcParams, which otherwise take most of the time of each call
+    ## this relies on a private function of matplotlib (RcParams._update_raw, only in recent versions), so is off by default,
+    ## and falls back to the usual (public) path on versions of matplotlib without it
+    # Note that this does not register any color names with matplotlib; use register_matplotlib() once beforehand if needed
+    @contextmanager
+    def style(self, theme: Literal["light","dark"]=None, lightness: int=None, fast: bool=False):
+        if fast not in [True, False]:
+            raise Exception(f"Invalid input for fast: {fast}; only True or False are accepted.")
+        snapshot = self.at(lightness=lightness, theme=theme)
+        import matplotlib
+        rc = self._styles.get(snapshot.lightness)
+        if rc is None:
+            from cycler import cycler
+            from flexoki.export import rc_colors
+            rc = rc_colors(snapshot)
+            rc["axes.prop_cycle"] = cycler(color=rc["axes.prop_cycle"])
+            # Building an RcParams validates every value, so this is only done once
+            rc = self._styles.setdefault(snapshot.lightness, matplotlib.RcParams(rc))
+        
+        params = matplotlib.rcParams
+        if not (fast and hasattr(params, "_update_raw")):
+            with matplotlib.rc_context(rc):
+                yield snapshot
+            return
+        # The values are read and written directly, as they are already validated
+        orig = dict.copy(params)
+        del orig["backend"]
+        try:
+            params._update_raw(rc)
+            yield snapshot
+        finally:
+            params._update_raw(orig)
+
+    # Function to register all the colors (see register_matplotlib) and palettes (as colormaps) with matplotlib in one go
+    # Each palette under FlexokiSchema.palettes is registered under "{prefix}:{name}", along with a reversed version under "{prefix}:{name}_r"
+    ## Ex. for the reds palette with a prefix of "flexoki", the colormaps are "flexoki:reds" and "flexoki:reds_r"
+    # kind is the type of colormap to create (see Palette.to_colormap)
+    ## if None, monochromatic palettes (i.e. reds) are registered as "smooth" colormaps, and monolightness palettes (i.e. l600, defaults) as "discrete"
+    # defaults is passed along to register_matplotlib, and also controls if the defaults palette is registered
+    # As with register_matplotlib, anything that is already registered is skipped, so calling this repeatedly is cheap
+    def register_all(self, prefix:str="flexoki", defaults:bool=True, kind:Literal["discrete","smooth"]=None):
+        self.register_matplotlib(prefix=prefix, defaults=defaults)
+        names = list(self.palettes._filters.keys())
+        if defaults == True:
+            names.append("defaults")
+        for name in names:
+            palette = getattr(self.palettes, name)
+            k = kind if kind is not None else "discrete" if name == "defaults" or name[1:].isdigit() else "smooth"
+            palette.to_colormap(kind=k, register=f"{prefix}:{name}")
+            palette.reverse().to_colormap(kind=k, register=f"{prefix}:{name}_r")
+
+    # Function to write the colors out as themes for other tools (CSS custom properties, JSON design tokens, matplotlib styles,
+    # Pygments styles, and terminal palettes), with one file per format and variant (a theme, or a lightness value)
+    # Files are rendered and written on a thread pool, and any that would not change are left as they are
+    # See flexoki.export.export for details on the arguments; returns a dict of {path: True if written, False if unchanged}
+    def export(self, directory, formats: List[str]=None, variants: List[str | int]=("light", "dark"), prefix: str="flexoki",
+               max_workers: int=None, force: bool=False):
+        from flexoki.export import export
+        return export(self, directory, formats=formats, variants=variants, prefix=prefix, max_workers=max_workers, force=force)
@@ -0,0 +1,147 @@
+from collections import OrderedDict
+from functools import lru_cache
+from threading import Lock
+import numpy as np
+from flexoki.metrics import delta_e_matrix
+from flexoki.oklab import srgb_to_linear, linear_to_srgb, srgb_to_oklab
+
+# Simulating color vision deficiencies (CVD), and checking how distinguishable palettes remain under them
+# The simulation uses the matrices of Machado, Oliveira & Fernandes (2009), applied to linear RGB values
+# See https://www.inf.ufrgs.br/~oliveira/pubs_files/CVD_Simulation/CVD_Simulation.html
+# As elsewhere, RGB values are 0-255 arrays of shape (...,3), and distances (deltaE) are euclidean distances in OKLab
+
+### Simulation ###
+# The matrices for each deficiency, at full severity (i.e. protanopia, deuteranopia and tritanopia)
+_MATRICES = {
+    "protan": np.array([[ 0.152286,  1.052583, -0.204868],
+                        [ 0.114503,  0.786281,  0.099216],
+                        [-0.003882, -0.048116,  1.051998]]),
+    "deutan": np.array([[ 0.367322,  0.860646, -0.227968],
+                        [ 0.280085,  0.672501,  0.047413],
+                        [-0.011820,  0.042940,  0.968881]]),
+    "tritan": np.array([[ 1.255528, -0.076749, -0.178779],
+                        [-0.078411,  0.930809,  0.147602],
+                        [ 0.004733,  0.691367,  0.303900]]),
+}
+KINDS = tuple(_MATRICES.keys())
+
+def _check(kind, severity):
+    if kind not in _MATRICES:
+        raise Exception(f"Invalid input for kind: {kind}; only {list(KINDS)} are acceptable values, see documentation for details.")
+    if not isinstance(severity, (int, float)) or not 0 <= severity <= 1:
+        raise Exception(f"Invalid input for severity: {severity}; only numbers between 0 and 1 are accepted.")
+
+# Function to turn the kinds passed to the functions below into a tuple (None is all of them, and a single kind can be passed as a string)
+def parse_kinds(kinds):
+    if kinds is None:
+        return KINDS
+    kinds = (kinds,) if isinstance(kinds, str) else tuple(kinds)
+    for kind in kinds:
+        if kind not in _MATRICES:
+            raise Exception(f"Invalid input for kinds: {kind}; only {list(KINDS)} are acceptable values, see documentation for details.")
+    return kinds
+
+# Function for the matrix of a deficiency at a given severity (between 0, for normal vision, and 1)
+# Partial severities are blended linearly with the identity matrix, which is close to (but not exactly) Machado's own tables
+def matrix(kind: str, severity: float=1.0):
+    _check(kind, severity)
+    return (1 - severity) * np.eye(3) + severity * _MATRICES[kind]
+
+# Function to simulate how colors appear with a color vision deficiency
+# kind is one of "protan", "deutan" or "tritan", and severity is between 0 (normal vision) and 1 (full deficiency)
+# Returns float 0-255 values, with the same shape as rgb
+def simulate(rgb, kind: str="deutan", severity: float=1.0):
+    lin = srgb_to_linear(rgb) @ matrix(kind, severity).T
+    return linear_to_srgb(np.clip(lin, 0, 1))
+
+### Checking ###
+# Function to score many palettes at once, returning the smallest distance between any two colors of each palette,
+# for normal vision and each of the given deficiencies, as an array of shape (number of palettes, 1 + number of kinds)
+## palettes with fewer than two colors score np.inf
+# palettes is a list of (K,3) rgb arrays, which can have different numbers of colors; they are padded to the same size,
+# so that each deficiency is simulated (and every distance calculated) for all of the palettes in one pass
+def score(palettes, kinds=KINDS, severity: float=1.0):
+    for kind in kinds:
+        _check(kind, severity)
+    k = max((len(p) for p in palettes), default=0)
+    rgb = np.zeros((len(palettes), k, 3))
+    mask = np.zeros((len(palettes), k), dtype=bool)
+    for i, p in enumerate(palettes):
+        rgb[i, :len(p)] = np.asarray(p, dtype=np.float64).reshape(-1, 3)
+        mask[i, :len(p)] = True
+    # Pairs that include padding (or a color and itself) are left out of the minimum
+    valid = mask[:, :, None] & mask[:, None, :] & ~np.eye(k, dtype=bool)[None]
+
+    scores = np.full((len(palettes), 1 + len(kinds)), np.inf)
+    if k < 2:
+        return scores
+    for j, kind in enumerate((None,) + tuple(kinds)):
+        lab = srgb_to_oklab(rgb if kind is None else simulate(rgb, kind, severity))
+        d = np.sqrt(((lab[:, :, None, :] - lab[:, None, :, :]) ** 2).sum(axis=-1))
+        scores[:, j] = np.where(valid, d, np.inf).min(axis=(1, 2))
+    return scores
+
+# Cache of the scores for each palette, keyed by (the bytes of its uint8 rgb array, kinds, severity), with least-recently-used eviction
+_SCORE_CACHE_SIZE = 1024
+_score_cache = OrderedDict()
+_score_lock = Lock()
+
+# Function to score many palettes (see score()), memoizing the result for each one
+# Only the palettes that have not been scored before (with the same kinds and severity) are calculated, together in a single pass
+# Returns a list of dicts, one per palette, of {"normal": deltaE, kind: deltaE, ...}
+def check(palettes, kinds=KINDS, severity: float=1.0):
+    kinds, severity = tuple(kinds), float(severity)
+    keys = [(np.ascontiguousarray(np.asarray(p).reshape(-1, 3), dtype=np.uint8).tobytes(), kinds, severity) for p in palettes]
+    results = {}
+    with _score_lock:
+        for key in keys:
+            if key in _score_cache:
+                _score_cache.move_to_end(key)
+                results[key] = _score_cache[key]
+    missing = [key for key in dict.fromkeys(keys) if key not in results]
+    if len(missing) > 0:
+        scores = score([np.frombuffer(key[0], dtype=np.uint8).reshape(-1, 3) for key in missing], kinds, severity)
+        with _score_lock:
+            for key, s in zip(missing, scores.tolist()):
+                results[key] = _score_cache[key] = dict(zip(("normal",) + kinds, s))
+            while len(_score_cache) > _SCORE_CACHE_SIZE:
+                _score_cache.popitem(last=False)
+    # Copies are returned, so that changing a result does not change the cache
+    return [dict(results[key]) for key in keys]
+
+### Selecting ###
+# Function for the order in which to pick colors so that each new color is as distinguishable as possible from those already picked
+# (i.e. greedy farthest-point ordering), where the distance between two colors is the smallest of their distances for normal vision
+# and each of the given deficiencies; the first two colors are the most distinguishable pair
+# Returns a list of indices into rgb, and the distance at which each color was added (np.inf for the first)
+# The result is cached, so picking the first k colors of the order for any k is then free
+@lru_cache(maxsize=128)
+def _order(rgb: bytes, kinds: tuple, severity: float):
+    rgb = np.frombuffer(rgb, dtype=np.uint8).reshape(-1, 3).astype(np.float64)
+    n = len(rgb)
+    if n < 2:
+        return tuple(range(n)), (np.inf,) * n
+    d = np.full((n, n), np.inf)
+    for kind in (None,) + kinds:
+        d = np.minimum(d, delta_e_matrix(rgb if kind is None else simulate(rgb, kind, severity)))
+    np.fill_diagonal(d, -np.inf)
+    first, second = np.unravel_index(np.argmax(d), d.shape)
+    order, gaps = [int(first), int(second)], [np.inf, float(d[first, second])]
+    np.fill_diagonal(d, np.inf)
+    # The distance from each color to the nearest color picked so far
+    nearest = np.minimum(d[first], d[second])
+    nearest[order] = -np.inf
+    for _ in range(n - 2):
+        i = int(np.argmax(nearest))
+        order.append(i)
+        gaps.append(float(nearest[i]))
+        nearest = np.minimum(nearest, d[i])
+        nearest[order] = -np.inf
+    return tuple(order), tuple(gaps)
+
+# Function to get the order (see above) for a (K,3) array-like of 0-255 rgb values
+def order(rgb, kinds=KINDS, severity: float=1.0):
+    for kind in kinds:
+        _check(kind, severity)
+    rgb = np.ascontiguousarray(np.asarray(rgb).reshape(-1, 3), dtype=np.uint8)
+    return _order(rgb.tobytes(), tuple(kinds), float(severity))
@@ -0,0 +1,241 @@
+from typing import List, Literal
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from string import Template
+import json
+import os
+from flexoki.core import _ui_colors, _nearest_lightness
+
+# Exporting the colors as themes for other tools: CSS custom properties, JSON design tokens, matplotlib styles,
+# Pygments styles, and terminal (ANSI) palettes
+# Each theme is rendered from an (immutable) Snapshot of a schema, so rendering never changes the schema, and can be done
+# on several threads at once; files whose contents would not change are left untouched, so regenerating is incremental
+
+### Tokens ###
+_ACCENTS = ("red", "orange", "yellow", "green", "cyan", "blue", "purple", "magenta")
+
+# Function for the UI colors of a snapshot, as a dict of {token: Color}
+# Snapshots without a theme use the light UI colors if their lightness is 500 or more (i.e. darker accents), and the dark ones otherwise
+# These are the same as the UI colors of Snapshot.roles (which are defined in flexoki.core)
+def ui_colors(snapshot):
+    return _ui_colors(snapshot)
+
+# Function for the accent colors of a snapshot, as a dict of {token: Color}
+# Each hue has its default color (i.e. red), and a secondary one (i.e. red-2) at the mirrored lightness value (i.e. 400 for 600)
+## for tables that do not have the mirrored lightness value for a hue, the color of that hue closest to it is used
+def accent_colors(snapshot):
+    secondary = 1000 - snapshot.lightness
+    accents = {n:getattr(snapshot, n) for n in _ACCENTS}
+    accents.update({f"{n}-2":_nearest_lightness(snapshot._colors, accents[n].h, secondary) for n in _ACCENTS})
+    return accents
+
+# Function for the matplotlib rcParams of a snapshot (with hex codes for the colors, and the color cycle as a list)
+def rc_colors(snapshot):
+    ui = ui_colors(snapshot)
+    return {
+        "axes.prop_cycle": [getattr(snapshot, n).hex for n in _ACCENTS],
+        "figure.facecolor": ui["bg"].hex, "figure.edgecolor": ui["bg"].hex,
+        "savefig.facecolor": ui["bg"].hex, "savefig.edgecolor": ui["bg"].hex,
+        "axes.facecolor": ui["bg"].hex, "axes.edgecolor": ui["ui-3"].hex, "axes.labelcolor": ui["tx"].hex, "axes.titlecolor": ui["tx"].hex,
+        "text.color": ui["tx"].hex, "xtick.color": ui["tx-2"].hex, "ytick.color": ui["tx-2"].hex, "grid.color": ui["ui"].hex,
+        "legend.facecolor": ui["bg-2"].hex, "legend.edgecolor": ui["ui-2"].hex, "legend.labelcolor": ui["tx"].hex,
+        "patch.edgecolor": ui["bg"].hex, "boxplot.flierprops.markeredgecolor": ui["tx"].hex,
+    }
+
+### Templates ###
+# The templates are compiled once (here), and only filled in when rendering
+_CSS = Template("""/* Flexoki ($variant), generated by flexoki-py */
+$selector {
+$ui
+$accents
+$colors
+}
+""")
+_CSS_LINE = "  --{prefix}-{name}: {hex};".format
+
+_MPLSTYLE = Template("""# Flexoki ($variant), generated by flexoki-py
+# Colors are written without the leading #, as it starts a comment in matplotlib style files
+$params
+""")
+_MPLSTYLE_LINE = "{name}: {value}".format
+
+_PYGMENTS = Template('''# Flexoki ($variant), generated by flexoki-py
+from pygments.style import Style
+from pygments.token import (Comment, Error, Generic, Keyword, Name, Number, Operator,
+                            Punctuation, String, Text, Whitespace)
+
+class $class_name(Style):
+    name = "$name"
+    background_color = "$bg"
+    highlight_color = "$highlight"
+    line_number_color = "$line_number"
+    styles = {
+$styles
+    }
+''')
+_PYGMENTS_LINE = "        {token}: \"{style}\",".format
+# The token types of Pygments, and the Flexoki colors (from the UI or accent tokens) they are highlighted with
+_PYGMENTS_TOKENS = (
+    ("Text", "tx"), ("Whitespace", "tx-3"), ("Error", "red"), ("Comment", "italic tx-3"), ("Comment.Preproc", "magenta"),
+    ("Keyword", "green"), ("Keyword.Constant", "yellow"), ("Keyword.Type", "yellow"), ("Operator", "tx-2"), ("Punctuation", "tx-2"),
+    ("Name", "tx"), ("Name.Attribute", "blue"), ("Name.Builtin", "orange"), ("Name.Class", "orange"), ("Name.Constant", "yellow"),
+    ("Name.Decorator", "magenta"), ("Name.Exception", "red"), ("Name.Function", "orange"), ("Name.Namespace", "yellow"),
+    ("Name.Tag", "blue"), ("Name.Variable", "blue"), ("String", "cyan"), ("String.Escape", "magenta"), ("Number", "purple"),
+    ("Generic.Deleted", "red"), ("Generic.Inserted", "green"), ("Generic.Heading", "bold tx"), ("Generic.Subheading", "bold tx-2"),
+    ("Generic.Emph", "italic"), ("Generic.Strong", "bold"), ("Generic.Error", "red"), ("Generic.Prompt", "tx-3"),
+)
+
+_XRESOURCES = Template("""! Flexoki ($variant), generated by flexoki-py
+*.background: $background
+*.foreground: $foreground
+*.cursorColor: $cursor
+$colors
+""")
+_XRESOURCES_LINE = "*.color{i}: {hex}".format
+
+### Renderers ###
+# Each renderer takes a snapshot, the name of the variant, and the prefix used for names, and returns the contents of the file
+def _render_css(snapshot, variant, prefix):
+    ui, accents = ui_colors(snapshot), accent_colors(snapshot)
+    return _CSS.substitute(
+        variant=variant,
+        # The light theme is the default, and every other variant applies under a data-theme attribute (i.e. <html data-theme="dark">)
+        selector=":root" if variant == "light" else f'[data-theme="{variant}"]',
+        ui="\n".join(_CSS_LINE(prefix=prefix, name=t, hex=c.hex) for t,c in ui.items()),
+        accents="\n".join(_CSS_LINE(prefix=prefix, name=t, hex=c.hex) for t,c in accents.items()),
+        colors="\n".join(_CSS_LINE(prefix=prefix, name=c.name, hex=c.hex) for c in snapshot._colors._all),
+    )
+
+# JSON design tokens, following the format of the Design Tokens Community Group (https://tr.designtokens.org/format/)
+def _render_json(snapshot, variant, prefix):
+    def group(colors):
+        return {t:{"$type":"color", "$value":c.hex} for t,c in colors.items()}
+    tokens = {prefix: {
+        "$description": f"Flexoki ({variant}), generated by flexoki-py",
+        "ui": group(ui_colors(snapshot)),
+        "accent": group(accent_colors(snapshot)),
+        "color": group({c.name:c for c in snapshot._colors._all}),
+    }}
+    return json.dumps(tokens, indent=2) + "\n"
+
+def _render_mplstyle(snapshot, variant, prefix):
+    lines = []
+    for name, value in rc_colors(snapshot).items():
+        if name == "axes.prop_cycle":
+            value = "cycler('color', [" + ", ".join(f"'{h[1:]}'" for h in value) + "])"
+        else:
+            value = value[1:]
+        lines.append(_MPLSTYLE_LINE(name=name, value=value))
+    return _MPLSTYLE.substitute(variant=variant, params="\n".join(lines))
+
+def _render_pygments(snapshot, variant, prefix):
+    colors = {**ui_colors(snapshot), **accent_colors(snapshot)}
+    # Replacing the names of the colors in each style with their hex codes (leaving words like italic/bold as they are)
+    styles = "\n".join(_PYGMENTS_LINE(token=t, style=" ".join(colors[w].hex if w in colors else w for w in s.split()))
+                       for t,s in _PYGMENTS_TOKENS)
+    return _PYGMENTS.substitute(
+        variant=variant, class_name=f"{_identifier(prefix)}{_identifier(variant)}Style", name=f"{prefix}-{variant}",
+        bg=colors["bg"].hex, highlight=colors["ui"].hex, line_number=colors["tx-3"].hex, styles=styles,
+    )
+
+# Terminal palettes, in the Xresources format (which most terminals can import, or be converted from)
+# The 16 ANSI colors are black, the 6 accents in ANSI order, and white, followed by their bright versions
+# The base colors are given by lightness value (black, base-200, base-600 and paper), as for the UI colors
+def _render_ansi(snapshot, variant, prefix):
+    ui, accents = ui_colors(snapshot), accent_colors(snapshot)
+    base = {l:_nearest_lightness(snapshot._colors, "k", l) for l in (1000, 200, 600, 0)}
+    order = ("red", "green", "yellow", "blue", "magenta", "cyan")
+    ansi = [base[1000]] + [accents[n] for n in order] + [base[200]]
+    ansi += [base[600]] + [accents[f"{n}-2"] for n in order] + [base[0]]
+    return _XRESOURCES.substitute(
+        variant=variant, background=ui["bg"].hex, foreground=ui["tx"].hex, cursor=ui["tx"].hex,
+        colors="\n".join(_XRESOURCES_LINE(i=i, hex=c.hex) for i,c in enumerate(ansi)),
+    )
+
+# Function for turning a name into part of a Python identifier, i.e. flexoki-light to FlexokiLight
+def _identifier(name):
+    return "".join(w.capitalize() for w in str(name).replace("_","-").split("-"))
+
+# The available formats, with the file name (given the prefix and variant) and renderer for each
+# Pygments styles are Python modules, so their names use underscores rather than dashes
+FORMATS = {
+    "css": ("{prefix}-{variant}.css", _render_css),
+    "json": ("{prefix}-{variant}.tokens.json", _render_json),
+    "mplstyle": ("{prefix}-{variant}.mplstyle", _render_mplstyle),
+    "pygments": ("{prefix}_{variant}.py", _render_pygments),
+    "ansi": ("{prefix}-{variant}.Xresources", _render_ansi),
+}
+
+### Exporting ###
+# Function to get the snapshot for a variant, which can be a theme ("light" or "dark") or a lightness value
+def _snapshot(schema, variant):
+    if isinstance(variant, str):
+        return schema.at(theme=variant), variant.lower()
+    return schema.at(lightness=variant), str(variant)
+
+def _check_format(format):
+    if format not in FORMATS:
+        raise Exception(f"Invalid input for format: {format}; only {list(FORMATS.keys())} are acceptable values, see documentation for details.")
+
+# Function to render a single theme as a string, without writing it anywhere
+# format is one of the keys of FORMATS, and variant is either a theme ("light" or "dark") or a lightness value (i.e. 300)
+def render(schema, format: Literal["css","json","mplstyle","pygments","ansi"], variant: str | int="light", prefix: str="flexoki"):
+    _check_format(format)
+    snapshot, name = _snapshot(schema, variant)
+    return FORMATS[format][1](snapshot, name, prefix)
+
+# Function to check if a file already has exactly the given contents, comparing their sizes first and then their hashes
+def _unchanged(path, data):
+    try:
+        if os.stat(path).st_size != len(data):
+            return False
+        with open(path, "rb") as f:
+            return sha256(f.read()).digest() == sha256(data).digest()
+    except OSError:
+        return False
+
+# Function to render and write a single file, returning its path and whether it was (re)written
+def _write(directory, format, snapshot, variant, prefix, force):
+    file_name, renderer = FORMATS[format]
+    path = os.path.join(directory, file_name.format(prefix=prefix, variant=variant))
+    data = renderer(snapshot, variant, prefix).encode("utf-8")
+    if force == False and _unchanged(path, data):
+        return path, False
+    # Writing to a temporary file first, so that nothing ever sees a partially-written file
+    tmp = f"{path}.{os.getpid()}.{id(data)}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path, True
+
+# Function to write themes for many formats and variants at once
+# directory is where the files are written (it is created if needed), and formats is a list of keys of FORMATS (if None, all of them)
+# variants is a list of themes ("light" or "dark") and/or lightness values, with one file written per format and variant
+# prefix is used for the file names, and the names of the colors within them (i.e. --flexoki-red in CSS)
+# max_workers is the number of threads the files are rendered and written on (if None, the default for ThreadPoolExecutor)
+# Files that already have the same contents are not rewritten (unless force is True), so that their modification times are kept
+# Returns a dict of {path: True if written, False if unchanged}
+def export(schema, directory, formats: List[str]=None, variants: List[str | int]=("light", "dark"), prefix: str="flexoki",
+           max_workers: int=None, force: bool=False):
+    if formats is None:
+        formats = list(FORMATS.keys())
+    elif isinstance(formats, str):
+        formats = [formats]
+    for f in formats:
+        _check_format(f)
+    if isinstance(variants, (str, int)):
+        variants = [variants]
+    if not isinstance(prefix, str) or prefix == "":
+        raise Exception(f"Invalid input for prefix: {prefix}; only non-empty strings are accepted.")
+    # The snapshots are fetched up front, so that any invalid variants are reported before anything is written
+    snapshots = [_snapshot(schema, v) for v in variants]
+
+    os.makedirs(directory, exist_ok=True)
+    jobs = [(f, snapshot, name) for snapshot, name in snapshots for f in formats]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = pool.map(lambda job: _write(directory, job[0], job[1], job[2], prefix, force), jobs)
+        return dict(results)
@@ -0,0 +1,138 @@
+from typing import Literal
+import numpy as np
+
+# Assigning colors to categorical columns of dataframes (pandas, Polars, or Arrow), i.e. one color per category for a report
+# The colors are worked out once per category (not per row): each category gets a position in a small table of colors,
+# and the category codes of the column are mapped through it in a single vectorized step
+# The result is itself dictionary-encoded (a categorical of hex codes), and where the categories map straight onto the table of colors,
+# the codes of the column are reused as they are, rather than copied
+# pandas, Polars and pyarrow are all optional, and only imported when a column from that library is passed
+
+### Assigning ###
+# Function to assign a color to each category, returning (hexes, rgb, lut)
+## hexes is the table of (unique) hex codes, rgb is the matching (M,3) uint8 array, and lut is the position in the table of each category
+# Categories are given the colors of the palette in order (starting over from the first color if there are more categories than colors),
+# except for those in mapping, which is a dict of {category: Color or hex code}
+def assign(categories, palette, mapping: dict=None):
+    colors = list(palette)
+    if len(colors) == 0:
+        raise Exception("Invalid input for palette: at least one color is needed to assign colors to categories.")
+    # The table starts with the colors of the palette (without repeats), so that the positions of the categories match the codes of the column
+    # wherever possible; colors from mapping that are not in the palette are added after them
+    positions, rgb = {}, []
+    def position(hex, values):
+        i = positions.get(hex)
+        if i is None:
+            i = positions[hex] = len(rgb)
+            rgb.append(values)
+        return i
+    order = [position(c.hex, c.rgb) for c in colors]
+
+    lut, j = [], 0
+    for category in categories:
+        c = mapping.get(category) if mapping is not None else None
+        if c is None:
+            lut.append(order[j % len(order)])
+            j += 1
+        elif hasattr(c, "hex") and hasattr(c, "rgb"):
+            lut.append(position(c.hex, c.rgb))
+        elif isinstance(c, str) and len(c) == 7 and c.startswith("#"):
+            try:
+                lut.append(position(c.upper(), (int(c[1:3], 16), int(c[3:5], 16), int(c[5:7], 16))))
+            except ValueError:
+                raise Exception(f"Invalid input for mapping: {c}; only Colors or hex codes (i.e. #AF3029) are accepted.")
+        else:
+            raise Exception(f"Invalid input for mapping: {c}; only Colors or hex codes (i.e. #AF3029) are accepted.")
+    return list(positions.keys()), np.array(rgb, dtype=np.uint8).reshape(-1, 3), np.array(lut, dtype=np.int64)
+
+# Function for the table of rgb(a) values to index into, with an extra row at the end (zeros, i.e. transparent) for missing values
+def _rgb_table(rgb, returns):
+    table = np.zeros((len(rgb) + 1, 3 if returns == "rgb" else 4), dtype=np.uint8)
+    table[:-1, :3] = rgb
+    if returns == "rgba":
+        table[:-1, 3] = 255
+    return table
+
+### pandas ###
+# Categorical codes are -1 for missing values, which also picks the last (empty) row of the rgb table
+def _pandas(column, palette, mapping, returns):
+    import pandas as pd
+    is_categorical = isinstance(column, pd.Categorical)
+    series = pd.Series(column, copy=False) if is_categorical else column
+    if not isinstance(series, pd.Series):
+        raise Exception(f"Invalid input for column: {type(column)}; only pandas Series or Categoricals are accepted.")
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype("category")
+    # The codes of the Categorical itself (series.cat.codes is a copy of them, as a new Series)
+    codes = series.array.codes
+    hexes, rgb, lut = assign(series.cat.categories, palette, mapping)
+
+    # Where each category already sits at its own position in the table, the codes are used as they are
+    if len(lut) <= len(hexes) and np.array_equal(lut, np.arange(len(lut))):
+        new_codes = codes
+    else:
+        dtype = codes.dtype if len(hexes) <= np.iinfo(codes.dtype).max else np.int32
+        new_codes = np.where(codes < 0, -1, lut.astype(dtype)[codes])
+    if returns != "hex":
+        return _rgb_table(rgb, returns)[new_codes]
+    result = pd.Categorical.from_codes(new_codes, categories=pd.Index(hexes))
+    return result if is_categorical else pd.Series(result, index=series.index, name=series.name, copy=False)
+
+### Arrow ###
+# Arrow arrays are dictionary-encoded (if they are not already), and the chunks of a ChunkedArray are given the same dictionary,
+# so that every chunk shares one table of colors; missing values stay missing (or, for rgb(a), get the last (empty) row of the table)
+def _arrow(column, palette, mapping, returns):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    chunked = isinstance(column, pa.ChunkedArray)
+    if not chunked and not isinstance(column, pa.Array):
+        raise Exception(f"Invalid input for column: {type(column)}; only Arrow Arrays or ChunkedArrays are accepted.")
+    if not pa.types.is_dictionary(column.type):
+        column = column.dictionary_encode()
+    if chunked:
+        column = column.unify_dictionaries()
+        chunks = column.chunks
+        categories = chunks[0].dictionary if len(chunks) > 0 else pa.array([], type=column.type.value_type)
+    else:
+        chunks = [column]
+        categories = column.dictionary
+    hexes, rgb, lut = assign(categories.to_pylist(), palette, mapping)
+
+    identity = len(lut) <= len(hexes) and np.array_equal(lut, np.arange(len(lut)))
+    lut = pa.array(lut.astype(np.int32))
+    indices = [c.indices if identity else pc.take(lut, c.indices) for c in chunks]
+    if returns != "hex":
+        table = _rgb_table(rgb, returns)
+        parts = [table[pc.fill_null(i, len(hexes)).to_numpy()] for i in indices]
+        return np.concatenate(parts) if len(parts) > 0 else np.empty((0, table.shape[1]), dtype=np.uint8)
+    dictionary = pa.array(hexes, type=pa.string())
+    result = [pa.DictionaryArray.from_arrays(i, dictionary) for i in indices]
+    if chunked:
+        return pa.chunked_array(result, type=pa.dictionary(result[0].type.index_type if result else pa.int32(), pa.string()))
+    return result[0]
+
+### Polars ###
+# Polars columns are passed through Arrow (where categoricals are already dictionary-encoded, so this does not copy the values)
+def _polars(column, palette, mapping, returns):
+    import polars as pl
+    if not isinstance(column, pl.Series):
+        raise Exception(f"Invalid input for column: {type(column)}; only Polars Series are accepted.")
+    result = _arrow(column.to_arrow(), palette, mapping, returns)
+    if returns != "hex":
+        return result
+    return pl.from_arrow(result).alias(column.name)
+
+_LIBRARIES = {"pandas":_pandas, "pyarrow":_arrow, "polars":_polars}
+
+# Function to get a column of colors for a categorical column, i.e. of a pandas/Polars dataframe
+# column is a pandas Series or Categorical, a Polars Series, or an Arrow Array or ChunkedArray (which are treated as categorical if they are not)
+# palette is the colors to assign to the categories, in the order of the categories (see assign() above, along with mapping)
+# returns can be "hex", for a column of the same kind as was passed, dictionary-encoded (i.e. a categorical of hex codes),
+# or "rgb"/"rgba", for a uint8 array of shape (N,3)/(N,4), where missing values are (0,0,0) or transparent (0,0,0,0)
+def color_column(column, palette, mapping: dict=None, returns: Literal["hex","rgb","rgba"]="hex"):
+    if returns not in ["hex", "rgb", "rgba"]:
+        raise Exception(f"Invalid input for returns: {returns}; only 'hex', 'rgb' or 'rgba' are acceptable values, see documentation for details.")
+    handler = _LIBRARIES.get(type(column).__module__.split(".")[0])
+    if handler is None:
+        raise Exception(f"Invalid input for column: {type(column)}; only pandas, Polars or Arrow columns are accepted.")
+    return handler(column, palette, mapping, returns)
@@ -0,0 +1,181 @@
+from contextlib import contextmanager
+from functools import wraps
+from threading import Lock
+import sys
+import time
+from flexoki import core
+
+# Opt-in instrumentation of the main functions of flexoki, for finding out how much time is spent in them
+# For each function, this records the number of calls, the total time spent in them, how often their caches were hit or missed,
+# and (optionally) the net number of memory blocks allocated by them (from sys.getallocatedblocks(), so this includes anything they cached)
+# Instrumentation is added by replacing the functions with timed versions when it is turned on, and putting the originals back
+# when it is turned off, so while it is off it costs nothing at all; while on, each call costs around a microsecond more
+## counting allocations is off by default, as sys.getallocatedblocks() gets slower as the process uses more memory
+## Ex. enable() ... stats(), or `with measure() as m: ...` followed by m.stats()
+# Note that calls made inside other instrumented functions (i.e. the filter() calls made by register_matplotlib()) are counted too
+
+# The functions that are instrumented, as (name, owner, attribute)
+# The colors classes are created for each schema, so they are found through core._schemas (see _targets() below)
+_FUNCTIONS = [
+    ("FlexokiSchema.__init__", core.FlexokiSchema, "__init__"),
+    ("FlexokiSchema.register_matplotlib", core.FlexokiSchema, "register_matplotlib"),
+    ("Palette.to_colormap", core.Palette, "to_colormap"),
+]
+_COLORS_FUNCTIONS = [("colors.filter", "filter"), ("colors.__getitem__", "__getitem__")]
+
+### Recording ###
+# Class for a set of counters, one per function
+# If allocations is True, the net number of memory blocks allocated by each function is also counted
+class Recorder:
+    def __init__(self, allocations: bool=False):
+        self.allocations = allocations
+        self._counters = {}
+
+    def _get(self, name):
+        c = self._counters.get(name)
+        if c is None:
+            c = self._counters.setdefault(name, {"calls":0, "time":0.0, "misses":0, "allocated":0})
+        return c
+
+    # Function to get a snapshot of the counters, as a dict of {function name: {statistic: value}}
+    # hits are the calls that did not miss a cache, and hit_ratio is hits/calls (or None, if there were no calls)
+    def stats(self):
+        with _lock:
+            out = {}
+            for name, c in self._counters.items():
+                hits = max(c["calls"] - c["misses"], 0)
+                out[name] = {"calls":c["calls"], "time_s":c["time"], "mean_us":c["time"] / c["calls"] * 1e6 if c["calls"] > 0 else None,
+                             "hits":hits, "misses":c["misses"], "hit_ratio":hits / c["calls"] if c["calls"] > 0 else None,
+                             "allocated_blocks":c["allocated"] if self.allocations else None}
+            return out
+
+    def reset(self):
+        with _lock:
+            self._counters.clear()
+
+# The recorder used by enable()/stats(), and those of any measure() blocks that are running, which all receive every event
+_global = Recorder()
+_recorders = []
+_lock = Lock()
+_originals = {}
+# True if any of the running recorders are counting allocations
+_allocations = False
+
+def _record(name, elapsed, allocated):
+    with _lock:
+        for r in _recorders:
+            c = r._get(name)
+            c["calls"] += 1
+            c["time"] += elapsed
+            c["allocated"] += allocated
+
+def _miss(name):
+    with _lock:
+        for r in _recorders:
+            r._get(name)["misses"] += 1
+
+# Function to wrap a function, so that each call is timed and recorded under name
+def _timed(name, func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        allocations = _allocations
+        blocks = sys.getallocatedblocks() if allocations else 0
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            _record(name, elapsed, sys.getallocatedblocks() - blocks if allocations else 0)
+    wrapper._flexoki_original = func
+    return wrapper
+
+### Switching on/off ###
+# Function to add the timed versions to a colors class (of a single schema)
+def _patch_colors(cls):
+    for name, attr in _COLORS_FUNCTIONS:
+        func = cls.__dict__[attr]
+        if not hasattr(func, "_flexoki_original"):
+            setattr(cls, attr, _timed(name, func))
+
+def _unpatch_colors(cls):
+    for name, attr in _COLORS_FUNCTIONS:
+        func = cls.__dict__[attr]
+        if hasattr(func, "_flexoki_original"):
+            setattr(cls, attr, func._flexoki_original)
+
+# Schemas created while instrumentation is on also need their colors class patched, so this wraps the timed __init__
+def _init_wrapper(init):
+    @wraps(init)
+    def wrapper(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        _patch_colors(type(self.colors))
+    wrapper._flexoki_original = init
+    return wrapper
+
+def _start(recorder):
+    global _allocations
+    with _lock:
+        if recorder in _recorders:
+            return
+        _recorders.append(recorder)
+        _allocations = any(r.allocations for r in _recorders)
+        if len(_recorders) > 1:
+            return
+        # Only the first recorder to start actually adds the instrumentation
+        for name, owner, attr in _FUNCTIONS:
+            _originals[(owner, attr)] = owner.__dict__[attr]
+            func = _timed(name, owner.__dict__[attr])
+            setattr(owner, attr, _init_wrapper(func) if attr == "__init__" else func)
+        for schema in list(core._schemas):
+            _patch_colors(type(schema.colors))
+        core._on_miss = _miss
+
+def _stop(recorder):
+    global _allocations
+    with _lock:
+        if recorder not in _recorders:
+            return
+        _recorders.remove(recorder)
+        _allocations = any(r.allocations for r in _recorders)
+        if len(_recorders) > 0:
+            return
+        # And the last recorder to stop removes it again
+        core._on_miss = None
+        for (owner, attr), func in _originals.items():
+            setattr(owner, attr, func)
+        _originals.clear()
+        for schema in list(core._schemas):
+            _unpatch_colors(type(schema.colors))
+
+### Public functions ###
+# Functions to turn the (global) instrumentation on and off; the counters are kept until reset() is called
+# allocations is whether to also count allocations (see Recorder)
+def enable(allocations: bool=False):
+    if _global in _recorders:
+        disable()
+    _global.allocations = allocations
+    _start(_global)
+
+def disable():
+    _stop(_global)
+
+def enabled():
+    return _global in _recorders
+
+def reset():
+    _global.reset()
+
+# Function to get a snapshot of the global counters (see Recorder.stats for the format)
+def stats():
+    return _global.stats()
+
+# Context manager for measuring a block of code on its own, independently of (and without changing) the global counters
+# Yields a Recorder, whose stats() can be read during or after the block
+@contextmanager
+def measure(allocations: bool=False):
+    recorder = Recorder(allocations)
+    _start(recorder)
+    try:
+        yield recorder
+    finally:
+        _stop(recorder)
@@ -0,0 +1,106 @@
+from collections import OrderedDict
+from hashlib import sha1
+from threading import Lock
+import os
+import tempfile
+import numpy as np
+from flexoki.quantize import quantize
+from flexoki.utils import cache_dir
+
+# Precomputed 3D lookup tables (LUTs), mapping any RGB value straight to the index of its nearest palette color
+# The RGB cube is split into 2^bits bins per channel (i.e. 32x32x32 for bits=5, or 64x64x64 for bits=6),
+# and each bin stores the index (as a uint8) of the palette color nearest to its center
+# Tables are cached on disk under a hash of the palette, and memory-mapped when loaded, so they are only built once
+# and can be shared between processes (the operating system only keeps one copy of the file in memory)
+
+# Bumped whenever the way tables are built changes, so that old cached files are not used
+_VERSION = 1
+
+# Tables that have already been loaded in this process, keyed by (palette hash, bits), with least-recently-used eviction
+# (an 8-bit table is 16MB, so only the most recently used tables are kept; evicted ones are loaded again from disk if needed)
+_LOADED_SIZE = 32
+_loaded = OrderedDict()
+_lock = Lock()
+
+# Function to check the inputs, and return the palette as a (K,3) uint8 array
+def _check(palette_rgb, bits):
+    palette_rgb = np.asarray(palette_rgb).reshape(-1, 3)
+    if not isinstance(bits, int) or not 1 <= bits <= 8:
+        raise Exception(f"Invalid input for bits: {bits}; only integers between 1 and 8 are accepted.")
+    if not 1 <= len(palette_rgb) <= 256:
+        raise Exception(f"Invalid input for palette_rgb: {len(palette_rgb)} colors; lookup tables can only be built for palettes of 1 to 256 colors.")
+    return np.ascontiguousarray(palette_rgb, dtype=np.uint8)
+
+# Function to build a lookup table (without any caching)
+# palette_rgb is a (K,3) array-like of 0-255 values, and bits is the number of bits per channel (the table has 2^bits bins per channel)
+# Returns a uint8 array of shape (2^bits, 2^bits, 2^bits), indexed by [r >> (8-bits), g >> (8-bits), b >> (8-bits)]
+def build_lut(palette_rgb, bits: int=6):
+    palette_rgb = _check(palette_rgb, bits)
+    n = 2 ** bits
+    step = 256 / n
+    centers = np.arange(n) * step + (step - 1) / 2
+    grid = np.stack(np.meshgrid(centers, centers, centers, indexing="ij"), axis=-1).astype(np.float32)
+    # quantize treats float arrays as 0-1 values, so the centers are scaled down to match
+    return quantize(grid / 255.0, palette_rgb, returns="indices").astype(np.uint8)
+
+# Function to get the lookup table for a palette, building (and caching) it only if needed
+# If cache is True, the table is saved to (and loaded from) cache_dir(), and memory-mapped when loaded
+# The table is also kept in memory for this process, so later calls just return the same (read-only) array
+def load_lut(palette_rgb, bits: int=6, cache: bool=True):
+    palette_rgb = _check(palette_rgb, bits)
+    digest = sha1(palette_rgb.tobytes() + bytes([bits, _VERSION])).hexdigest()[:20]
+    key = (digest, bits)
+    with _lock:
+        lut = _loaded.get(key)
+        if lut is not None:
+            _loaded.move_to_end(key)
+            return lut
+        if cache == True:
+            path = os.path.join(cache_dir(), f"lut-{bits}-{digest}.npy")
+            try:
+                lut = np.load(path, mmap_mode="r")
+            except (OSError, ValueError):
+                lut = build_lut(palette_rgb, bits)
+                # Writing to a temporary file first, so that other processes never see a partially-written table
+                tmp = None
+                try:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".npy")
+                    with os.fdopen(fd, "wb") as f:
+                        np.save(f, lut)
+                    os.replace(tmp, path)
+                    lut = np.load(path, mmap_mode="r")
+                # If the cache can't be written to, the table is still usable from memory
+                except OSError:
+                    if tmp is not None and os.path.exists(tmp):
+                        os.remove(tmp)
+        else:
+            lut = build_lut(palette_rgb, bits)
+        if lut.flags.writeable:
+            lut.flags.writeable = False
+        _loaded[key] = lut
+        while len(_loaded) > _LOADED_SIZE:
+            _loaded.popitem(last=False)
+    return lut
+
+# Function to map an array of RGB values to palette indices using a lookup table
+# pixels must have a final dimension of 3; integer arrays are treated as 0-255 values, and float arrays as 0-1 values
+# Returns an array of uint8 indices, with the shape of pixels (minus the last dimension)
+def apply_lut(pixels, lut):
+    pixels = np.asarray(pixels)
+    if pixels.ndim < 1 or pixels.shape[-1] != 3:
+        raise Exception(f"Invalid input for pixels: array of shape {pixels.shape}; only arrays with a final dimension of 3 (RGB) are accepted.")
+    if pixels.dtype.kind == "f":
+        pixels = np.clip(np.rint(pixels * 255.0), 0, 255)
+    # Other integer types are clipped to 0-255 first, rather than wrapping around (i.e. 256 to 0) when cast to uint8
+    elif pixels.dtype.kind in "iu" and pixels.dtype != np.uint8:
+        info = np.iinfo(pixels.dtype)
+        pixels = np.clip(pixels, max(info.min, 0), min(info.max, 255))
+    pixels = pixels.astype(np.uint8, copy=False)
+    bits = int(round(np.log2(lut.shape[0])))
+    shift = 8 - bits
+    # Combining the three channels into a single index into the flattened table
+    index = (pixels[..., 0] >> shift).astype(np.uint32) << (2 * bits)
+    index |= (pixels[..., 1] >> shift).astype(np.uint32) << bits
+    index |= pixels[..., 2] >> shift
+    return lut.reshape(-1)[index]
@@ -0,0 +1,113 @@
+from functools import lru_cache
+from typing import Literal
+import numpy as np
+
+# Mapping arrays of scalar values straight to colors, without going through (or needing) matplotlib
+# Each palette is turned into a table of RGBA values (as uint8), and every value is mapped to an entry of the table
+# in the same way as a matplotlib colormap would, so the results match those of Palette.to_colormap()
+
+# Default number of values processed at a time, which bounds the memory used for the intermediate (float and index) arrays
+CHUNK_SIZE = 65536
+
+### Tables ###
+# Function to build the (read-only) RGBA table for a palette, cached by the palette's colors
+# rgb is the bytes of a (K,3) uint8 array of the palette colors (so that it can be hashed)
+## "discrete" tables have one entry per bin, with the colors picked from the palette (as with ListedColormap.resampled())
+## "smooth" tables have size entries, linearly interpolated between the (evenly spaced) palette colors (as with LinearSegmentedColormap.from_list())
+@lru_cache(maxsize=128)
+def _table(rgb: bytes, kind: str, size: int):
+    rgb = np.frombuffer(rgb, dtype=np.uint8).reshape(-1, 3).astype(np.float64)
+    k = len(rgb)
+    x = np.linspace(0, 1, size)
+    if kind == "discrete":
+        colors = rgb[np.minimum((x * k).astype(int), k - 1)] if size != k else rgb
+    else:
+        # Interpolating 0-1 values (in the same order of operations as matplotlib), and truncating them back to 0-255
+        colors = np.repeat(rgb / 255.0, size, axis=0) if k == 1 else np.empty((size, 3))
+        if k > 1:
+            stops = np.linspace(0, 1, k) * (size - 1)
+            xs = x * (size - 1)
+            y = rgb / 255.0
+            colors[0], colors[-1] = y[0], y[-1]
+            if size > 2:
+                ind = np.searchsorted(stops, xs)[1:-1]
+                distance = ((xs[1:-1] - stops[ind - 1]) / (stops[ind] - stops[ind - 1]))[:, None]
+                colors[1:-1] = distance * (y[ind] - y[ind - 1]) + y[ind - 1]
+        colors = (colors * 255.0).astype(np.uint8)
+    table = np.empty((size, 4), dtype=np.uint8)
+    table[:, :3] = np.rint(colors)
+    table[:, 3] = 255
+    table.flags.writeable = False
+    return table
+
+# Function to get the table for a palette, given as a (K,3) array-like of 0-255 values
+# size is the number of entries, defaulting to one per color for "discrete", and 256 for "smooth"
+def table(palette_rgb, kind: Literal["discrete","smooth"]="smooth", size: int=None):
+    palette_rgb = np.ascontiguousarray(np.asarray(palette_rgb).reshape(-1, 3), dtype=np.uint8)
+    if len(palette_rgb) == 0:
+        raise Exception("Invalid input for palette_rgb: at least one color is needed to build a table.")
+    if kind not in ["discrete", "smooth"]:
+        raise Exception(f"Invalid input for kind: {kind}; the only accepted values are 'discrete' or 'smooth'.")
+    if size is None:
+        size = len(palette_rgb) if kind == "discrete" else 256
+    elif not isinstance(size, int) or size < 1:
+        raise Exception(f"Invalid input for size: {size}; only positive integers are accepted.")
+    return _table(palette_rgb.tobytes(), kind, size)
+
+### Mapping ###
+# Function to map an array of values onto a table of colors
+# values can be any array-like of numbers (or booleans, which are treated as 0/1); values below vmin get the first color, and those above vmax the last
+## NaN values are mapped to transparent black (0,0,0,0), and if vmin/vmax are None, the smallest/largest (non-NaN) values are used
+# table is an (N,4) uint8 array, from table() above
+# out is an optional uint8 array of shape values.shape + (4,) (or + (3,), to leave out the alpha) to write the colors into, which is also returned
+## if None, a new array is allocated
+# chunk_size is the number of values processed at once; all the work within a chunk is done by numpy
+def map_values(values, table, vmin: float=None, vmax: float=None, out=None, chunk_size: int=None):
+    values = np.asarray(values)
+    if values.dtype.kind not in "biuf":
+        raise Exception(f"Invalid input for values: array of dtype {values.dtype}; only numeric arrays are accepted.")
+    # Booleans cannot be subtracted, so they are mapped as 0/1 instead (as matplotlib does)
+    if values.dtype.kind == "b":
+        values = values.astype(np.uint8)
+    if chunk_size is None:
+        chunk_size = CHUNK_SIZE
+    elif not isinstance(chunk_size, int) or chunk_size < 1:
+        raise Exception(f"Invalid input for chunk_size: {chunk_size}; only positive integers are accepted.")
+    if out is None:
+        out = np.empty(values.shape + (4,), dtype=np.uint8)
+    elif not isinstance(out, np.ndarray) or out.dtype != np.uint8 or out.shape[:-1] != values.shape or out.shape[-1:] not in [(3,), (4,)]:
+        raise Exception(f"Invalid input for out: only uint8 arrays of shape {values.shape + (4,)} or {values.shape + (3,)} are accepted.")
+    if values.size == 0:
+        return out
+    # vmin/vmax are always floats, so that the range (and the scaling below) cannot overflow for integer values
+    vmin = float(np.nanmin(values) if vmin is None else vmin)
+    vmax = float(np.nanmax(values) if vmax is None else vmax)
+
+    n = len(table)
+    channels = out.shape[-1]
+    # Including a final transparent entry for NaN values, so that they can be looked up in the same step as everything else
+    lookup = np.vstack([table[:, :channels], np.zeros((1, channels), dtype=np.uint8)])
+    # Values are scaled so that [vmin, vmax] covers [0, n), and then truncated to the index of their entry
+    scale = n / (vmax - vmin) if vmax != vmin else 0.0
+    flat = values.reshape(-1)
+    out_flat = out.reshape(-1, channels)
+    # If out is not contiguous, reshape() makes a copy, so the results are written through a temporary array and copied back
+    direct = np.shares_memory(out_flat, out)
+    x = np.empty(min(chunk_size, flat.size), dtype=np.float64)
+    idx = np.empty(len(x), dtype=np.intp)
+    for start in range(0, flat.size, chunk_size):
+        chunk = flat[start:start+chunk_size]
+        m = len(chunk)
+        xs, ids = x[:m], idx[:m]
+        # Subtracting as floats, as integer values below vmin would otherwise wrap around (i.e. to the top of the table)
+        np.subtract(chunk, vmin, out=xs, dtype=np.float64)
+        np.multiply(xs, scale, out=xs)
+        nan = np.isnan(xs)
+        np.clip(xs, 0, n - 1, out=xs)
+        # Filling the NaN values with n (the transparent entry) before casting, as casting NaN to an integer is undefined
+        xs[nan] = n
+        np.copyto(ids, xs, casting="unsafe")
+        np.take(lookup, ids, axis=0, out=out_flat[start:start+m])
+    if not direct:
+        out[...] = out_flat.reshape(out.shape)
+    return out
@@ -0,0 +1,43 @@
+from functools import lru_cache
+import numpy as np
+from flexoki.oklab import srgb_to_linear, srgb_to_oklab
+
+# Pairwise comparisons between colors, calculated for whole sets of colors at once
+# All functions take arrays of 0-255 RGB values with shape (N,3) (the same as Palette.rgb(array=True))
+
+### Contrast ###
+# Function for the WCAG 2 relative luminance of each color (0 for black, 1 for white)
+# See https://www.w3.org/TR/WCAG21/#dfn-relative-luminance
+def relative_luminance(rgb):
+    return srgb_to_linear(rgb) @ np.array([0.2126, 0.7152, 0.0722])
+
+# Function for the WCAG 2 contrast ratio (between 1 and 21) of every pair of colors
+# Returns an (N,M) array, where [i,j] is the contrast between rgb_a[i] and rgb_b[j]; if rgb_b is None, rgb_a is compared with itself
+def contrast_matrix(rgb_a, rgb_b=None):
+    la = relative_luminance(np.asarray(rgb_a).reshape(-1, 3))[:, None] + 0.05
+    lb = la.T if rgb_b is None else relative_luminance(np.asarray(rgb_b).reshape(-1, 3))[None, :] + 0.05
+    return np.maximum(la, lb) / np.minimum(la, lb)
+
+### Distance ###
+# Function for the perceptual distance (deltaE, as the euclidean distance in OKLab) between every pair of colors
+# Returns an (N,M) array as with contrast_matrix(); a distance of about 0.02 is the smallest that is noticeable
+def delta_e_matrix(rgb_a, rgb_b=None):
+    la = srgb_to_oklab(np.asarray(rgb_a).reshape(-1, 3))
+    lb = la if rgb_b is None else srgb_to_oklab(np.asarray(rgb_b).reshape(-1, 3))
+    return np.sqrt(((la[:, None, :] - lb[None, :, :]) ** 2).sum(axis=-1))
+
+### Caching ###
+# Cached versions of the above, keyed by the bytes of the (uint8) rgb arrays, used by Palette and FlexokiSchema
+# The arrays returned are read-only, as they are shared between every caller
+@lru_cache(maxsize=256)
+def _cached(kind, a, b):
+    rgb_a = np.frombuffer(a, dtype=np.uint8).reshape(-1, 3)
+    rgb_b = None if b is None else np.frombuffer(b, dtype=np.uint8).reshape(-1, 3)
+    m = contrast_matrix(rgb_a, rgb_b) if kind == "contrast" else delta_e_matrix(rgb_a, rgb_b)
+    m.flags.writeable = False
+    return m
+
+def cached_matrix(kind, rgb_a, rgb_b=None):
+    a = np.ascontiguousarray(rgb_a, dtype=np.uint8).tobytes()
+    b = None if rgb_b is None else np.ascontiguousarray(rgb_b, dtype=np.uint8).tobytes()
+    return _cached(kind, a, b)
@@ -0,0 +1,97 @@
+from functools import lru_cache
+import numpy as np
+
+# Conversions between sRGB and the OKLab/OKLCH colorspaces
+# See https://bottosson.github.io/posts/oklab/ for the definitions of the matrices used below
+# All functions work on arrays of any shape, as long as the final dimension is 3 (i.e. a single color, (N,3), or (H,W,3))
+# RGB values are always 0-255 (the same as Color.rgb), and do not need to be integers
+
+# Linear sRGB -> LMS, and LMS (cube-rooted) -> OKLab
+_M1 = np.array([[0.4122214708, 0.5363325363, 0.0514459929],
+                [0.2119034982, 0.6806995451, 0.1073969566],
+                [0.0883024619, 0.2817188376, 0.6299787005]])
+_M2 = np.array([[0.2104542553,  0.7936177850, -0.0040720468],
+                [1.9779984951, -2.4285922050,  0.4505937099],
+                [0.0259040371,  0.7827717662, -0.8086757660]])
+# And their inverses, for going back the other way
+_M1_INV = np.array([[ 4.0767416621, -3.3077115913,  0.2309699292],
+                    [-1.2684380046,  2.6097574011, -0.3413193965],
+                    [-0.0041960863, -0.7034186147,  1.7076147010]])
+_M2_INV = np.array([[1.0,  0.3963377774,  0.2158037573],
+                    [1.0, -0.1055613458, -0.0638541728],
+                    [1.0, -0.0894841775, -1.2914855480]])
+
+### sRGB <-> linear RGB ###
+# Function for converting 0-255 sRGB values to 0-1 linear RGB values (i.e. removing the gamma)
+def srgb_to_linear(rgb):
+    c = np.asarray(rgb, dtype=np.float64) / 255.0
+    return np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+
+# Function for converting 0-1 linear RGB values back to 0-255 sRGB values
+def linear_to_srgb(lin):
+    c = np.asarray(lin, dtype=np.float64)
+    # Negative values can appear for out-of-gamut colors, so the power is only taken of the absolute value
+    c = np.where(np.abs(c) <= 0.0031308, 12.92 * c, np.sign(c) * (1.055 * np.abs(c) ** (1 / 2.4) - 0.055))
+    return c * 255.0
+
+### sRGB <-> OKLab ###
+# Function for converting 0-255 sRGB values to OKLab (L, a, b) values
+def srgb_to_oklab(rgb):
+    lms = np.cbrt(srgb_to_linear(rgb) @ _M1.T)
+    return lms @ _M2.T
+
+# Function for converting OKLab values to 0-255 sRGB values
+# If clip is True, out-of-gamut colors will be clipped to the 0-255 range
+def oklab_to_srgb(lab, clip: bool=True):
+    lms = (np.asarray(lab, dtype=np.float64) @ _M2_INV.T) ** 3
+    rgb = linear_to_srgb(lms @ _M1_INV.T)
+    return np.clip(rgb, 0, 255) if clip == True else rgb
+
+### OKLab <-> OKLCH ###
+# Function for converting OKLab values to OKLCH (lightness, chroma, hue) values
+# Hue is returned in degrees, between 0 and 360
+def oklab_to_oklch(lab):
+    lab = np.asarray(lab, dtype=np.float64)
+    L, a, b = lab[..., 0], lab[..., 1], lab[..., 2]
+    return np.stack([L, np.hypot(a, b), np.degrees(np.arctan2(b, a)) % 360], axis=-1)
+
+# Function for converting OKLCH values (with hue in degrees) to OKLab values
+def oklch_to_oklab(lch):
+    lch = np.asarray(lch, dtype=np.float64)
+    L, C, h = lch[..., 0], lch[..., 1], np.radians(lch[..., 2])
+    return np.stack([L, C * np.cos(h), C * np.sin(h)], axis=-1)
+
+# Convenience functions for going directly between sRGB and OKLCH
+def srgb_to_oklch(rgb):
+    return oklab_to_oklch(srgb_to_oklab(rgb))
+
+def oklch_to_srgb(lch, clip: bool=True):
+    return oklab_to_srgb(oklch_to_oklab(lch), clip=clip)
+
+# Cached versions of the conversions for a single color, used by the Color.oklab and Color.oklch properties
+@lru_cache(maxsize=1024)
+def _oklab(rgb):
+    return tuple(float(v) for v in srgb_to_oklab(rgb))
+
+@lru_cache(maxsize=1024)
+def _oklch(rgb):
+    return tuple(float(v) for v in oklab_to_oklch(_oklab(rgb)))
+
+### Ramps ###
+# Function for generating new colors by interpolating between existing ones in OKLab
+# rgb is an array of 0-255 values with shape (..., K, 3), i.e. one or more stacks of K colors
+# positions are the K (increasing) lightness values that each of those colors sits at, shared by every stack
+# targets are the M lightness values to generate colors for, which must fall within the range of positions
+# Returns an array of uint8 0-255 values with shape (..., M, 3); every stack is interpolated in a single pass
+def ramp(rgb, positions, targets):
+    lab = srgb_to_oklab(rgb)
+    positions = np.asarray(positions, dtype=np.float64)
+    targets = np.asarray(targets, dtype=np.float64)
+    if targets.min() < positions[0] or targets.max() > positions[-1]:
+        raise Exception(f"Invalid input for targets: only values between {positions[0]:g} and {positions[-1]:g} can be interpolated.")
+    # Finding the two colors on either side of each target, and how far along between them it sits
+    upper = np.clip(np.searchsorted(positions, targets, side="right"), 1, len(positions) - 1)
+    lower = upper - 1
+    t = ((targets - positions[lower]) / (positions[upper] - positions[lower]))[:, None]
+    lab_new = lab[..., lower, :] * (1 - t) + lab[..., upper, :] * t
+    return np.rint(oklab_to_srgb(lab_new)).astype(np.uint8)
@@ -0,0 +1,57 @@
+from typing import Literal
+import numpy as np
+
+# Default number of pixels processed at a time; with ~120 colors this keeps the distance matrix around 4MB
+# (small enough to stay in cache, which is noticeably faster than larger chunks)
+CHUNK_SIZE = 8192
+
+### Quantization ###
+# Function to map an array of RGB values onto the nearest color (by euclidean distance in RGB) of a palette
+# pixels is the array to map, and must have a final dimension of 3 (i.e. (N,3) or (H,W,3))
+## integer arrays are treated as 0-255 values, while float arrays are treated as 0-1 values (as in matplotlib)
+# palette_rgb is an (K,3) array-like of the 0-255 RGB values of the palette
+# returns is for choosing what is returned by the function
+## "indices" will return an array of the palette index for each pixel (with the shape of pixels, minus the last dimension)
+## "pixels" will return an array of the same shape as pixels, with each value replaced by its nearest palette color
+## (as uint8 values for integer inputs, or 0-1 values of the same dtype for float inputs)
+# chunk_size is the number of pixels that are processed at once, which bounds the memory used by the function
+def quantize(pixels, palette_rgb, returns: Literal["indices","pixels"]="indices", chunk_size: int=None):
+    pixels = np.asarray(pixels)
+    palette_rgb = np.asarray(palette_rgb, dtype=np.float32).reshape(-1, 3)
+    # Checking the inputs
+    if pixels.ndim < 1 or pixels.shape[-1] != 3:
+        raise Exception(f"Invalid input for pixels: array of shape {pixels.shape}; only arrays with a final dimension of 3 (RGB) are accepted.")
+    if returns not in ["indices", "pixels"]:
+        raise Exception(f"Invalid input for returns: {returns}; only 'indices' and 'pixels' are acceptable values, see documentation for details.")
+    if chunk_size is None:
+        chunk_size = CHUNK_SIZE
+    elif not isinstance(chunk_size, int) or chunk_size < 1:
+        raise Exception(f"Invalid input for chunk_size: {chunk_size}; only positive integers are accepted.")
+    if len(palette_rgb) == 0:
+        raise Exception("Invalid input for palette_rgb: at least one color is needed to quantize to.")
+
+    is_float = pixels.dtype.kind == "f"
+    flat = pixels.reshape(-1, 3)
+    # The distance |x-c|^2 is calculated as |c|^2 - 2x.c, as |x|^2 is the same for every color and can be dropped
+    # Appending a column of ones to the pixels lets both terms be calculated in a single matrix multiplication
+    # For 0-255 inputs, every term is an integer well within float32 precision, so ties are resolved exactly
+    scale = 255.0 if is_float else 1.0
+    ct = np.vstack([palette_rgb.T * (-2.0 * scale), (palette_rgb ** 2).sum(axis=1)]).astype(np.float32)
+    # The buffers are allocated once, and reused for every chunk
+    buf = np.ones((min(chunk_size, len(flat)), 4), dtype=np.float32)
+    dist = np.empty((len(buf), len(palette_rgb)), dtype=np.float32)
+    indices = np.empty(len(flat), dtype=np.uint8 if len(palette_rgb) <= 256 else np.intp)
+    for start in range(0, len(flat), chunk_size):
+        chunk = flat[start:start+chunk_size]
+        n = len(chunk)
+        buf[:n,:3] = chunk
+        np.matmul(buf[:n], ct, out=dist[:n])
+        indices[start:start+n] = dist[:n].argmin(axis=1)
+    indices = indices.reshape(pixels.shape[:-1])
+
+    if returns == "indices":
+        return indices
+    elif is_float:
+        return (palette_rgb / 255.0).astype(pixels.dtype)[indices]
+    else:
+        return palette_rgb.astype(np.uint8)[indices]
@@ -0,0 +1,136 @@
+from typing import Callable, Iterable, Literal
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+import asyncio
+import io
+import os
+
+# Rendering many Flexoki-styled matplotlib figures at once, from asyncio code
+# Figures are drawn on a pool of worker processes, each of which imports matplotlib, builds a FlexokiSchema, and registers its colors
+# and colormaps (see FlexokiSchema.register_all) once when it starts, rather than once per figure
+# The rendered bytes are streamed back (as an async generator) in the order the figures finish
+
+### Specs ###
+# Each figure is described by a spec, which is either a function, or a dict with the following keys (only "draw" is required)
+## "draw": a function that takes a matplotlib Figure (plus any args/kwargs), and draws on it (i.e. fig.subplots().plot(...))
+### as it is sent to another process, it must be picklable (i.e. defined at the top level of a module, rather than a lambda)
+## "args"/"kwargs": extra arguments passed to the draw function
+## "format": the format to save the figure as, "png" (the default) or "svg" (or anything else supported by savefig)
+## "figsize"/"dpi": the size and resolution of the figure, defaulting to matplotlib's settings
+## "theme"/"lightness": overrides the theme/lightness passed to render_many() for this figure only
+# Within the draw function, the colors are available by name (i.e. "flexoki:red-600", or "flexoki:red" for the theme's default),
+# colormaps as "flexoki:reds" (etc.), and the color cycle and background/text colors are set for the theme (see FlexokiSchema.style)
+def _parse_spec(spec):
+    if callable(spec):
+        spec = {"draw":spec}
+    elif not isinstance(spec, dict) or not callable(spec.get("draw")):
+        raise Exception(f"Invalid input for spec: {spec}; only functions, or dicts with a 'draw' function, are accepted, see documentation for details.")
+    return spec
+
+### Workers ###
+# The schema used by each worker process, set up once when the worker starts
+_worker = {}
+
+def _init_worker(prefix):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.figure
+    from flexoki.core import FlexokiSchema
+    schema = FlexokiSchema()
+    schema.register_all(prefix=prefix)
+    _worker["schema"] = schema
+
+# Used to start every worker (and wait for them to be set up) before any figures are sent
+def _ready():
+    return os.getpid()
+
+def _render(spec, theme, lightness):
+    from matplotlib.figure import Figure
+    # A spec's own theme/lightness replace (rather than combine with) those passed to render_many()
+    if "theme" in spec or "lightness" in spec:
+        theme, lightness = spec.get("theme"), spec.get("lightness")
+    # Each worker only ever draws figures with Flexoki's settings, so the faster (private) path of style() is used where available
+    with _worker["schema"].style(theme=theme, lightness=lightness, fast=True):
+        # Figures are created directly (rather than through pyplot), so nothing is kept around once they are rendered
+        fig = Figure(figsize=spec.get("figsize"), dpi=spec.get("dpi"))
+        spec["draw"](fig, *spec.get("args", ()), **spec.get("kwargs", {}))
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=spec.get("format", "png"))
+    return buffer.getvalue()
+
+### Renderer ###
+# Class for a pool of (pre-warmed) worker processes for rendering figures
+# processes is the number of workers (if None, one per core); prefix is the prefix the colors/colormaps are registered under
+# All the workers are started and set up when the renderer is created, so the first figures do not pay for it
+# Renderers can be used as context managers (i.e. `with Renderer() as r:`), or closed with close()
+class Renderer:
+    def __init__(self, processes: int=None, prefix: str="flexoki"):
+        if processes is None:
+            processes = os.cpu_count() or 1
+        if not isinstance(processes, int) or processes < 1:
+            raise Exception(f"Invalid input for processes: {processes}; only positive integers (or None) are accepted.")
+        self.processes = processes
+        self.prefix = prefix
+        self._pool = ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(prefix,))
+        # Each worker only takes a task once it is set up, so waiting for one task per worker waits for all of them
+        for f in [self._pool.submit(_ready) for _ in range(processes)]:
+            f.result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown()
+
+    # Async generator to render many figures, yielding (index, bytes) for each one as soon as it is ready
+    # index is the position of the spec in specs, as the figures finish in any order
+    # theme and lightness are the same as for FlexokiSchema.style() (if neither is passed, the light theme is used)
+    async def render_many(self, specs: Iterable[Callable | dict], theme: Literal["light","dark"]=None, lightness: int=None):
+        specs = [_parse_spec(s) for s in specs]
+        loop = asyncio.get_running_loop()
+        pending = {asyncio.wrap_future(self._pool.submit(_render, s, theme, lightness), loop=loop):i for i,s in enumerate(specs)}
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for f in done:
+                    yield pending.pop(f), f.result()
+        finally:
+            # If the caller stops early (or a figure fails), the figures that have not started yet are cancelled
+            for f in pending:
+                f.cancel()
+
+    # Function to render a single figure, returning its bytes
+    async def render(self, spec: Callable | dict, theme: Literal["light","dark"]=None, lightness: int=None):
+        return await asyncio.wrap_future(self._pool.submit(_render, _parse_spec(spec), theme, lightness))
+
+# The renderer used by render_many(), created the first time it is needed
+_default = None
+_lock = Lock()
+
+def default_renderer():
+    global _default
+    with _lock:
+        if _default is None:
+            _default = Renderer()
+    return _default
+
+# Async generator to render many figures on the default renderer (or the one passed), yielding (index, bytes) as each is ready
+## Ex. async for i, png in flexoki.render_many(specs, theme="dark"): ...
+# The default renderer is created (the first time) on a thread, as starting the workers takes a while, and would otherwise block the event loop
+def render_many(specs: Iterable[Callable | dict], theme: Literal["light","dark"]=None, lightness: int=None, renderer: Renderer=None):
+    if renderer is not None:
+        return renderer.render_many(specs, theme=theme, lightness=lightness)
+    return _render_many_default(specs, theme, lightness)
+
+async def _render_many_default(specs, theme, lightness):
+    renderer = _default if _default is not None else await asyncio.get_running_loop().run_in_executor(None, default_renderer)
+    results = renderer.render_many(specs, theme=theme, lightness=lightness)
+    try:
+        async for result in results:
+            yield result
+    finally:
+        # Closing the renderer's generator straight away, so that (if the caller stops early) the remaining figures are cancelled
+        await results.aclose()
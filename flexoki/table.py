@@ -0,0 +1,119 @@
+import json
+import os
+from flexoki.utils import h_codes as flexoki_h_codes, l_values as flexoki_l_values, color_table as flexoki_table
+
+# Reading and checking tables of colors, so that schemas can be built from colors other than the Flexoki 2.0 ones
+# (i.e. extensions with brand colors, or future versions of Flexoki); see FlexokiSchema.from_file()
+# A table has the same three parts as the one in flexoki.utils:
+## table: the colors, as {name: {"h": hue code, "l": lightness value, "hex": hex code, "rgb": (r, g, b)}}
+## h_codes: the names of each hue, as {name: hue code}, where each code is a single letter (i.e. {"red": "r", "pink": "p"})
+## l_values: every lightness value, in order (i.e. [0, 50, ..., 1000])
+
+# The hue codes of the default colors, which every table needs (at one or more lightness values), as they back FlexokiSchema.colors.red (etc.)
+DEFAULT_HUES = "roygcbpmk"
+
+### Reading ###
+# Function to read a table from a JSON or TOML file (by its extension), see parse() for its contents
+# TOML files need Python 3.11 or later (for tomllib), or the tomli package to be installed
+def read(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    elif ext == ".toml":
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise Exception("Reading TOML files requires Python 3.11 or later, or the tomli package (pip install tomli).")
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        raise Exception(f"Invalid input for path: {path}; only .json and .toml files are accepted.")
+    return parse(data)
+
+# Function to turn the contents of a file into the parts of a table, with the following keys (only "colors" is required)
+## "colors": the colors, keyed by name; each is either a dict of "h", "l" and "hex" (and optionally "rgb"),
+### or just a hex code, if the name is a hue name and lightness value (i.e. "teal-500": "#1A7F7A")
+## "hues": the names of each hue, as {name: code}; new hues need to be added here (i.e. {"teal": "t"})
+## "lightness": every lightness value, in order; if not given, the lightness values of the colors are used
+## "extends": "flexoki" to add to (or replace colors of) the Flexoki 2.0 table, rather than starting from nothing
+# Returns a dict of {"table", "h_codes", "l_values"}, which can be passed to FlexokiSchema() (where it is checked, see validate())
+def parse(data):
+    if not isinstance(data, dict) or not isinstance(data.get("colors"), dict):
+        raise Exception("Invalid color table: a 'colors' table (of name: color) is needed, see documentation for details.")
+    extends = data.get("extends")
+    if extends not in [None, False, "flexoki"]:
+        raise Exception(f"Invalid input for extends: {extends}; only 'flexoki' is accepted.")
+
+    h_codes = dict(flexoki_h_codes) if extends == "flexoki" or data.get("hues") is None else {}
+    h_codes.update(data.get("hues") or {})
+    table = dict(flexoki_table) if extends == "flexoki" else {}
+    for name, c in data["colors"].items():
+        # Colors given as only a hex code take their hue and lightness from their name (i.e. teal-500)
+        if isinstance(c, str):
+            hue, _, l = str(name).rpartition("-")
+            if hue.lower() not in h_codes or not l.isdigit():
+                raise Exception(f"Invalid color: {name}; colors given as a hex code need to be named by hue and lightness (i.e. teal-500), with the hue listed in 'hues'.")
+            c = {"h":h_codes[hue.lower()], "l":int(l), "hex":c}
+        table[name] = c
+
+    l_values = data.get("lightness")
+    if l_values is None:
+        l_values = _lightness(table)
+        if extends == "flexoki":
+            l_values = sorted(set(l_values) | set(flexoki_l_values))
+    return {"table":table, "h_codes":h_codes, "l_values":l_values}
+
+# Function for the lightness values of the colors in a table, in order (anything that is not a valid color is left to validate())
+def _lightness(table):
+    return sorted({c.get("l") for c in table.values() if isinstance(c, dict) and type(c.get("l")) is int})
+
+### Validating ###
+# Function to check a table, returning it with every color as {"h", "l", "hex", "rgb"} (with an upper-case hex code, and rgb as a tuple)
+# h_codes defaults to the Flexoki 2.0 hue names, and l_values to the lightness values of the colors in table
+# Everything is checked up front, so that schemas never hold a partial table
+def validate(table, h_codes=None, l_values=None):
+    if h_codes is None:
+        h_codes = flexoki_h_codes
+    if l_values is None and isinstance(table, dict):
+        l_values = _lightness(table)
+    if not isinstance(h_codes, dict) or not all(isinstance(n, str) and len(n) > 1 and isinstance(c, str) and len(c) == 1 and c.islower()
+                                                for n,c in h_codes.items()):
+        raise Exception(f"Invalid input for h_codes: {h_codes}; only a dict of hue names to (single, lower-case letter) codes is accepted.")
+    if not isinstance(l_values, (list, tuple)) or not all(type(l) is int for l in l_values) or list(l_values) != sorted(set(l_values)):
+        raise Exception(f"Invalid input for l_values: {l_values}; only a list of unique integers, in increasing order, is accepted.")
+    if not isinstance(table, dict) or len(table) == 0:
+        raise Exception("Invalid input for table: only a (non-empty) dict of colors is accepted.")
+
+    codes = set(h_codes.values())
+    checked = {}
+    for name, c in table.items():
+        if not isinstance(name, str) or name == "":
+            raise Exception(f"Invalid color name: {name!r}; only non-empty strings are accepted.")
+        if not isinstance(c, dict) or not {"h", "l", "hex"} <= c.keys():
+            raise Exception(f"Invalid color: {name}; each color needs a hue code (h), lightness value (l) and hex code (hex).")
+        h, l, hex = c["h"], c["l"], c["hex"]
+        if h not in codes:
+            raise Exception(f"Invalid color: {name}; its hue code {h!r} is not one of {sorted(codes)}.")
+        if type(l) is not int or l not in l_values:
+            raise Exception(f"Invalid color: {name}; its lightness value {l!r} is not one of {list(l_values)}.")
+        try:
+            if not isinstance(hex, str) or len(hex) != 7 or hex[0] != "#":
+                raise ValueError
+            rgb = (int(hex[1:3], 16), int(hex[3:5], 16), int(hex[5:7], 16))
+        except ValueError:
+            raise Exception(f"Invalid color: {name}; its hex code {hex!r} is not of the form #RRGGBB.")
+        if c.get("rgb") is not None and tuple(c["rgb"]) != rgb:
+            raise Exception(f"Invalid color: {name}; its rgb value {c['rgb']} does not match its hex code {hex}.")
+        checked[name] = {"h":h, "l":l, "hex":hex.upper(), "rgb":rgb}
+
+    # The default colors need every one of their hues at (at least) one lightness value
+    found = {}
+    for c in checked.values():
+        found.setdefault(c["l"], set()).add(c["h"])
+    if not any(set(DEFAULT_HUES) <= hues for hues in found.values()):
+        raise Exception(f"Invalid input for table: every default hue ({DEFAULT_HUES}) is needed at one or more lightness values (i.e. by extending the Flexoki table).")
+    return checked, dict(h_codes), list(l_values)
@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# The compiled index (and the other caches written to disk) go to a temporary directory, rather than the user's cache
+os.environ.setdefault("FLEXOKI_CACHE_DIR", tempfile.mkdtemp(prefix="flexoki-tests-"))
@@ -0,0 +1,92 @@
+import matplotlib.colors
+import pytest
+import flexoki.core as core
+from flexoki.core import FlexokiSchema, Color, Palette
+
+SCHEMA = FlexokiSchema()
+BY_NAME = {c.name: SCHEMA.colors[c.name] for c in SCHEMA.colors.to_list()}
+
+def test_resample():
+    reds = SCHEMA.palettes.reds
+    resampled = reds.resample(30)
+    assert len(resampled) == 30
+    assert resampled[0] is reds[0] and resampled[-1] is reds[-1]
+    assert [c.l for c in resampled] == sorted(c.l for c in resampled)
+    # Resampling to the same number of colors keeps the palette as it is
+    assert list(reds.resample(len(reds))) == list(reds)
+    assert list(Palette([reds[0]]).resample(3)) == [reds[0]] * 3
+
+def test_interpolate():
+    l600, l400 = SCHEMA.palettes.l600, SCHEMA.palettes.l400
+    assert list(l600.interpolate(l400, 0)) == list(l600)
+    assert list(l600.interpolate(l400, 1)) == list(l400)
+    halfway = l600.interpolate(l400, 0.5)
+    assert [c.l for c in halfway] == [500] * len(l600)
+    with pytest.raises(Exception):
+        l600.interpolate(SCHEMA.palettes.reds, 0.5)
+    with pytest.raises(Exception):
+        l600.interpolate(l400, 1.5)
+
+def test_blended_names_do_not_collide_with_flexoki_colors():
+    # Halfway between red-600 and red-400 is close to, but not exactly, red-500
+    halfway = SCHEMA.palettes.l600.interpolate(SCHEMA.palettes.l400, 0.5)
+    for c in halfway:
+        if c.name in BY_NAME:
+            assert c is BY_NAME[c.name]
+        else:
+            assert c.name.endswith("-mix") and c.name[:-4] in BY_NAME and c.hex != BY_NAME[c.name[:-4]].hex
+    # So registering them with matplotlib does not replace the Flexoki colors
+    SCHEMA.register_matplotlib(prefix="algebra")
+    SCHEMA.register_matplotlib(colors=list(halfway), prefix="algebra")
+    assert matplotlib.colors.get_named_colors_mapping()["algebra:red-500"] == BY_NAME["red-500"].hex
+    # Names that Flexoki does not have are kept as they are
+    assert "red-71" in SCHEMA.palettes.reds.resample(30).names()
+
+def test_blends_that_land_on_a_flexoki_color_are_that_color():
+    red = BY_NAME["red-500"]
+    a = Color("a", "r", 400, "#000001", red.rgb)
+    b = Color("b", "r", 600, "#C13E35", (193, 62, 53))
+    assert core._blend([a], [b], [0.5])[0] is red
+
+def test_mix():
+    l600, paper = SCHEMA.palettes.l600, SCHEMA.colors.paper
+    assert list(l600.mix(paper, 0)) == list(l600)
+    assert list(l600.mix(paper, 1)) == [paper] * len(l600)
+    ratios = [i / (len(l600) - 1) for i in range(len(l600))]
+    mixed = l600.mix(paper, ratios)
+    assert mixed[0] is l600[0] and mixed[-1] is paper
+    # Mixing with paper only ever makes colors lighter
+    from flexoki.metrics import relative_luminance
+    assert all(relative_luminance(m.rgb) >= relative_luminance(c.rgb) - 1e-9 for m, c in zip(mixed, l600))
+    with pytest.raises(Exception):
+        l600.mix(paper, [0.5])
+    with pytest.raises(Exception):
+        l600.mix("paper", 0.5)
+
+@pytest.mark.parametrize("n", [2, 7, 10, 11])
+def test_diverging(n):
+    palette = SCHEMA.diverging("red", "blue", "paper", n=n)
+    assert len(palette) == n
+    assert palette[0] is SCHEMA.colors.red and palette[-1] is SCHEMA.colors.blue
+    if n % 2 == 1:
+        assert palette[n // 2] is SCHEMA.colors.paper
+    # Both sides are the same distance from the middle at each step
+    assert [c.l for c in palette] == [c.l for c in palette][::-1] or all(c.h in "rbk" for c in palette)
+
+def test_derived_results_are_cached():
+    reds = SCHEMA.palettes.reds
+    first, second = reds.resample(17), reds.resample(17)
+    # A new Palette each time (as Palettes can be changed in place), but the colors are only built once
+    assert first is not second and first._colors is second._colors
+    first.colors = []
+    assert len(reds.resample(17)) == 17
+    assert SCHEMA.diverging(n=9)._colors is SCHEMA.diverging(n=9)._colors
+    assert reds.mix(SCHEMA.colors.paper, 0.3)._colors is reds.mix(SCHEMA.colors.paper, 0.3)._colors
+
+def test_derived_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(core, "_DERIVED_CACHE_SIZE", 3)
+    reds = SCHEMA.palettes.reds
+    for n in range(20, 30):
+        reds.resample(n)
+    assert len(core._derived_cache) <= 3
+    assert ("resample", reds._colors, 29) in core._derived_cache
@@ -0,0 +1,49 @@
+import pytest
+import flexoki.core as core
+from flexoki.core import FlexokiSchema
+from flexoki.utils import h_codes, l_values
+
+SCHEMA = FlexokiSchema()
+
+def test_every_alias():
+    index = core._load_index()
+    colors = SCHEMA.colors
+    for name, c in index["aliases"].items():
+        assert colors[name] is c
+        # Any capitalization, and dashes, underscores or spaces, are accepted
+        assert colors[name.upper().replace(" ", "-")] is c
+    # Every color of the table is found under its own name, and hue names followed by a lightness under that of the hue
+    for c in colors.to_list():
+        assert colors[c.name] == c
+    for hname, code in h_codes.items():
+        for l in l_values:
+            if (code, l) in index["by_hl"] and f"{hname}-{l}" not in index["table"]:
+                assert colors[f"{hname}-{l}"] is index["by_hl"][(code, l)]
+
+@pytest.mark.parametrize("theme", ["light", "dark"])
+def test_hue_names_are_the_default_colors(theme):
+    schema = FlexokiSchema()
+    schema.set_theme(theme)
+    l = 600 if theme == "light" else 400
+    for hname, code in h_codes.items():
+        if hname in ["black", "white", "paper"]:
+            continue
+        assert schema.colors[hname] is schema.colors[f"{'base' if code == 'k' else hname}-{l}"]
+        assert schema.colors[hname.upper()] is schema.colors[hname]
+
+@pytest.mark.parametrize("theme", ["light", "dark"])
+def test_black_and_white_are_not_defaults(theme):
+    schema = FlexokiSchema()
+    schema.set_theme(theme)
+    assert schema.colors["white"] is schema.colors["paper"] is schema.colors.paper
+    assert schema.colors["black"] is schema.colors.black
+    assert schema.colors[" White "] is schema.colors.paper
+    # As hue names followed by a lightness, they are still the base colors
+    assert schema.colors["white-500"] is schema.colors["base-500"]
+
+@pytest.mark.parametrize("name", ["not-a-color", "red-601", "reds", "", "white-paper"])
+def test_unknown_names_raise(name):
+    with pytest.raises(Exception):
+        SCHEMA.colors[name]
+    with pytest.raises(Exception):
+        SCHEMA.colors.lookup(["red", name])
@@ -0,0 +1,111 @@
+import io
+import os
+import numpy as np
+import pytest
+from flexoki.cli import main
+from flexoki.core import FlexokiSchema
+from flexoki.export import render
+from flexoki.recolor import recolor_array
+
+SCHEMA = FlexokiSchema()
+L600 = SCHEMA.filter(l=600, returns="palette")
+
+def run(capsys, argv, stdin=None, monkeypatch=None):
+    if stdin is not None:
+        monkeypatch.setattr("sys.stdin", io.StringIO(stdin))
+    status = main(argv)
+    out, err = capsys.readouterr()
+    return status, out, err
+
+def test_filter(capsys):
+    status, out, err = run(capsys, ["filter", "-H", "red,blue", "-L", "400-600", "--format", "name"])
+    assert status == 0 and err == ""
+    assert out.splitlines() == SCHEMA.filter(["red", "blue"], slice(400, 600), returns="palette").names()
+    status, out, _ = run(capsys, ["filter", "-H", "r", "-L", "600", "--format", "all"])
+    red = SCHEMA.colors["red-600"]
+    assert out == "{}\t{}\t{},{},{}\n".format(red.name, red.hex, *red.rgb)
+
+def test_lookup(capsys, monkeypatch):
+    status, out, err = run(capsys, ["lookup", "red-600", "blue", "--lightness", "400", "--format", "hex"])
+    assert status == 0 and out.splitlines() == [SCHEMA.colors["red-600"].hex, SCHEMA.colors["blue-400"].hex]
+    status, out, _ = run(capsys, ["lookup", "--format", "name"], stdin="red\n\npaper\n", monkeypatch=monkeypatch)
+    assert status == 0 and out.splitlines() == ["red-600", "paper"]
+    # Unknown names are reported, and the rest are still looked up
+    status, out, err = run(capsys, ["lookup", "red-600", "not-a-color", "blue-600"])
+    assert status == 1
+    assert out.splitlines() == [SCHEMA.colors["red-600"].hex, SCHEMA.colors["blue-600"].hex]
+    assert err.startswith("flexoki: ") and "not-a-color" in err
+
+def test_nearest_stdin(capsys, monkeypatch):
+    lines = ["#AF3029", "255,255,255", "0 0 0", "205ea6"]
+    status, out, err = run(capsys, ["nearest", "-L", "600", "--format", "hex", "--chunk-lines", "3"], stdin="\n".join(lines) + "\n", monkeypatch=monkeypatch)
+    assert status == 0 and err == ""
+    expected = [L600.colors[i].hex for i in L600.quantize([(175, 48, 41), (255, 255, 255), (0, 0, 0), (32, 94, 166)]).tolist()]
+    assert out.splitlines() == expected
+    status, _, err = run(capsys, ["nearest"], stdin="not a color\n", monkeypatch=monkeypatch)
+    assert status == 1 and "not a color" in err
+
+def write_files(tmp_path, n=3):
+    rng = np.random.default_rng(0)
+    paths, expected = [], []
+    for i in range(n):
+        rgb = rng.integers(0, 256, (50, 3))
+        path = tmp_path / f"colors-{i}.txt"
+        path.write_text("".join("{},{},{}\n".format(*v) for v in rgb.tolist()))
+        paths.append(str(path))
+        expected.append([L600.colors[j].name for j in L600.quantize(rgb).tolist()])
+    return paths, expected
+
+def test_nearest_jobs_with_output(capsys, tmp_path):
+    paths, expected = write_files(tmp_path)
+    output = tmp_path / "out"
+    status, out, err = run(capsys, ["nearest", *paths, "-L", "600", "--format", "name", "--jobs", "2", "-o", str(output)])
+    assert status == 0 and err == ""
+    assert out.splitlines() == [str(output / os.path.basename(p)) for p in paths]
+    for path, names in zip(out.splitlines(), expected):
+        assert open(path).read().splitlines() == names
+    # stdin cannot be written to a file of results
+    status, _, err = run(capsys, ["nearest", "-", "-o", str(output)])
+    assert status == 1 and "stdin" in err
+
+def test_nearest_jobs_without_output(capsys, tmp_path):
+    # Files with the same name (in different directories) are kept apart, and printed in order
+    paths, expected = write_files(tmp_path)
+    (tmp_path / "other").mkdir()
+    other = str(tmp_path / "other" / os.path.basename(paths[0]))
+    with open(other, "w") as f:
+        f.write("#FFFCF0\n")
+    status, out, err = run(capsys, ["nearest", *paths, other, "-L", "600", "--format", "name", "--jobs", "2", "--chunk-lines", "7"])
+    assert status == 0 and err == ""
+    assert out.splitlines() == sum(expected, []) + [L600.colors[int(L600.quantize([(255, 252, 240)])[0])].name]
+    status, _, err = run(capsys, ["nearest", paths[0], "-", "--jobs", "2"])
+    assert status == 1 and "stdin" in err
+
+@pytest.mark.parametrize("dither", [None, "ordered"])
+def test_recolor_npy(capsys, tmp_path, dither):
+    pixels = np.random.default_rng(1).integers(0, 256, (40, 30, 3), dtype=np.uint8)
+    path = tmp_path / "image.npy"
+    np.save(path, pixels)
+    output = tmp_path / "out"
+    argv = ["recolor", str(path), "-L", "600", "-o", str(output), "--chunk-rows", "16"] + (["--dither", dither] if dither else [])
+    status, out, err = run(capsys, argv)
+    assert status == 0 and err == ""
+    assert out.splitlines() == [str(output / "image.npy")]
+    # Recoloring in bands of rows gives the same result as recoloring the whole image at once
+    expected = recolor_array(pixels, L600.rgb(array=True), dither=dither)
+    np.testing.assert_array_equal(np.load(output / "image.npy"), expected)
+
+def test_export_stdout(capsys):
+    status, out, err = run(capsys, ["export", "-", "-f", "css", "-v", "dark", "--prefix", "fx"])
+    assert status == 0 and err == ""
+    assert out == render(SCHEMA, "css", "dark", prefix="fx")
+    status, out, err = run(capsys, ["export", "-", "-f", "css"])
+    assert status == 1 and out == "" and err.startswith("flexoki: ")
+
+def test_export_directory(capsys, tmp_path):
+    status, out, _ = run(capsys, ["export", str(tmp_path), "-f", "json", "-v", "light"])
+    assert status == 0
+    [(written, path)] = [line.split("\t") for line in out.splitlines()]
+    assert written == "written" and os.path.exists(path)
+    status, out, _ = run(capsys, ["export", str(tmp_path), "-f", "json", "-v", "light"])
+    assert out.split("\t")[0] == "unchanged"
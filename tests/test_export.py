@@ -0,0 +1,46 @@
+import json
+import os
+import pytest
+from flexoki.core import FlexokiSchema
+from flexoki.export import FORMATS, accent_colors, export, render, ui_colors
+from flexoki.table import parse
+
+def test_render_every_format():
+    schema = FlexokiSchema()
+    for format in FORMATS:
+        for variant in ["light", "dark", 300]:
+            assert "Flexoki" in render(schema, format, variant)
+    tokens = json.loads(render(schema, "json", "dark"))["flexoki"]
+    assert tokens["ui"]["bg"]["$value"] == schema.colors.black.hex
+    assert tokens["accent"]["red"]["$value"] == schema.dark.red.hex
+    assert tokens["accent"]["red-2"]["$value"] == schema.colors.red_600.hex
+    assert ":root {" in render(schema, "css", "light") and '[data-theme="dark"] {' in render(schema, "css", "dark")
+    # The Pygments style is valid Python (which only needs Pygments once it is imported)
+    compile(render(schema, "pygments", "light"), "flexoki_light.py", "exec")
+
+def test_export_only_writes_changes(tmp_path):
+    schema = FlexokiSchema()
+    written = export(schema, tmp_path, variants=["light", "dark"])
+    assert len(written) == 2 * len(FORMATS) and all(written.values())
+    assert set(os.listdir(tmp_path)) == {os.path.basename(p) for p in written}
+    assert not any(export(schema, tmp_path).values())
+    assert all(export(schema, tmp_path, force=True).values())
+    with pytest.raises(Exception):
+        export(schema, tmp_path, formats=["svg"])
+
+def test_export_custom_tables(tmp_path):
+    # Extending Flexoki with a new hue keeps the themes of Flexoki, and adds the new colors
+    brand = FlexokiSchema(**parse({"extends": "flexoki", "hues": {"teal": "t"}, "colors": {"teal-500": "#1A7F7A"}}))
+    assert "--flexoki-teal-500: #1A7F7A;" in render(brand, "css", "light")
+    assert render(brand, "ansi", "dark") == render(FlexokiSchema(), "ansi", "dark")
+
+    # Tables without the base colors (or mirrored lightness values) Flexoki uses fall back to the closest lightness value of each hue
+    table = {f"{name}-{l}": {"h": code, "l": l, "hex": hex} for name, code in zip(["red", "orange", "yellow", "green", "cyan", "blue", "purple", "magenta", "base"], "roygcbpmk")
+             for l, hex in [(100, "#F0E0D0"), (500, "#806040"), (700, "#402010"), (900, "#201008")]}
+    schema = FlexokiSchema(table)
+    snapshot = schema.at(700)
+    assert ui_colors(snapshot)["bg"] is schema["base-100"]
+    assert accent_colors(snapshot)["red-2"] is schema["red-100"]
+    written = export(schema, tmp_path, variants=[500, 700])
+    assert len(written) == 2 * len(FORMATS)
+    assert "*.color0: #201008" in render(schema, "ansi", 500)
@@ -0,0 +1,83 @@
+import threading
+import pytest
+import flexoki.core as core
+from flexoki.core import FlexokiSchema, Color
+from flexoki.utils import color_table
+
+# The colors as filter() selected them before it was served from the index: every color in the table was checked against each hue/lightness
+ALL = [Color(n, c["h"], c["l"], c["hex"], c["rgb"]) for n,c in color_table.items()]
+BY_NAME = {c.name:c for c in ALL}
+
+def _by_h(hues, colors):
+    if hues is None:
+        return colors
+    return [c for hue in hues for c in colors if c.h == hue and c.name not in ("base-0", "base-1000")]
+
+def _by_l(ls, colors):
+    if ls is None:
+        return colors
+    found = []
+    for l in ls:
+        if l == 0:
+            found.append(BY_NAME["paper"])
+        elif l == 1000:
+            found.append(BY_NAME["black"])
+        else:
+            found += [c for c in colors if c.l == l]
+    return found
+
+def reference(hues, ls, order):
+    if order == "l_h":
+        return _by_l(ls, _by_h(hues, ALL))
+    return _by_h(hues, _by_l(ls, ALL))
+
+# Each input for h/l, along with the hue codes/lightness values it stands for
+HUES = [(None, None), ("r", "r"), ("red", "r"), ("k", "k"), ("base", "k"), ("rb", "rb"), (["red", "k"], "rk"), (("b", "g"), "bg"), ("RED", "r")]
+LIGHTNESS = [(None, None), (0, [0]), (50, [50]), (1000, [1000]), ([0, 50, 1000], [0, 50, 1000]), ([50, 50], [50, 50]),
+             (slice(150, 300), [150, 200, 300]), (slice(300, 150), [300, 200, 150]), (range(0, 1000), core.l_values)]
+
+@pytest.mark.parametrize("order", [None, "h_l", "l_h"])
+@pytest.mark.parametrize("h,hues", HUES)
+@pytest.mark.parametrize("l,ls", LIGHTNESS)
+def test_filter_matches_reference(h, hues, l, ls, order):
+    schema = FlexokiSchema()
+    expected = reference(hues, ls, order)
+    # Twice, so that both the uncached and the cached results are checked
+    for _ in range(2):
+        if len(expected) == 0:
+            with pytest.raises(Exception):
+                schema.filter(h, l, order, returns="colors")
+        else:
+            assert schema.filter(h, l, order, returns="colors") == expected
+            assert schema.filter(h, l, order, returns="hexes") == [c.hex for c in expected]
+
+def test_filter_results_are_copies():
+    schema = FlexokiSchema()
+    first = schema.filter("r", returns="colors")
+    first.clear()
+    assert len(schema.filter("r", returns="colors")) > 0
+
+@pytest.mark.parametrize("h,l", [("x", None), (["x"], None), (None, 25), (None, [25]), ("r", "50")])
+def test_filter_invalid_inputs(h, l):
+    with pytest.raises(Exception):
+        FlexokiSchema().filter(h, l)
+
+def test_filter_cache_is_thread_safe(monkeypatch):
+    monkeypatch.setattr(core, "_FILTER_CACHE_SIZE", 4)
+    schema = FlexokiSchema()
+    inputs = [(h, l) for h in "roygcbpmk" for l in [50, 100, 150, 200, 300, 400, 500, 600, 700, 800]]
+    errors = []
+    def run(offset):
+        try:
+            for i in range(200):
+                h, l = inputs[(i + offset) % len(inputs)]
+                assert schema.filter(h, l) == BY_NAME[f"{core._hue_names[h]}-{l}"]
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=run, args=(i * 7,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert len(schema.colors._filter_cache) <= 4
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+from flexoki.core import FlexokiSchema
+from flexoki.frames import assign, color_column
+
+SCHEMA = FlexokiSchema()
+PALETTE = SCHEMA.palettes.l600
+HEXES = [c.hex for c in PALETTE]
+RGB = np.array([c.rgb for c in PALETTE], dtype=np.uint8)
+
+def test_assign_in_palette_order():
+    hexes, rgb, lut = assign(["a", "b", "c"], PALETTE)
+    assert hexes == HEXES
+    np.testing.assert_array_equal(rgb, RGB)
+    assert lut.tolist() == [0, 1, 2]
+
+def test_assign_starts_over_and_uses_mapping():
+    categories = [str(i) for i in range(len(PALETTE) + 2)]
+    mapping = {"1": SCHEMA.colors.paper, "2": "#1a2b3c", "3": HEXES[0]}
+    hexes, rgb, lut = assign(categories, PALETTE, mapping)
+    # Colors from mapping that are not in the palette are added after it, and hex codes already in the table are reused
+    assert hexes == HEXES + [SCHEMA.colors.paper.hex, "#1A2B3C"]
+    assert lut.tolist()[:5] == [0, len(HEXES), len(HEXES) + 1, 0, 1]
+    # The categories that are not in mapping go through the palette in order, starting over at the end
+    assert lut.tolist()[-1] == (len(categories) - 3 - 1) % len(HEXES)
+    with pytest.raises(Exception):
+        assign(["a"], PALETTE, {"a": "red"})
+    with pytest.raises(Exception):
+        assign(["a"], [])
+
+def test_invalid_inputs():
+    with pytest.raises(Exception):
+        color_column(["a", "b"], PALETTE)
+    pd = pytest.importorskip("pandas")
+    with pytest.raises(Exception):
+        color_column(pd.Series(["a"]), PALETTE, returns="hsl")
+
+### pandas ###
+def test_pandas_identity_codes_are_reused():
+    pd = pytest.importorskip("pandas")
+    series = pd.Series(pd.Categorical(["b", "a", "c", "a"]), name="kind", index=[10, 11, 12, 13])
+    result = color_column(series, PALETTE)
+    assert isinstance(result, pd.Series) and result.name == "kind" and result.index.tolist() == [10, 11, 12, 13]
+    assert result.tolist() == [HEXES[1], HEXES[0], HEXES[2], HEXES[0]]
+    assert np.shares_memory(result.array.codes, series.array.codes)
+    categorical = color_column(series.array, PALETTE)
+    assert isinstance(categorical, pd.Categorical) and list(categorical) == result.tolist()
+
+def test_pandas_mapping_and_missing_values():
+    pd = pytest.importorskip("pandas")
+    series = pd.Series(["x", None, "y", "x", "z"])
+    result = color_column(series, PALETTE, mapping={"y": SCHEMA.colors.paper})
+    assert result.tolist()[0] == HEXES[0] and pd.isna(result.tolist()[1])
+    assert result.tolist()[2:] == [SCHEMA.colors.paper.hex, HEXES[0], HEXES[1]]
+
+def test_pandas_rgb_and_rgba():
+    pd = pytest.importorskip("pandas")
+    series = pd.Series(["x", None, "y"])
+    rgb = color_column(series, PALETTE, returns="rgb")
+    np.testing.assert_array_equal(rgb, [RGB[0], [0, 0, 0], RGB[1]])
+    rgba = color_column(series, PALETTE, returns="rgba")
+    np.testing.assert_array_equal(rgba, [[*RGB[0], 255], [0, 0, 0, 0], [*RGB[1], 255]])
+
+### Arrow ###
+def test_arrow_identity_codes_are_reused():
+    pa = pytest.importorskip("pyarrow")
+    column = pa.array(["b", "a", "b", None]).dictionary_encode()
+    result = color_column(column, PALETTE)
+    assert isinstance(result, pa.DictionaryArray)
+    assert result.indices.buffers()[1].address == column.indices.buffers()[1].address
+    assert result.to_pylist() == [HEXES[0], HEXES[1], HEXES[0], None]
+
+def test_arrow_mapping():
+    pa = pytest.importorskip("pyarrow")
+    result = color_column(pa.array(["a", "b", "c", None]), PALETTE, mapping={"a": "#af3029", "c": SCHEMA.colors.paper})
+    assert result.to_pylist() == ["#AF3029", HEXES[0], SCHEMA.colors.paper.hex, None]
+
+def test_arrow_chunked_dictionaries_are_unified():
+    pa = pytest.importorskip("pyarrow")
+    # Each chunk has its own dictionary, in a different order
+    column = pa.chunked_array([pa.array(["b", "a"]).dictionary_encode(), pa.array(["c", None, "a"]).dictionary_encode()])
+    result = color_column(column, PALETTE)
+    assert isinstance(result, pa.ChunkedArray) and result.num_chunks == 2
+    assert result.to_pylist() == [HEXES[0], HEXES[1], HEXES[2], None, HEXES[1]]
+    assert all(chunk.dictionary.equals(result.chunk(0).dictionary) for chunk in result.chunks)
+    rgba = color_column(column, PALETTE, returns="rgba")
+    np.testing.assert_array_equal(rgba, [[*RGB[0], 255], [*RGB[1], 255], [*RGB[2], 255], [0, 0, 0, 0], [*RGB[1], 255]])
+    empty = color_column(pa.chunked_array([], type=pa.string()), PALETTE, returns="rgb")
+    assert empty.shape == (0, 3)
+
+def test_arrow_rgb():
+    pa = pytest.importorskip("pyarrow")
+    rgb = color_column(pa.array(["a", None, "b"]), PALETTE, returns="rgb")
+    np.testing.assert_array_equal(rgb, [RGB[0], [0, 0, 0], RGB[1]])
+
+### Polars ###
+def test_polars():
+    pl = pytest.importorskip("polars")
+    series = pl.Series("kind", ["b", "a", None, "b"], dtype=pl.Categorical)
+    result = color_column(series, PALETTE, mapping={"a": SCHEMA.colors.paper})
+    assert isinstance(result, pl.Series) and result.name == "kind"
+    assert result.to_list() == [HEXES[0], SCHEMA.colors.paper.hex, None, HEXES[0]]
+    rgba = color_column(series, PALETTE, mapping={"a": SCHEMA.colors.paper}, returns="rgba")
+    np.testing.assert_array_equal(rgba, [[*RGB[0], 255], [*SCHEMA.colors.paper.rgb, 255], [0, 0, 0, 0], [*RGB[0], 255]])
+    strings = color_column(pl.Series("kind", ["x", "y", "x"]), PALETTE, returns="rgb")
+    np.testing.assert_array_equal(strings, [RGB[0], RGB[1], RGB[0]])
@@ -0,0 +1,91 @@
+import pytest
+from flexoki import core, instrument
+from flexoki.core import FlexokiSchema, Palette
+
+SCHEMA = FlexokiSchema()
+
+@pytest.fixture(autouse=True)
+def turned_off():
+    yield
+    instrument.disable()
+    instrument.reset()
+
+def originals(schema):
+    functions = {(owner, attr): owner.__dict__[attr] for _, owner, attr in instrument._FUNCTIONS}
+    cls = type(schema.colors)
+    functions.update({(cls, attr): cls.__dict__[attr] for _, attr in instrument._COLORS_FUNCTIONS})
+    return functions
+
+def diff(after, before, name):
+    b = before.get(name, {"calls":0, "misses":0, "hits":0})
+    return {k: after[name][k] - b[k] for k in ["calls", "misses", "hits"]}
+
+def test_measure_counts_calls_hits_and_misses():
+    with instrument.measure() as m:
+        schema = FlexokiSchema()
+        before = m.stats()
+        # A filter (and colormap) that nothing else asks for, so the first call is a miss, and the second a hit
+        schema.colors.filter(["r", "b"], [150, 850], "l_h")
+        schema.colors.filter(["r", "b"], [150, 850], "l_h")
+        palette = schema.colors.filter("rb", [150, 850])
+        palette.to_colormap(N=37)
+        palette.to_colormap(N=37)
+        schema.colors["red-150"]
+        after = m.stats()
+    assert after["FlexokiSchema.__init__"]["calls"] == 1
+    assert diff(after, before, "colors.filter") == {"calls":3, "misses":2, "hits":1}
+    assert diff(after, before, "Palette.to_colormap") == {"calls":2, "misses":1, "hits":1}
+    assert diff(after, before, "colors.__getitem__")["calls"] == 1
+    stats = after["colors.filter"]
+    assert stats["time_s"] > 0 and stats["mean_us"] == pytest.approx(stats["time_s"] / stats["calls"] * 1e6)
+    assert stats["hit_ratio"] == stats["hits"] / stats["calls"] and stats["allocated_blocks"] is None
+    # Nothing is recorded once the block is over, or in the global counters
+    SCHEMA.colors.filter("r", 600)
+    assert m.stats() == after
+    assert instrument.stats() == {}
+
+def test_allocations():
+    with instrument.measure(allocations=True) as m:
+        FlexokiSchema()
+    assert isinstance(m.stats()["FlexokiSchema.__init__"]["allocated_blocks"], int)
+
+def test_nested_measure_does_not_turn_off_enable():
+    before = originals(SCHEMA)
+    instrument.enable()
+    assert instrument.enabled()
+    with instrument.measure() as m:
+        SCHEMA.colors.filter("r", 600)
+    # The global instrumentation is still on after the block
+    assert instrument.enabled()
+    assert hasattr(FlexokiSchema.__dict__["__init__"], "_flexoki_original")
+    assert hasattr(type(SCHEMA.colors).__dict__["filter"], "_flexoki_original")
+    SCHEMA.colors.filter("r", 600)
+    assert m.stats()["colors.filter"]["calls"] == 1
+    assert instrument.stats()["colors.filter"]["calls"] == 2
+    # And enabling it again keeps the counters, only changing whether allocations are counted
+    instrument.enable(allocations=True)
+    assert instrument.stats()["colors.filter"]["calls"] == 2
+    instrument.disable()
+    assert originals(SCHEMA) == before
+
+def test_disable_restores_every_original():
+    before = originals(SCHEMA)
+    init = FlexokiSchema.__init__
+    instrument.enable()
+    # Including the colors classes of schemas created while it was on
+    schema = FlexokiSchema()
+    created = originals(schema)
+    assert all(hasattr(f, "_flexoki_original") for f in created.values())
+    with instrument.measure():
+        pass
+    instrument.disable()
+    assert not instrument.enabled()
+    assert FlexokiSchema.__init__ is init
+    assert Palette.__dict__["to_colormap"] is before[(Palette, "to_colormap")]
+    assert core._on_miss is None
+    for (owner, attr), func in originals(SCHEMA).items():
+        assert func is before[(owner, attr)]
+    assert not any(hasattr(f, "_flexoki_original") for f in originals(schema).values())
+    # Turning it off again (or without it being on) changes nothing
+    instrument.disable()
+    assert originals(SCHEMA) == before
@@ -0,0 +1,74 @@
+import os
+import numpy as np
+import pytest
+import flexoki.lut as lut_module
+from flexoki.core import FlexokiSchema
+from flexoki.lut import build_lut, load_lut, apply_lut
+from flexoki.utils import cache_dir
+
+PALETTE = np.array(FlexokiSchema().palettes.l600.rgb(array=True), dtype=np.uint8)
+
+def distances(pixels):
+    return ((pixels.reshape(-1, 1, 3).astype(np.float64) - PALETTE[None].astype(np.float64)) ** 2).sum(axis=-1)
+
+@pytest.mark.parametrize("bits", [3, 5])
+def test_lut_matches_exact_quantize_at_bin_centers(bits):
+    n = 2 ** bits
+    step = 256 // n
+    lut = load_lut(PALETTE, bits, cache=False)
+    # Every bin is looked up from the pixel at the (lower) middle of it, and compared with the exact nearest color to its center
+    corners = np.stack(np.meshgrid(*[np.arange(n) * step] * 3, indexing="ij"), axis=-1).reshape(-1, 3)
+    pixels = (corners + step // 2 - 1).astype(np.uint8)
+    centers = corners + (step - 1) / 2
+    indices = apply_lut(pixels, lut)
+    # Ties can go to either color, so the distance to the chosen color is compared, rather than the index itself
+    d = distances(centers)
+    np.testing.assert_allclose(d[np.arange(len(d)), indices], d.min(axis=1), rtol=1e-6)
+
+def test_apply_lut_clips_integers_outside_0_to_255():
+    lut = load_lut(PALETTE, 5, cache=False)
+    pixels = np.array([[-20, 300, 128], [1000, -1, 0], [255, 256, 70000]], dtype=np.int32)
+    expected = apply_lut(np.clip(pixels, 0, 255).astype(np.uint8), lut)
+    np.testing.assert_array_equal(apply_lut(pixels, lut), expected)
+    np.testing.assert_array_equal(apply_lut(pixels.astype(np.int8), lut), apply_lut(np.maximum(pixels.astype(np.int8), 0).astype(np.uint8), lut))
+    np.testing.assert_array_equal(apply_lut(np.array([[2.0, -1.0, 0.5]]), lut), apply_lut(np.array([[255, 0, 128]], dtype=np.uint8), lut))
+
+def test_load_lut_round_trips_through_the_disk_cache():
+    palette = PALETTE[::-1].copy()
+    lut_module._loaded.clear()
+    first = load_lut(palette, 5)
+    files = [f for f in os.listdir(cache_dir()) if f.startswith("lut-5-")]
+    assert len(files) >= 1
+    # Tables are memory-mapped from the cache, read-only, and the same as building them from scratch
+    assert isinstance(first, np.memmap) and not first.flags.writeable
+    np.testing.assert_array_equal(first, build_lut(palette, 5))
+    assert load_lut(palette, 5) is first
+    # Once out of memory, the table is loaded again from disk (rather than rebuilt)
+    lut_module._loaded.clear()
+    second = load_lut(palette, 5)
+    assert second is not first and isinstance(second, np.memmap)
+    np.testing.assert_array_equal(second, first)
+    # Without the cache, the table is built in memory
+    lut_module._loaded.clear()
+    third = load_lut(palette, 5, cache=False)
+    assert not isinstance(third, np.memmap) and not third.flags.writeable
+    np.testing.assert_array_equal(third, first)
+
+def test_loaded_tables_are_bounded(monkeypatch):
+    monkeypatch.setattr(lut_module, "_LOADED_SIZE", 3)
+    lut_module._loaded.clear()
+    palettes = [np.roll(PALETTE, i, axis=0) for i in range(6)]
+    for palette in palettes:
+        load_lut(palette, 2, cache=False)
+    assert len(lut_module._loaded) == 3
+    # The least recently used tables are the ones evicted
+    recent = load_lut(palettes[3], 2, cache=False)
+    load_lut(palettes[0], 2, cache=False)
+    assert any(v is recent for v in lut_module._loaded.values())
+    assert len(lut_module._loaded) == 3
+
+def test_invalid_inputs():
+    with pytest.raises(Exception):
+        load_lut(PALETTE, 9)
+    with pytest.raises(Exception):
+        apply_lut(np.zeros((4, 4)), load_lut(PALETTE, 2, cache=False))
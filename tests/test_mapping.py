@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+import matplotlib.colors
+from flexoki.core import FlexokiSchema
+
+PALETTE = FlexokiSchema().palettes.blues
+
+def expected(values, vmin, vmax, kind, bins):
+    cmap = PALETTE.to_colormap(kind, N=bins)
+    # matplotlib's autoscaling does not skip NaN values, while map_values() does
+    vmin = np.nanmin(values) if vmin is None else vmin
+    vmax = np.nanmax(values) if vmax is None else vmax
+    return cmap(matplotlib.colors.Normalize(vmin, vmax)(values), bytes=True)
+
+@pytest.mark.parametrize("kind,bins", [("smooth", None), ("smooth", 7), ("discrete", None), ("discrete", 5)])
+@pytest.mark.parametrize("vmin,vmax", [(None, None), (-0.5, 0.75), (0.2, 0.2)])
+def test_map_values_matches_matplotlib(kind, bins, vmin, vmax):
+    values = np.random.default_rng(0).normal(size=(50, 40))
+    # matplotlib maps everything (including NaN) to the first color when vmin == vmax, while map_values() keeps NaN transparent
+    if vmin is None or vmin != vmax:
+        values[3, :5] = np.nan
+    np.testing.assert_array_equal(PALETTE.map_values(values, vmin, vmax, kind=kind, bins=bins), expected(values, vmin, vmax, kind, bins))
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.uint16, np.int8, np.int32])
+@pytest.mark.parametrize("vmin,vmax", [(10, 30), (None, None), (0, 100)])
+def test_map_values_integers_match_matplotlib(dtype, vmin, vmax):
+    # Values below vmin need to go to the first color, rather than wrapping around to the last
+    values = np.array([0, 5, 10, 11, 20, 29, 30, 31, 100, 127], dtype=dtype)
+    np.testing.assert_array_equal(PALETTE.map_values(values, vmin, vmax), expected(values, vmin, vmax, "smooth", None))
+    assert PALETTE.map_values(values, vmin, vmax)[0].tolist() == expected(values, vmin, vmax, "smooth", None)[0].tolist()
+
+def test_map_values_booleans_match_matplotlib():
+    values = np.array([[True, False], [False, True]])
+    np.testing.assert_array_equal(PALETTE.map_values(values), expected(values, None, None, "smooth", None))
+    np.testing.assert_array_equal(PALETTE.map_values(values, kind="discrete"), expected(values, None, None, "discrete", None))
+
+def test_map_values_out_and_chunks():
+    from flexoki.mapping import table, map_values
+    values = np.linspace(-1, 2, 1000).reshape(20, 50)
+    out = np.zeros((20, 50, 3), dtype=np.uint8)
+    result = map_values(values, table(PALETTE.rgb(array=True)), 0, 1, out=out, chunk_size=33)
+    assert result is out
+    np.testing.assert_array_equal(out, expected(values, 0, 1, "smooth", None)[..., :3])
+    # Non-contiguous outputs are written through as well
+    out = np.zeros((50, 20, 4), dtype=np.uint8).transpose(1, 0, 2)
+    map_values(values, table(PALETTE.rgb(array=True)), 0, 1, out=out)
+    np.testing.assert_array_equal(out, expected(values, 0, 1, "smooth", None))
+
+@pytest.mark.parametrize("values,kwargs", [(np.array(["a"]), {}), (np.zeros(3), {"kind":"stepped"}), (np.zeros(3), {"out":np.zeros((3, 2), dtype=np.uint8)})])
+def test_map_values_invalid_inputs(values, kwargs):
+    with pytest.raises(Exception):
+        PALETTE.map_values(values, **kwargs)
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from flexoki.core import FlexokiSchema
+from flexoki.oklab import srgb_to_oklab, oklab_to_srgb, srgb_to_oklch, oklch_to_srgb, ramp
+from flexoki.utils import color_table
+
+RGB = np.array([c["rgb"] for c in color_table.values()], dtype=np.float64)
+
+def test_oklab_reference_values():
+    # White and black are at the ends of the lightness axis, with no chroma
+    np.testing.assert_allclose(srgb_to_oklab([255, 255, 255]), [1, 0, 0], atol=1e-4)
+    np.testing.assert_allclose(srgb_to_oklab([0, 0, 0]), [0, 0, 0], atol=1e-6)
+    # Pure red, from https://bottosson.github.io/posts/oklab/
+    np.testing.assert_allclose(srgb_to_oklab([255, 0, 0]), [0.627955, 0.224863, 0.125846], atol=1e-4)
+
+def test_oklab_round_trip():
+    # The published matrices are not exact inverses of each other, so values only come back to within a small fraction of a unit
+    np.testing.assert_allclose(oklab_to_srgb(srgb_to_oklab(RGB)), RGB, atol=1e-3)
+    np.testing.assert_allclose(oklch_to_srgb(srgb_to_oklch(RGB)), RGB, atol=1e-3)
+
+def test_oklab_shapes():
+    image = RGB[:120].reshape(10, 12, 3)
+    assert srgb_to_oklab(image).shape == (10, 12, 3)
+    np.testing.assert_allclose(srgb_to_oklab(image).reshape(-1, 3), srgb_to_oklab(RGB[:120]))
+
+def test_color_properties():
+    c = FlexokiSchema().colors.red_600
+    np.testing.assert_allclose(c.oklab, srgb_to_oklab(c.rgb))
+    np.testing.assert_allclose(c.oklch, srgb_to_oklch(c.rgb))
+
+def test_ramp_hits_existing_colors():
+    rgb = np.array([[0, 0, 0], [128, 64, 32], [255, 255, 255]])
+    np.testing.assert_array_equal(ramp(rgb, [0, 500, 1000], [0, 500, 1000]), rgb)
+    # Every stack is interpolated the same way as on its own
+    stacked = ramp(np.stack([rgb, rgb[::-1]]), [0, 500, 1000], [100, 750])
+    np.testing.assert_array_equal(stacked[1], ramp(rgb[::-1], [0, 500, 1000], [100, 750]))
+
+def test_ramp_out_of_range():
+    with pytest.raises(Exception):
+        ramp([[0, 0, 0], [255, 255, 255]], [0, 1000], [-1, 500])
+
+def test_schema_ramp_matches_table():
+    schema = FlexokiSchema()
+    reds = schema.filter("r", returns="colors")
+    result = schema.ramp("r", steps=len(reds), l=slice(reds[0].l, reds[-1].l))
+    # The Flexoki lightness values are not evenly spaced, so only the ends land exactly on existing colors
+    assert result.colors[0].hex == reds[0].hex
+    assert result.colors[-1].hex == reds[-1].hex
+    assert [c.name for c in schema.ramp("r", steps=3).colors] == ["red-50", "red-500", "red-950"]
+    reverse = schema.ramp("r", steps=3, l=slice(950, 50))
+    assert [c.hex for c in reverse.colors] == [c.hex for c in schema.ramp("r", steps=3).colors][::-1]
@@ -0,0 +1,56 @@
+import dataclasses
+import pickle
+import numpy as np
+import pytest
+from flexoki.core import FlexokiSchema, Color, Palette
+
+def test_color_is_frozen():
+    c = Color("red-600", "r", 600, "#AF3029", [175, 48, 41])
+    assert c.rgb == (175, 48, 41)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        c.hex = "#000000"
+    with pytest.raises((AttributeError, TypeError)):
+        c.extra = 1
+    assert c == Color("red-600", "r", 600, "#AF3029", (175, 48, 41))
+    assert hash(c) == hash(Color("red-600", "r", 600, "#AF3029", (175, 48, 41)))
+    assert pickle.loads(pickle.dumps(c)) == c
+
+def test_palette_colors_cannot_be_changed_in_place():
+    palette = FlexokiSchema().palettes.reds
+    assert isinstance(palette.colors, tuple)
+    with pytest.raises(AttributeError):
+        palette.colors.append(palette.colors[0])
+    with pytest.raises(TypeError):
+        palette.colors[0] = palette.colors[1]
+
+def test_palette_setting_colors_resets_derived_values():
+    schema = FlexokiSchema()
+    palette = Palette(schema.filter("r", returns="colors"))
+    rgb, h = palette.rgb(array=True), hash(palette)
+    assert not rgb.flags.writeable
+    np.testing.assert_array_equal(rgb, palette.rgb())
+    assert palette.rgb(array=True) is rgb
+
+    palette.colors = schema.filter("b", returns="colors")
+    assert palette.hex() == schema.filter("b", returns="hexes")
+    np.testing.assert_array_equal(palette.rgb(array=True), schema.filter("b", returns="rgb"))
+    assert hash(palette) != h
+
+def test_palette_equality():
+    schema = FlexokiSchema()
+    a = Palette(schema.filter("r", returns="colors"))
+    b = Palette(list(a))
+    assert a == b and hash(a) == hash(b)
+    assert a != Palette(list(a)[::-1])
+    assert a.reverse() == Palette(list(a)[::-1])
+    # Copies by default, so the original is unchanged
+    assert a == b
+
+def test_palette_access():
+    palette = FlexokiSchema().palettes.l600
+    assert len(palette) == len(palette.colors)
+    assert list(palette) == list(palette.colors)
+    assert palette[0] is palette.colors[0]
+    assert palette[1:3] == list(palette.colors[1:3])
+    assert palette.names() == [c.name for c in palette.colors]
+    assert palette.rgba(array=True)[:, 3].tolist() == [255] * len(palette)
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from flexoki.core import FlexokiSchema
+from flexoki.quantize import quantize
+
+# Distinct colors (so that the nearest color of any pixel is a single index, or an exact tie between two of them)
+PALETTE = np.array(FlexokiSchema().palettes.l600.rgb(array=True), dtype=np.float64)
+
+def brute_force(pixels):
+    d = ((pixels.reshape(-1, 1, 3).astype(np.float64) - PALETTE[None]) ** 2).sum(axis=-1)
+    return d
+
+def check(indices, pixels):
+    # Ties can go to either color, so the distance to the chosen color is compared, rather than the index itself
+    d = brute_force(pixels)
+    chosen = d[np.arange(len(d)), indices.reshape(-1)]
+    np.testing.assert_array_equal(chosen, d.min(axis=1))
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 7, 4096])
+def test_quantize_matches_brute_force(chunk_size):
+    pixels = np.random.default_rng(0).integers(0, 256, (64, 48, 3), dtype=np.uint8)
+    indices = quantize(pixels, PALETTE, chunk_size=chunk_size)
+    assert indices.shape == (64, 48)
+    check(indices, pixels)
+
+def test_quantize_palette_colors_map_to_themselves():
+    assert quantize(PALETTE.astype(np.uint8), PALETTE).tolist() == list(range(len(PALETTE)))
+
+def test_quantize_float_inputs_are_0_to_1():
+    pixels = np.random.default_rng(1).integers(0, 256, (500, 3), dtype=np.uint8)
+    np.testing.assert_array_equal(quantize(pixels.astype(np.float64) / 255, PALETTE), quantize(pixels, PALETTE))
+
+def test_quantize_pixels():
+    pixels = np.random.default_rng(2).integers(0, 256, (500, 3), dtype=np.uint8)
+    result = quantize(pixels, PALETTE, returns="pixels")
+    assert result.dtype == np.uint8
+    np.testing.assert_array_equal(result, PALETTE.astype(np.uint8)[quantize(pixels, PALETTE)])
+    result = quantize(pixels / 255, PALETTE, returns="pixels")
+    np.testing.assert_allclose(result, PALETTE[quantize(pixels, PALETTE)] / 255)
+
+def test_nearest_matches_brute_force():
+    schema = FlexokiSchema()
+    pixels = np.random.default_rng(3).integers(0, 256, (1000, 3), dtype=np.uint8)
+    palette = schema.filter(None, 600, returns="palette")
+    np.testing.assert_array_equal(schema.nearest(pixels, l=600), palette.quantize(pixels))
+    check(schema.nearest(pixels, l=600), pixels)
+
+@pytest.mark.parametrize("pixels,kwargs", [(np.zeros((4, 4)), {}), (np.zeros((4, 3)), {"returns":"hexes"}), (np.zeros((4, 3)), {"chunk_size":0})])
+def test_quantize_invalid_inputs(pixels, kwargs):
+    with pytest.raises(Exception):
+        quantize(pixels, PALETTE, **kwargs)
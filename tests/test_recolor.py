@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from flexoki.core import FlexokiSchema
+from flexoki.quantize import quantize
+from flexoki.recolor import recolor, recolor_array, recolor_file, tiles
+
+PALETTE = FlexokiSchema().palettes.l600.rgb(array=True)
+
+def image(seed, shape=(40, 56, 3)):
+    return np.random.default_rng(seed).integers(0, 256, shape, dtype=np.uint8)
+
+def test_recolor_array_without_dithering_matches_quantize():
+    pixels = image(0)
+    np.testing.assert_array_equal(recolor_array(pixels, PALETTE, returns="indices"), quantize(pixels, PALETTE))
+    np.testing.assert_array_equal(recolor_array(pixels, PALETTE), PALETTE[quantize(pixels, PALETTE)])
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.float32])
+def test_ordered_dithering_with_no_strength_matches_no_dithering(dtype):
+    pixels = image(1)
+    if dtype == np.float32:
+        pixels = pixels.astype(np.float32) / 255
+    expected = recolor_array(pixels, PALETTE, returns="indices")
+    np.testing.assert_array_equal(recolor_array(pixels, PALETTE, dither="ordered", strength=0, returns="indices"), expected)
+
+def test_ordered_dithering_mixes_colors():
+    # A flat color halfway between two palette colors should be dithered into a mix of both, rather than snapping to one
+    a, b = PALETTE[0].astype(np.float32), PALETTE[1].astype(np.float32)
+    pixels = np.broadcast_to(np.rint((a + b) / 2).astype(np.uint8), (16, 16, 3))
+    indices = recolor_array(pixels, PALETTE[:2], dither="ordered", returns="indices")
+    assert 0.25 < indices.mean() < 0.75
+
+def test_floyd_steinberg_keeps_palette_colors():
+    pixels = PALETTE[np.random.default_rng(2).integers(0, len(PALETTE), (12, 9))]
+    indices = recolor_array(pixels, PALETTE, dither="floyd-steinberg", returns="indices")
+    np.testing.assert_array_equal(indices, quantize(pixels, PALETTE))
+
+def test_floyd_steinberg_diffuses_error_to_neighbors():
+    # Grays 0-200, so that each pixel's index is its own (rounded) value; the pixel at (0,1) is 216, which leaves an error of 16,
+    # spread as 7 to the right, and 3, 5 and 1 to the pixels below-left, below and below-right
+    palette = np.repeat(np.arange(201)[:, None], 3, axis=1)
+    pixels = np.zeros((2, 3, 3), dtype=np.uint8)
+    pixels[0, 1] = 216
+    indices = recolor_array(pixels, palette, dither="floyd-steinberg", returns="indices")
+    assert indices.tolist() == [[0, 200, 7], [3, 5, 1]]
+
+def test_recolor_streams_in_order():
+    frames = [image(i, (8, 8, 3)) for i in range(5)]
+    results = list(recolor(frames, PALETTE, returns="indices", processes=1))
+    assert len(results) == 5
+    for frame, result in zip(frames, results):
+        np.testing.assert_array_equal(result, quantize(frame, PALETTE))
+
+def test_recolor_file_matches_whole_image(tmp_path):
+    pixels = image(3, (37, 20, 3))
+    np.save(tmp_path / "src.npy", pixels)
+    out = recolor_file(tmp_path / "src.npy", tmp_path / "dst.npy", PALETTE, dither="ordered", processes=1, rows=8)
+    # Tiles line up with each other, so recoloring in bands gives the same result as the whole image at once
+    np.testing.assert_array_equal(np.load(tmp_path / "dst.npy"), recolor_array(pixels, PALETTE, dither="ordered"))
+    assert out.shape == pixels.shape
+    assert sum(len(t) for t in tiles(pixels, 8)) == len(pixels)
+
+def test_recolor_invalid_inputs():
+    with pytest.raises(Exception):
+        recolor_array(image(4), PALETTE, dither="random")
+    with pytest.raises(Exception):
+        recolor_array(image(4).reshape(-1, 3), PALETTE, dither="ordered")
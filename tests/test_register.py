@@ -0,0 +1,114 @@
+import matplotlib
+import matplotlib.colors
+import pytest
+import flexoki.core as core
+from flexoki.core import FlexokiSchema
+
+SCHEMA = FlexokiSchema()
+
+@pytest.fixture
+def registrations(monkeypatch):
+    # Counting the calls to matplotlib's registry of colormaps, by name
+    calls = []
+    register = matplotlib.colormaps.register
+    def spy(cmap, *, name=None, force=False):
+        calls.append(name)
+        return register(cmap, name=name, force=force)
+    monkeypatch.setattr(matplotlib.colormaps, "register", spy)
+    return calls
+
+### Colormaps ###
+@pytest.mark.parametrize("kind", ["discrete", "smooth"])
+def test_to_colormap_is_cached(kind):
+    palette = SCHEMA.palettes.blues
+    cmap = palette.to_colormap(kind, N=19)
+    assert palette.to_colormap(kind, N=19) is cmap
+    # The cache is keyed by the colors, not the Palette object
+    assert SCHEMA.palettes.blues.to_colormap(kind.upper(), N=19) is cmap
+    assert palette.to_colormap(kind, N=20) is not cmap
+    assert palette.reverse().to_colormap(kind, N=19) is not cmap
+
+@pytest.mark.filterwarnings("ignore:Overwriting the cmap")
+def test_to_colormap_registers_each_name_once(registrations):
+    palette = SCHEMA.palettes.greens
+    cmap = palette.to_colormap("smooth", register="test-register:greens")
+    for _ in range(3):
+        assert palette.to_colormap("smooth", register="test-register:greens") is cmap
+    assert registrations == ["test-register:greens"]
+    assert isinstance(matplotlib.colormaps["test-register:greens"], matplotlib.colors.LinearSegmentedColormap)
+    # A different colormap under the same name replaces it (once)
+    other = palette.to_colormap("discrete", register="test-register:greens")
+    palette.to_colormap("discrete", register="test-register:greens")
+    assert registrations == ["test-register:greens"] * 2
+    assert isinstance(matplotlib.colormaps["test-register:greens"], type(other)) and type(other) is not type(cmap)
+    # As does registering it again after it was removed from matplotlib
+    matplotlib.colormaps.unregister("test-register:greens")
+    palette.to_colormap("discrete", register="test-register:greens")
+    assert registrations == ["test-register:greens"] * 3 and "test-register:greens" in matplotlib.colormaps
+
+def test_to_colormap_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(core, "_COLORMAP_CACHE_SIZE", 3)
+    palette = SCHEMA.palettes.purples
+    cmaps = [palette.to_colormap("smooth", N=n) for n in range(101, 105)]
+    assert len(core._colormap_cache) == 3
+    # The first was evicted (and is built again), and using the second again keeps it over the third
+    assert palette.to_colormap("smooth", N=102) is cmaps[1]
+    assert palette.to_colormap("smooth", N=101) is not cmaps[0]
+    assert len(core._colormap_cache) == 3
+    assert palette.to_colormap("smooth", N=102) is cmaps[1]
+    assert palette.to_colormap("smooth", N=103) is not cmaps[2]
+
+### Named colors ###
+@pytest.fixture
+def updates(monkeypatch):
+    # Recording what is written to matplotlib's (global) table of named colors
+    calls = []
+    mapping = matplotlib.colors.get_named_colors_mapping()
+    update = type(mapping).update
+    def spy(self, *args, **kwargs):
+        calls.append(dict(*args, **kwargs))
+        return update(self, *args, **kwargs)
+    monkeypatch.setattr(type(mapping), "update", spy)
+    return calls
+
+def defaults(schema, prefix, theme):
+    return {f"{prefix}:{c.name}": c.hex for c in schema.at(theme=theme).get_defaults(override_names=True)}
+
+def test_register_matplotlib_only_writes_changed_names(updates):
+    schema = FlexokiSchema()
+    schema.set_theme("light")
+    schema.register_matplotlib(prefix="test-named")
+    mapping = matplotlib.colors.get_named_colors_mapping()
+    assert len(updates) == 1 and mapping["test-named:red-600"] == schema.colors["red-600"].hex
+    assert matplotlib.colors.to_hex(mapping["test-named:red"]).upper() == schema.colors["red-600"].hex
+    # Registering the same colors again does nothing
+    schema.register_matplotlib(prefix="test-named")
+    assert len(updates) == 1
+    # Switching theme only rewrites the default colors that are different in it
+    schema.set_theme("dark")
+    schema.register_matplotlib(prefix="test-named")
+    light, dark = defaults(schema, "test-named", "light"), defaults(schema, "test-named", "dark")
+    assert len(updates) == 2 and updates[1] == {n: h for n, h in dark.items() if light[n] != h}
+    # And the new values are what matplotlib resolves the names to (rather than any it converted before)
+    assert matplotlib.colors.to_hex("test-named:red").upper() == schema.colors["red-400"].hex
+    schema.register_matplotlib(prefix="test-named")
+    assert len(updates) == 2
+
+@pytest.mark.filterwarnings("ignore:Overwriting the cmap")
+def test_register_all_only_registers_changed_names(updates, registrations):
+    schema = FlexokiSchema()
+    schema.set_theme("light")
+    schema.register_all(prefix="test-all")
+    first = list(registrations)
+    assert "test-all:reds" in first and "test-all:reds_r" in first and "test-all:defaults" in first
+    assert len(updates) == 1
+    schema.register_all(prefix="test-all")
+    assert registrations == first and len(updates) == 1
+    # Only the default colors (and their colormaps) change with the theme
+    schema.set_theme("dark")
+    schema.register_all(prefix="test-all")
+    assert registrations[len(first):] == ["test-all:defaults", "test-all:defaults_r"]
+    assert len(updates) == 2 and set(updates[1]) <= set(defaults(schema, "test-all", "dark"))
+    assert matplotlib.colormaps["test-all:defaults"].colors[0].upper() == schema.colors["red-400"].hex
+    schema.register_all(prefix="test-all")
+    assert registrations[len(first):] == ["test-all:defaults", "test-all:defaults_r"] and len(updates) == 2
@@ -0,0 +1,50 @@
+import asyncio
+import time
+import pytest
+import flexoki.render as render
+from flexoki.render import Renderer
+
+# Draw functions are sent to the worker processes, so they need to be defined at the top level
+def draw(fig, n):
+    fig.subplots().plot(range(n), color="flexoki:red")
+
+def test_renderer_renders_every_spec():
+    specs = [{"draw":draw, "args":(n,), "format":"svg"} for n in range(2, 6)]
+    async def run():
+        with Renderer(processes=1) as renderer:
+            return {i:svg async for i, svg in render.render_many(specs, theme="dark", renderer=renderer)}
+    results = asyncio.run(run())
+    assert sorted(results) == [0, 1, 2, 3]
+    assert all(svg.lstrip().startswith(b"<?xml") for svg in results.values())
+
+def test_invalid_spec():
+    with pytest.raises(Exception):
+        render._parse_spec({"args":(1,)})
+
+def test_default_renderer_does_not_block_the_event_loop(monkeypatch):
+    # A stand-in for the default renderer, which (like a real one) takes a while to start
+    class Slow:
+        async def render_many(self, specs, theme=None, lightness=None):
+            for i, spec in enumerate(specs):
+                yield i, spec
+    def slow_default():
+        time.sleep(0.3)
+        return Slow()
+    monkeypatch.setattr(render, "_default", None)
+    monkeypatch.setattr(render, "default_renderer", slow_default)
+
+    async def run():
+        ticks = 0
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        ticker = asyncio.ensure_future(tick())
+        results = [r async for r in render.render_many(["a", "b"])]
+        ticker.cancel()
+        return results, ticks
+    results, ticks = asyncio.run(run())
+    assert results == [(0, "a"), (1, "b")]
+    # The loop kept running while the renderer was being created
+    assert ticks > 5
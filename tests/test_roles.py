@@ -0,0 +1,82 @@
+import pytest
+from flexoki.core import FlexokiSchema
+from flexoki.table import parse
+
+HUES = ["red", "orange", "yellow", "green", "cyan", "blue", "purple", "magenta", "base"]
+
+def test_lighter_darker_match_filter():
+    schema = FlexokiSchema()
+    for h in "roygcbpmk":
+        row = schema.filter(h, returns="colors")
+        for i, c in enumerate(row):
+            for n in [1, 2, 5]:
+                assert c.darker(n) is row[min(i + n, len(row) - 1)]
+                assert c.lighter(n) is row[max(i - n, 0)]
+                assert c.darker(-n) is c.lighter(n)
+    assert schema.colors.red_600.lighter() is schema.colors.red_500
+    assert schema.colors.red_600.darker(2) is schema.colors.red_800
+    # base-0/base-1000 have the same neighbors as paper/black
+    assert schema.colors.base_0.darker() is schema.colors.base_50
+    assert schema.colors.base_1000.lighter() is schema.colors.base_950
+
+def test_lighter_darker_invalid():
+    schema = FlexokiSchema(**parse({"extends": "flexoki", "hues": {"teal": "t"}, "colors": {"teal-500": "#1A7F7A"}}))
+    with pytest.raises(Exception):
+        schema["teal-500"].darker()
+    with pytest.raises(Exception):
+        FlexokiSchema().colors.red.darker(1.5)
+
+def test_neighbors_of_unordered_sparse_table():
+    # Listed out of order, and only at some of the lightness values
+    schema = FlexokiSchema(**parse({"extends": "flexoki", "hues": {"teal": "t"},
+                                    "colors": {"teal-500": "#1A7F7A", "teal-300": "#3AA99F", "teal-800": "#0E3B39", "teal-400": "#24948C"}}))
+    teal = {l: schema[f"teal-{l}"] for l in [300, 400, 500, 800]}
+    assert teal[400].darker(schema=schema) is teal[500]
+    assert teal[400].lighter(schema=schema) is teal[300]
+    assert teal[500].darker(schema=schema) is teal[800]
+    assert teal[500].lighter(schema=schema) is teal[400]
+    assert teal[300].lighter(schema=schema) is teal[300]
+    assert teal[800].darker(schema=schema) is teal[800]
+    assert teal[300].darker(3, schema=schema) is teal[800]
+
+def test_neighbors_with_repeated_lightness():
+    # A color with the same hue and lightness as another has the same neighbors as it
+    schema = FlexokiSchema(**parse({"extends": "flexoki", "colors": {"brand": {"h": "r", "l": 400, "hex": "#E0453A"}}}))
+    assert schema["brand"].darker(schema=schema) is schema["red-500"]
+    assert schema["brand"].lighter(schema=schema) is schema["red-300"]
+
+def test_best_text():
+    schema = FlexokiSchema()
+    paper, black = schema.colors.paper, schema.colors.black
+    assert schema.colors.red_600.best_text() is paper
+    assert schema.colors.red_100.best_text() is black
+    assert paper.best_text() is black and black.best_text() is paper
+    from flexoki.metrics import contrast_matrix
+    colors = schema.colors.to_list()
+    ratios = contrast_matrix([c.rgb for c in colors], [paper.rgb, black.rgb])
+    for c, (on_paper, on_black) in zip(colors, ratios.tolist()):
+        assert c.best_text() is (paper if on_paper >= on_black else black)
+
+def test_roles():
+    schema = FlexokiSchema()
+    light, dark = schema.at(theme="light").roles, schema.at(theme="dark").roles
+    assert light["bg"] is schema.colors.paper and light["tx"] is schema.colors.black
+    assert dark["bg"] is schema.colors.black and dark["tx"] is schema.colors.base_200
+    assert light["error"] is schema.colors.red_600 and light["error-hover"] is schema.colors.red_700 and light["on-error"] is schema.colors.paper
+    assert dark["error"] is schema.colors.red_400 and dark["error-hover"] is schema.colors.red_300 and dark["on-error"] is schema.colors.black
+    assert [light[r].h for r in ["error", "warning", "success", "info", "accent"]] == list("rogbc")
+    # Built once per snapshot, and read-only
+    assert schema.at(theme="dark").roles is dark
+    with pytest.raises(TypeError):
+        light["error"] = schema.colors.red_500
+    schema.theme = "dark"
+    assert schema.roles is dark
+
+def test_roles_of_table_without_flexoki_base_colors():
+    table = {f"{name}-{l}": {"h": code, "l": l, "hex": hex} for name, code in zip(HUES, "roygcbpmk")
+             for l, hex in [(100, "#F0E0D0"), (500, "#806040"), (900, "#201008")]}
+    schema = FlexokiSchema(table)
+    light = schema.at(500).roles
+    assert light["bg"] is schema["base-100"] and light["tx"] is schema["base-900"] and light["tx-2"] is schema["base-500"]
+    assert light["error-hover"] is schema["red-900"] and light["on-error"] in (schema["base-100"], schema["base-900"])
+    assert schema.at(100).roles["bg"] is schema["base-900"]
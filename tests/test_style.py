@@ -0,0 +1,42 @@
+import matplotlib
+import pytest
+from flexoki.core import FlexokiSchema
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_style_applies_and_restores(fast):
+    schema = FlexokiSchema()
+    before = dict(matplotlib.rcParams)
+    with schema.style(theme="dark", fast=fast) as snapshot:
+        assert snapshot.theme == "dark"
+        assert matplotlib.rcParams["axes.prop_cycle"].by_key()["color"][0] == snapshot.red.hex
+        assert matplotlib.colors.to_hex(matplotlib.rcParams["figure.facecolor"]).upper() == snapshot.roles["bg"].hex
+        # Settings changed inside the block are restored as well
+        matplotlib.rcParams["lines.linewidth"] = 7
+    assert dict(matplotlib.rcParams) == before
+
+def test_style_uses_public_path_by_default(monkeypatch):
+    calls = []
+    rc_context = matplotlib.rc_context
+    def wrapped(rc=None, fname=None):
+        calls.append(rc)
+        return rc_context(rc, fname)
+    monkeypatch.setattr(matplotlib, "rc_context", wrapped)
+    schema = FlexokiSchema()
+    with schema.style(lightness=300):
+        pass
+    assert len(calls) == 1
+    with schema.style(lightness=300, fast=True):
+        pass
+    assert len(calls) == (1 if hasattr(matplotlib.rcParams, "_update_raw") else 2)
+
+def test_style_as_decorator():
+    schema = FlexokiSchema()
+    @schema.style(theme="light")
+    def draw():
+        return matplotlib.rcParams["axes.prop_cycle"].by_key()["color"][0]
+    assert draw() == schema.light.red.hex
+
+def test_style_invalid_inputs():
+    with pytest.raises(Exception):
+        with FlexokiSchema().style(fast="yes"):
+            pass
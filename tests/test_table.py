@@ -0,0 +1,88 @@
+import json
+import pytest
+from flexoki.core import FlexokiSchema
+from flexoki.table import parse, read, validate
+from flexoki.utils import color_table, h_codes, l_values
+
+# A table that extends Flexoki with a new hue, whose colors are listed out of order
+BRAND = {
+    "extends": "flexoki",
+    "hues": {"teal": "t"},
+    "colors": {"teal-500": "#1A7F7A", "teal-300": "#3AA99F", "teal-700": {"h": "t", "l": 700, "hex": "#12524F"}, "teal-400": "#24948C"},
+}
+TOML = """
+extends = "flexoki"
+
+[hues]
+teal = "t"
+
+[colors]
+teal-500 = "#1A7F7A"
+teal-300 = "#3AA99F"
+teal-400 = "#24948C"
+
+[colors.teal-700]
+h = "t"
+l = 700
+hex = "#12524F"
+"""
+
+def test_read_json_and_toml(tmp_path):
+    (tmp_path / "brand.json").write_text(json.dumps(BRAND))
+    (tmp_path / "brand.toml").write_text(TOML)
+    from_json, from_toml = read(tmp_path / "brand.json"), read(tmp_path / "brand.toml")
+    assert from_json == from_toml == parse(BRAND)
+    with pytest.raises(Exception):
+        read(tmp_path / "brand.yaml")
+
+def test_from_file_round_trip(tmp_path):
+    (tmp_path / "brand.json").write_text(json.dumps(BRAND))
+    schema = FlexokiSchema.from_file(tmp_path / "brand.json")
+    assert schema["teal-700"].hex == "#12524F"
+    assert schema["teal-300"].rgb == (0x3A, 0xA9, 0x9F)
+    # Everything from Flexoki is still there, and unchanged
+    builtin = FlexokiSchema()
+    assert [(c.name, c.hex) for c in builtin.colors.to_list()] == [(c.name, c.hex) for c in schema.colors.to_list()][:len(builtin.colors.to_list())]
+    assert schema.colors.red.hex == builtin.colors.red.hex
+
+def test_unordered_hues_are_sorted_by_lightness():
+    schema = FlexokiSchema(**parse(BRAND))
+    assert [c.name for c in schema.filter("teal", returns="colors")] == ["teal-300", "teal-400", "teal-500", "teal-700"]
+    assert [c.name for c in schema.palettes.teals] == ["teal-300", "teal-400", "teal-500", "teal-700"]
+    # Ramps need the positions in order, and start/end on the existing colors
+    ramp = schema.ramp("teal", steps=5)
+    assert [c.l for c in ramp] == [300, 400, 500, 600, 700]
+    assert [ramp[0].hex, ramp[-1].hex] == ["#3AA99F", "#12524F"]
+
+def test_same_table_as_python_objects():
+    parsed = parse(BRAND)
+    schema = FlexokiSchema(parsed["table"], parsed["h_codes"], parsed["l_values"])
+    assert schema.colors._all is FlexokiSchema(**parsed).colors._all
+    assert schema.filter("t", 500).hex == "#1A7F7A"
+
+def test_table_that_does_not_extend_flexoki():
+    table = {f"{name}-500": {"h": code, "l": 500, "hex": "#102030"} for name, code in h_codes.items() if name in ["red", "orange", "yellow", "green", "cyan", "blue", "purple", "magenta", "base"]}
+    table["red-300"] = {"h": "r", "l": 300, "hex": "#FF0000"}
+    schema = FlexokiSchema(table)
+    assert schema.lightness == 500
+    assert [c.name for c in schema.filter("r", returns="colors")] == ["red-300", "red-500"]
+
+def test_validate():
+    checked, codes, ls = validate({"red-600": dict(color_table["red-600"], hex="#af3029")} | {n: c for n, c in color_table.items() if c["l"] == 600})
+    assert checked["red-600"]["hex"] == "#AF3029"
+    assert codes == h_codes and ls == [600]
+    assert validate(color_table, h_codes, l_values)[0] == {n: dict(c, rgb=tuple(c["rgb"])) for n, c in color_table.items()}
+
+@pytest.mark.parametrize("data", [
+    {},
+    {"colors": {"teal-500": "#1A7F7A"}, "hues": {"teal": "t"}},
+    {"extends": "flexoki", "colors": {"teal-500": "#1A7F7A"}},
+    {"extends": "other", "colors": {}},
+    {"extends": "flexoki", "hues": {"teal": "t"}, "colors": {"teal-500": "#1A7F7"}},
+    {"extends": "flexoki", "hues": {"teal": "t"}, "colors": {"teal-500": {"h": "t", "l": 500, "hex": "#1A7F7A", "rgb": [0, 0, 0]}}},
+    {"extends": "flexoki", "hues": {"teal": "t"}, "colors": {"teal": {"h": "t", "l": 500}}},
+    {"extends": "flexoki", "colors": {"red-601": {"h": "r", "l": 601, "hex": "#AF3029"}}, "lightness": l_values},
+])
+def test_invalid_tables(data):
+    with pytest.raises(Exception):
+        FlexokiSchema(**parse(data))